@@ -6,6 +6,7 @@ Creates a beautiful visual report from portfolio analysis
 
 import asyncio
 import json
+import logging
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -39,7 +40,7 @@ async def generate_report(portfolio_path: str, output_path: str = None):
     print(f"\n🔍 Fetching real-time data for {len(symbols)} symbols...")
 
     # Get current prices
-    prices = await fetcher.get_current_prices(symbols)
+    prices = await fetcher.get_prices_fast(symbols)
 
     # Get historical data
     print("📈 Fetching historical data (1 year)...")
@@ -117,5 +118,7 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s")
+
     # Run async
     asyncio.run(generate_report(args.portfolio, args.output))
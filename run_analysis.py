@@ -14,6 +14,7 @@ Usage:
 import asyncio
 import argparse
 import json
+import logging
 import sys
 from pathlib import Path
 
@@ -187,7 +188,7 @@ async def main():
 
         # Save report
         output_file = args.output or f"portfolio_report_{orchestrator.session_id}.json"
-        orchestrator.save_report(output_file)
+        await orchestrator.save_report_async(output_file)
 
         print(f"\n✅ Analysis complete!")
         print(f"📄 Full report saved to: {output_file}")
@@ -198,7 +199,11 @@ async def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        # Cancel agent queries left running if the analysis failed
+        await orchestrator.aclose()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s")
     asyncio.run(main())
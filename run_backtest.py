@@ -92,6 +92,9 @@ async def main():
 
     print(f"Running {len(test_periods)} backtests...\n")
 
+    # Fetch the widest window once; each period is sliced from it
+    await backtester.prefetch_periods(portfolio, test_periods)
+
     # Run backtests
     results = []
     for period in test_periods:
@@ -6,7 +6,7 @@ This agent collects real-time market data using Claude Code's web search capabil
 
 import asyncio
 from claude_agent_sdk import query, ClaudeAgentOptions
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import json
 
 
@@ -92,6 +92,12 @@ Output Format (Extended):
 }
 """
 
+        # Built once and reused by every query() call
+        self.options = ClaudeAgentOptions(
+            system_prompt=self.system_prompt,
+            allowed_tools=["WebSearch", "WebFetch"]
+        )
+
     async def collect_data(self, symbols: List[str]) -> Dict:
         """
         Collect market data for given symbols using Claude Code web search.
@@ -123,18 +129,13 @@ Use web search efficiently. Cite sources.
 Return ONLY valid JSON matching the specified format and STOP.
 """
 
-        options = ClaudeAgentOptions(
-            system_prompt=self.system_prompt,
-            allowed_tools=["WebSearch", "WebFetch"]
-        )
-
         print(f"[MarketDataAgent] Querying Claude for {len(symbols)} symbols...")
-        result_text = ""
+        parts = []
 
         try:
             # Add timeout to prevent infinite searching
             async with asyncio.timeout(120):  # 2 minute max
-                async for message in query(prompt=prompt, options=options):
+                async for message in query(prompt=prompt, options=self.options):
                     # Skip SystemMessage metadata
                     message_type = type(message).__name__
                     if 'System' in message_type:
@@ -157,17 +158,20 @@ Return ONLY valid JSON matching the specified format and STOP.
                         for block in raw_content:
                             # Only extract from TextBlock, skip ToolUseBlock
                             if hasattr(block, 'text'):
-                                result_text += block.text + "\n"
+                                parts.append(block.text + "\n")
                     elif raw_content:
-                        result_text += str(raw_content) + "\n"
+                        parts.append(str(raw_content) + "\n")
         except asyncio.TimeoutError:
             print(f"[MarketDataAgent] WARNING: Query timed out after 120s")
+            result_text = "".join(parts)
             return {
                 "error": "Market data collection timed out",
                 "partial_data": result_text[:500] if result_text else "",
                 "symbols_requested": symbols
             }
 
+        result_text = "".join(parts)
+
         print(f"[MarketDataAgent] Parsing response ({len(result_text)} chars)...")
 
         # Parse JSON from response
@@ -190,6 +194,51 @@ Return ONLY valid JSON matching the specified format and STOP.
                 "symbols_requested": symbols
             }
 
+    async def collect_one(self, symbol: str) -> Dict:
+        """
+        Collect market data for a single symbol.
+
+        Lets the orchestrator run one query per symbol concurrently.
+        Same output format as collect_data.
+        """
+        return await self.collect_data([symbol])
+
+    async def stream_data(
+        self,
+        symbols: List[str],
+        max_concurrency: int = 8,
+        limiter: Optional[asyncio.Semaphore] = None
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Collect market data per symbol, yielding results as they land.
+
+        Args:
+            symbols: List of ticker symbols
+            max_concurrency: Max simultaneous queries (API rate limits)
+            limiter: Optional shared semaphore also acquired per query
+                (e.g. a process-wide cap across several callers)
+
+        Yields:
+            (symbol, collect_one result) in completion order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def collect_bounded(symbol: str) -> Tuple[str, Dict]:
+            async with semaphore:
+                if limiter is None:
+                    return symbol, await self.collect_one(symbol)
+                async with limiter:
+                    return symbol, await self.collect_one(symbol)
+
+        tasks = [asyncio.create_task(collect_bounded(symbol)) for symbol in symbols]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumer stopped early (or failed) - don't leave queries running
+            for task in tasks:
+                task.cancel()
+
 
 async def main():
     """Example usage"""
@@ -94,6 +94,12 @@ Output Format:
 }
 """
 
+        # Built once and reused by every query() call
+        self.options = ClaudeAgentOptions(
+            system_prompt=self.system_prompt,
+            allowed_tools=["Bash"]
+        )
+
     async def optimize(
         self,
         portfolio: Dict,
@@ -139,14 +145,9 @@ Show all calculations and formulas.
 Return structured JSON with specific trade orders (shares to buy/sell).
 """
 
-        options = ClaudeAgentOptions(
-            system_prompt=self.system_prompt,
-            allowed_tools=["Bash"]
-        )
-
         print(f"[OptimizationAgent] Optimizing for: {objective}...")
-        result_text = ""
-        async for message in query(prompt=prompt, options=options):
+        parts = []
+        async for message in query(prompt=prompt, options=self.options):
             # Skip SystemMessage metadata
             message_type = type(message).__name__
             if 'System' in message_type:
@@ -169,9 +170,11 @@ Return structured JSON with specific trade orders (shares to buy/sell).
                 for block in raw_content:
                     # Only extract from TextBlock, skip ToolUseBlock
                     if hasattr(block, 'text'):
-                        result_text += block.text + "\n"
+                        parts.append(block.text + "\n")
             elif raw_content:
-                result_text += str(raw_content) + "\n"
+                parts.append(str(raw_content) + "\n")
+
+        result_text = "".join(parts)
 
         print(f"[OptimizationAgent] Parsing response ({len(result_text)} chars)...")
 
@@ -73,6 +73,12 @@ Return structured JSON with:
 }
 """
 
+        # Built once and reused by every query() call
+        self.options = ClaudeAgentOptions(
+            system_prompt=self.system_prompt,
+            allowed_tools=["Bash"]  # Can run Python calculations
+        )
+
     async def analyze(self, portfolio: Dict, market_data: Dict) -> Dict:
         """
         Analyze portfolio using quantitative methods.
@@ -106,14 +112,9 @@ Show your calculations and formulas used.
 Return results as structured JSON matching the specified format.
 """
 
-        options = ClaudeAgentOptions(
-            system_prompt=self.system_prompt,
-            allowed_tools=["Bash"]  # Can run Python calculations
-        )
-
         print(f"[PortfolioAgent] Analyzing portfolio with {len(portfolio.get('holdings', []))} holdings...")
-        result_text = ""
-        async for message in query(prompt=prompt, options=options):
+        parts = []
+        async for message in query(prompt=prompt, options=self.options):
             # Skip SystemMessage metadata
             message_type = type(message).__name__
             if 'System' in message_type:
@@ -136,9 +137,11 @@ Return results as structured JSON matching the specified format.
                 for block in raw_content:
                     # Only extract from TextBlock, skip ToolUseBlock
                     if hasattr(block, 'text'):
-                        result_text += block.text + "\n"
+                        parts.append(block.text + "\n")
             elif raw_content:
-                result_text += str(raw_content) + "\n"
+                parts.append(str(raw_content) + "\n")
+
+        result_text = "".join(parts)
 
         print(f"[PortfolioAgent] Parsing response ({len(result_text)} chars)...")
 
@@ -94,6 +94,12 @@ Output Format:
 }
 """
 
+        # Built once and reused by every query() call
+        self.options = ClaudeAgentOptions(
+            system_prompt=self.system_prompt,
+            allowed_tools=["Bash", "WebSearch"]
+        )
+
     async def assess(self, portfolio: Dict, market_data: Dict) -> Dict:
         """
         Perform comprehensive risk assessment.
@@ -130,14 +136,9 @@ Use quantitative methods. Show calculations.
 Return structured JSON matching the specified format.
 """
 
-        options = ClaudeAgentOptions(
-            system_prompt=self.system_prompt,
-            allowed_tools=["Bash", "WebSearch"]
-        )
-
         print("[RiskAgent] Performing risk assessment...")
-        result_text = ""
-        async for message in query(prompt=prompt, options=options):
+        parts = []
+        async for message in query(prompt=prompt, options=self.options):
             # Skip SystemMessage metadata
             message_type = type(message).__name__
             if 'System' in message_type:
@@ -160,9 +161,11 @@ Return structured JSON matching the specified format.
                 for block in raw_content:
                     # Only extract from TextBlock, skip ToolUseBlock
                     if hasattr(block, 'text'):
-                        result_text += block.text + "\n"
+                        parts.append(block.text + "\n")
             elif raw_content:
-                result_text += str(raw_content) + "\n"
+                parts.append(str(raw_content) + "\n")
+
+        result_text = "".join(parts)
 
         print(f"[RiskAgent] Parsing response ({len(result_text)} chars)...")
 
@@ -6,7 +6,9 @@ for portfolio management strategies.
 """
 
 from .backtester import PortfolioBacktester, BacktestResult, BacktestPeriod
-from .historical_data import HistoricalDataFetcher, RealTimeDataAdapter
+from .historical_data import (
+    HistoricalDataFetcher, RealTimeDataAdapter, close_by_date, num_prices, price_records
+)
 from .performance import PerformanceCalculator
 
 __all__ = [
@@ -15,5 +17,8 @@ __all__ = [
     'BacktestPeriod',
     'HistoricalDataFetcher',
     'RealTimeDataAdapter',
+    'close_by_date',
+    'num_prices',
+    'price_records',
     'PerformanceCalculator'
 ]
@@ -0,0 +1,135 @@
+"""
+Optional Numba kernels for performance metrics.
+
+Numba is not a hard dependency. When it is not installed NUMBA_AVAILABLE is
+False and PerformanceCalculator falls back to its NumPy implementations.
+Kernels take contiguous float64 arrays and mirror the NumPy semantics exactly.
+"""
+
+import math
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _max_drawdown_nb(values):
+        """Single pass (max_drawdown, peak_index, trough_index)."""
+        peak = values[0]
+        peak_idx = 0
+        max_dd = 0.0
+        max_dd_peak_idx = 0
+        max_dd_trough_idx = 0
+
+        for i in range(values.shape[0]):
+            value = values[i]
+            if value > peak:
+                peak = value
+                peak_idx = i
+
+            drawdown = (peak - value) / peak if peak > 0 else 0.0
+
+            if drawdown > max_dd:
+                max_dd = drawdown
+                max_dd_peak_idx = peak_idx
+                max_dd_trough_idx = i
+
+        return max_dd, max_dd_peak_idx, max_dd_trough_idx
+
+    @njit(cache=True)
+    def _ulcer_nb(values):
+        """Root-mean-square percentage drawdown from the running peak."""
+        peak = values[0]
+        total = 0.0
+
+        for i in range(values.shape[0]):
+            value = values[i]
+            if value > peak:
+                peak = value
+
+            drawdown_pct = (peak - value) / peak * 100 if peak > 0 else 0.0
+            total += drawdown_pct * drawdown_pct
+
+        return math.sqrt(total / values.shape[0])
+
+    @njit(cache=True)
+    def _downside_dev_nb(returns):
+        """(downside deviation over all periods, number of negative returns)."""
+        total = 0.0
+        num_negative = 0
+
+        for i in range(returns.shape[0]):
+            r = returns[i]
+            if r < 0:
+                total += r * r
+                num_negative += 1
+
+        return math.sqrt(total / returns.shape[0]), num_negative
+
+    @njit(cache=True)
+    def _fused_stats_nb(values):
+        """
+        Every reduction comprehensive_metrics needs, in one pass over values.
+
+        Returns (mean, std, downside_dev, num_negative, max_dd, peak_idx,
+        trough_idx, ulcer, gains_sum, losses_sum, win_count). Returns are
+        derived on the fly; mean/variance use Welford's update.
+        """
+        n_values = values.shape[0]
+        n = n_values - 1
+
+        mean = 0.0
+        m2 = 0.0
+        downside_sq = 0.0
+        num_negative = 0
+        gains_sum = 0.0
+        losses_sum = 0.0
+        win_count = 0
+
+        peak = values[0]
+        peak_idx = 0
+        max_dd = 0.0
+        max_dd_peak_idx = 0
+        max_dd_trough_idx = 0
+        ulcer_sq = 0.0
+
+        for i in range(n_values):
+            value = values[i]
+
+            if i > 0:
+                r = (value - values[i - 1]) / values[i - 1]
+                delta = r - mean
+                mean += delta / i
+                m2 += delta * (r - mean)
+
+                if r > 0:
+                    gains_sum += r
+                    win_count += 1
+                elif r < 0:
+                    losses_sum -= r
+                    downside_sq += r * r
+                    num_negative += 1
+
+            if value > peak:
+                peak = value
+                peak_idx = i
+
+            drawdown = (peak - value) / peak if peak > 0 else 0.0
+            ulcer_sq += (drawdown * 100) * (drawdown * 100)
+
+            if drawdown > max_dd:
+                max_dd = drawdown
+                max_dd_peak_idx = peak_idx
+                max_dd_trough_idx = i
+
+        std = math.sqrt(m2 / (n - 1)) if n > 1 else 0.0
+        downside_dev = math.sqrt(downside_sq / n)
+        ulcer = math.sqrt(ulcer_sq / n_values)
+
+        return (mean, std, downside_dev, num_negative, max_dd, max_dd_peak_idx,
+                max_dd_trough_idx, ulcer, gains_sum, losses_sum, win_count)
@@ -19,7 +19,7 @@ from datetime import datetime, timedelta
 import random
 import math
 
-from .historical_data import HistoricalDataFetcher
+from .historical_data import HistoricalDataFetcher, close_by_date
 from .performance import PerformanceCalculator
 from .backtester import BacktestPeriod, BacktestResult
 
@@ -146,8 +146,7 @@ class AdvancedBacktester:
         # Extract all dates
         all_dates = set()
         for symbol_data in historical_prices.values():
-            for price_entry in symbol_data.get('prices', []):
-                all_dates.add(price_entry['date'])
+            all_dates.update(close_by_date(symbol_data.get('prices')))
 
         sorted_dates = sorted(list(all_dates))
 
@@ -383,11 +382,10 @@ class AdvancedBacktester:
     ) -> List[float]:
         """Calculate daily returns for a period"""
         # Build price map
-        price_by_date = {}
-        for symbol, data in historical_prices.items():
-            price_by_date[symbol] = {}
-            for price_entry in data.get('prices', []):
-                price_by_date[symbol][price_entry['date']] = price_entry['close']
+        price_by_date = {
+            symbol: close_by_date(data.get('prices'))
+            for symbol, data in historical_prices.items()
+        }
 
         # Get dates in range
         all_dates = set()
@@ -441,11 +439,10 @@ class AdvancedBacktester:
     ) -> List[float]:
         """Calculate all daily portfolio values"""
         # Build price map
-        price_by_date = {}
-        for symbol, data in historical_prices.items():
-            price_by_date[symbol] = {}
-            for price_entry in data.get('prices', []):
-                price_by_date[symbol][price_entry['date']] = price_entry['close']
+        price_by_date = {
+            symbol: close_by_date(data.get('prices'))
+            for symbol, data in historical_prices.items()
+        }
 
         # Get all dates
         all_dates = set()
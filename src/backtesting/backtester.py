@@ -14,10 +14,24 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, asdict
 import statistics
 import asyncio
-from .historical_data import HistoricalDataFetcher
+from math import expm1, log1p
+import numpy as np
+from .historical_data import NO_DATA_ERROR, HistoricalDataFetcher, close_by_date, empty_prices, num_prices
 from .performance import PerformanceCalculator
 
 
+def _annualize(total_return: float, years: float) -> float:
+    """
+    Annualize a total return over a number of years.
+
+    Uses expm1/log1p instead of (1 + r) ** (1 / years) - 1, which keeps
+    precision for returns close to zero.
+    """
+    if years <= 0 or total_return <= -1:
+        return total_return
+    return expm1(log1p(total_return) * (1.0 / years))
+
+
 @dataclass
 class BacktestPeriod:
     """Defines a backtesting period"""
@@ -70,6 +84,8 @@ class PortfolioBacktester:
         self.validation_metrics = {}
         self.historical_fetcher = HistoricalDataFetcher()
         self.perf_calculator = PerformanceCalculator()
+        # symbol -> (start_date, end_date, dates, data) for the widest window fetched
+        self._price_cache = {}
 
     def define_test_periods(self) -> List[BacktestPeriod]:
         """
@@ -143,15 +159,15 @@ class PortfolioBacktester:
         symbols = [h['symbol'] for h in portfolio['holdings']]
         print(f"[Backtester] Fetching historical data for {len(symbols)} symbols...")
 
-        # Fetch historical prices for all symbols
-        historical_prices = await self.historical_fetcher.fetch_multiple_symbols(
+        # Fetch historical prices for all symbols (sliced from cache when covered)
+        historical_prices = await self._get_or_fetch(
             symbols,
             period.start_date,
             period.end_date
         )
 
         # Check if we got data
-        has_data = any(len(data.get('prices', [])) > 0 for data in historical_prices.values())
+        has_data = any(num_prices(data.get('prices')) > 0 for data in historical_prices.values())
         if not has_data:
             validation_errors.append("No historical data available for any symbols")
             print(f"[Backtester] ⚠️  No historical data - using fallback calculation")
@@ -163,7 +179,7 @@ class PortfolioBacktester:
             start = datetime.strptime(period.start_date, "%Y-%m-%d")
             end = datetime.strptime(period.end_date, "%Y-%m-%d")
             years = (end - start).days / 365.25
-            annualized_return = ((1 + total_return) ** (1/years) - 1) if years > 0 else total_return
+            annualized_return = _annualize(total_return, years)
 
             result = BacktestResult(
                 period=period,
@@ -207,17 +223,23 @@ class PortfolioBacktester:
             end = datetime.strptime(period.end_date, "%Y-%m-%d")
             years = (end - start).days / 365.25
 
-            annualized_return = ((final_value / initial_value) ** (1/years) - 1) if years > 0 else total_return
+            annualized_return = _annualize(total_return, years)
 
             # Calculate performance metrics from daily values
-            returns = [(daily_values[i]['total_value'] / daily_values[i-1]['total_value'] - 1)
-                      for i in range(1, len(daily_values))]
+            values = [dv['total_value'] for dv in daily_values]
+            values_arr = np.asarray(values, dtype=np.float64)
+            returns = values_arr[1:] / values_arr[:-1] - 1
 
             sharpe_ratio = self.perf_calculator.sharpe_ratio(returns, risk_free_rate=0.04)
-            max_drawdown_tuple = self.perf_calculator.max_drawdown([dv['total_value'] for dv in daily_values])
+            max_drawdown_tuple = self.perf_calculator.max_drawdown(values)
             max_drawdown = max_drawdown_tuple[0]  # Extract drawdown percentage from tuple
             volatility = self.perf_calculator.volatility(returns, annualize=True)
-            win_rate = sum(1 for r in returns if r > 0) / len(returns) if returns else 0
+
+            # Boolean masks reduce in C instead of per-element generator loops
+            positive_mask = returns > 0
+            positive_days = int(positive_mask.sum())
+            negative_days = int((returns < 0).sum())
+            win_rate = float(positive_mask.mean()) if returns.size else 0
 
             print(f"[Backtester] ✓ Calculated {len(daily_values)} daily values")
             print(f"[Backtester] Total Return: {total_return*100:.2f}%")
@@ -238,8 +260,8 @@ class PortfolioBacktester:
                 metrics={
                     "num_days": len(daily_values),
                     "num_returns": len(returns),
-                    "positive_days": sum(1 for r in returns if r > 0),
-                    "negative_days": sum(1 for r in returns if r < 0)
+                    "positive_days": positive_days,
+                    "negative_days": negative_days
                 },
                 snapshots=snapshots,
                 validation_errors=validation_errors
@@ -248,6 +270,84 @@ class PortfolioBacktester:
         self.results.append(result)
         return result
 
+    async def prefetch_periods(self, portfolio: Dict, periods: List[BacktestPeriod]):
+        """
+        Fetch the envelope of all periods once so each backtest can slice it.
+
+        The standard test periods all sit inside the 10-year window, so this
+        turns one network round-trip per period into a single fetch.
+        """
+        if not periods:
+            return
+
+        symbols = [h['symbol'] for h in portfolio['holdings']]
+        start_date = min(p.start_date for p in periods)
+        end_date = max(p.end_date for p in periods)
+        await self._get_or_fetch(symbols, start_date, end_date)
+
+    async def _get_or_fetch(
+        self,
+        symbols: List[str],
+        start_date: str,
+        end_date: str
+    ) -> Dict[str, Dict]:
+        """
+        Return historical prices for symbols, reusing the widest cached window.
+
+        If the cached window covers [start_date, end_date) the prices are
+        sliced from it; otherwise the union of both windows is fetched and
+        replaces the cache entry.
+        """
+        missing = []
+        for symbol in symbols:
+            cached = self._price_cache.get(symbol)
+            if cached is None or cached[0] > start_date or cached[1] < end_date:
+                missing.append(symbol)
+
+        if missing:
+            fetch_start = start_date
+            fetch_end = end_date
+            for symbol in missing:
+                if symbol in self._price_cache:
+                    fetch_start = min(fetch_start, self._price_cache[symbol][0])
+                    fetch_end = max(fetch_end, self._price_cache[symbol][1])
+
+            fetched = await self.historical_fetcher.fetch_multiple_symbols(
+                missing,
+                fetch_start,
+                fetch_end
+            )
+
+            # A symbol with no history in the window is cached too, so it isn't
+            # refetched for every period inside it. Failed fetches (network,
+            # rate limit) are not: the next period retries them
+            for symbol, data in fetched.items():
+                if not num_prices(data.get('prices')):
+                    if data.get('metadata', {}).get('error') != NO_DATA_ERROR:
+                        continue
+                    data = {**data, "prices": empty_prices()}
+                self._price_cache[symbol] = (fetch_start, fetch_end, data['prices']['date'], data)
+
+        historical_prices = {}
+        for symbol in symbols:
+            cached = self._price_cache.get(symbol)
+            if cached is None:
+                historical_prices[symbol] = {"symbol": symbol, "prices": empty_prices()}
+                continue
+
+            _, _, dates, data = cached
+            # yfinance treats end_date as exclusive, so slice [start, end)
+            lo = np.searchsorted(dates, np.datetime64(start_date, 'D'))
+            hi = np.searchsorted(dates, np.datetime64(end_date, 'D'))
+            historical_prices[symbol] = {
+                **data,
+                "start_date": start_date,
+                "end_date": end_date,
+                "prices": {column: values[lo:hi] for column, values in data['prices'].items()}
+            }
+
+        return historical_prices
+
     def _calculate_portfolio_value(self, portfolio: Dict, date: str) -> float:
         """Calculate portfolio value at a specific date"""
         # Placeholder - would fetch historical prices
@@ -266,18 +366,17 @@ class PortfolioBacktester:
 
         Args:
             portfolio: Portfolio with holdings and shares
-            historical_prices: Dict of symbol -> {prices: [{date, close, ...}]}
+            historical_prices: Dict of symbol -> {prices: {date: [...], close: [...], ...}}
             start_date, end_date: Period
 
         Returns:
             List of {date, total_value, holdings: {symbol: value}}
         """
         # Build a date-indexed price map for each symbol
-        price_by_date = {}
-        for symbol, data in historical_prices.items():
-            price_by_date[symbol] = {}
-            for price_entry in data.get('prices', []):
-                price_by_date[symbol][price_entry['date']] = price_entry['close']
+        price_by_date = {
+            symbol: close_by_date(data.get('prices'))
+            for symbol, data in historical_prices.items()
+        }
 
         # Get all dates where we have prices (intersection of all symbols)
         all_dates = set()
@@ -299,35 +398,36 @@ class PortfolioBacktester:
 
         print(f"[Backtester] Calculating portfolio values for {len(valid_dates)} trading days")
 
-        # Calculate portfolio value for each date
-        daily_values = []
-        for date in valid_dates:
-            total_value = 0
-            holdings_value = {}
-            missing_prices = []
-
-            for holding in portfolio['holdings']:
-                symbol = holding['symbol']
-                shares = holding['shares']
-
-                if symbol in price_by_date and date in price_by_date[symbol]:
-                    price = price_by_date[symbol][date]
-                    value = shares * price
-                    total_value += value
-                    holdings_value[symbol] = value
-                else:
-                    missing_prices.append(symbol)
-
-            # Add cash
-            total_value += portfolio.get('cash', 0)
-
-            # Only include date if we have all prices
-            if not missing_prices:
-                daily_values.append({
-                    'date': date,
-                    'total_value': total_value,
-                    'holdings': holdings_value
-                })
+        # Dense (dates x holdings) price matrix, NaN where a price is missing
+        holdings = portfolio['holdings']
+        holding_symbols = [h['symbol'] for h in holdings]
+        shares = np.array([h['shares'] for h in holdings], dtype=np.float64)
+        date_index = {date: i for i, date in enumerate(valid_dates)}
+
+        prices = np.full((len(valid_dates), len(holdings)), np.nan)
+        for j, symbol in enumerate(holding_symbols):
+            for date, close in price_by_date.get(symbol, {}).items():
+                i = date_index.get(date)
+                if i is not None:
+                    prices[i, j] = close
+
+        # Only include dates where we have all prices, then value every
+        # remaining date in one broadcast multiply + row reduction
+        complete = ~np.isnan(prices).any(axis=1)
+        position_values = prices[complete] * shares
+        total_values = position_values.sum(axis=1) + portfolio.get('cash', 0)
+
+        complete_dates = [date for date, ok in zip(valid_dates, complete) if ok]
+        daily_values = [
+            {
+                'date': date,
+                'total_value': total_value,
+                'holdings': dict(zip(holding_symbols, row))
+            }
+            for date, total_value, row in zip(
+                complete_dates, total_values.tolist(), position_values.tolist()
+            )
+        ]
 
         print(f"[Backtester] ✓ Successfully calculated {len(daily_values)} complete daily values")
 
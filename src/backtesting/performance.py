@@ -5,11 +5,57 @@ Calculates comprehensive performance metrics for backtesting validation.
 All metrics use industry-standard formulas for accuracy.
 """
 
-import statistics
-from typing import List, Dict, Tuple
+from typing import List, Dict, NamedTuple, Optional, Tuple, Union
+from collections import OrderedDict
 from datetime import datetime
+import copy
+import hashlib
 import math
 
+import numpy as np
+
+from ._numba import NUMBA_AVAILABLE
+
+if NUMBA_AVAILABLE:
+    from ._numba import _max_drawdown_nb, _ulcer_nb, _downside_dev_nb, _fused_stats_nb
+
+
+# sqrt(periods_per_year) for daily, weekly and monthly data
+_SQRT_PPY = {252: math.sqrt(252), 52: math.sqrt(52), 12: math.sqrt(12)}
+
+
+def _sqrt_ppy(periods_per_year: int) -> float:
+    """Annualization factor, precomputed for the common frequencies."""
+    return _SQRT_PPY.get(periods_per_year) or math.sqrt(periods_per_year)
+
+
+# LRU cache for comprehensive_metrics: (series digests, params) -> metrics
+_METRICS_CACHE_MAXSIZE = 256
+_metrics_cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+
+
+def _series_digest(values) -> Optional[bytes]:
+    """Content hash of a value series as float64 (None passes through)."""
+    if values is None:
+        return None
+    data = np.ascontiguousarray(values, dtype=np.float64)
+    return hashlib.blake2b(data.tobytes(), digest_size=16).digest()
+
+
+class _SeriesStats(NamedTuple):
+    """Reductions over a value series shared by comprehensive_metrics."""
+    mean: float
+    std: float
+    downside_dev: float
+    num_negative: int
+    max_dd: float
+    peak_idx: int
+    trough_idx: int
+    ulcer: float
+    gains_sum: float
+    losses_sum: float
+    win_count: int
+
 
 class PerformanceCalculator:
     """
@@ -20,25 +66,21 @@ class PerformanceCalculator:
     """
 
     @staticmethod
-    def calculate_returns(values: List[float]) -> List[float]:
+    def calculate_returns(values: Union[List[float], np.ndarray]) -> np.ndarray:
         """
         Calculate period-to-period returns.
 
         Args:
-            values: Time series of portfolio values
+            values: Time series of portfolio values (list or ndarray)
 
         Returns:
-            List of returns (fractional, not percentage)
+            Array of returns (fractional, not percentage)
         """
-        if len(values) < 2:
-            return []
-
-        returns = []
-        for i in range(1, len(values)):
-            ret = (values[i] - values[i-1]) / values[i-1]
-            returns.append(ret)
+        v = np.asarray(values, dtype=np.float64)
+        if v.size < 2:
+            return np.empty(0, dtype=np.float64)
 
-        return returns
+        return np.diff(v) / v[:-1]
 
     @staticmethod
     def total_return(initial_value: float, final_value: float) -> float:
@@ -96,10 +138,11 @@ class PerformanceCalculator:
         if len(returns) < 2:
             return 0.0
 
-        vol = statistics.stdev(returns)
+        r = np.asarray(returns, dtype=np.float64)
+        vol = float(r.std(ddof=1))
 
         if annualize:
-            vol *= math.sqrt(periods_per_year)
+            vol *= _sqrt_ppy(periods_per_year)
 
         return vol
 
@@ -125,15 +168,16 @@ class PerformanceCalculator:
         if len(returns) < 2:
             return 0.0
 
-        mean_return = statistics.mean(returns)
-        std_dev = statistics.stdev(returns)
+        r = np.asarray(returns, dtype=np.float64)
+        mean_return = float(r.mean())
+        std_dev = float(r.std(ddof=1))
 
         if std_dev == 0:
             return 0.0
 
         # Annualize
         annual_return = mean_return * periods_per_year
-        annual_std = std_dev * math.sqrt(periods_per_year)
+        annual_std = std_dev * _sqrt_ppy(periods_per_year)
 
         sharpe = (annual_return - risk_free_rate) / annual_std
 
@@ -153,28 +197,57 @@ class PerformanceCalculator:
         if len(returns) < 2:
             return 0.0
 
-        mean_return = statistics.mean(returns)
+        r = np.asarray(returns, dtype=np.float64)
+        mean_return = float(r.mean())
 
         # Calculate downside deviation (only negative returns)
-        downside_returns = [r for r in returns if r < 0]
-
-        if not downside_returns:
+        if NUMBA_AVAILABLE:
+            downside_dev, num_negative = _downside_dev_nb(r)
+        else:
+            downside_returns = r[r < 0]
+            num_negative = downside_returns.size
+            if num_negative:
+                downside_dev = math.sqrt(float(np.dot(downside_returns, downside_returns)) / r.size)
+
+        if num_negative == 0:
             # No downside = infinite Sortino, cap at very high value
             return 10.0
 
-        downside_dev = math.sqrt(sum(r**2 for r in downside_returns) / len(returns))
-
         if downside_dev == 0:
             return 10.0
 
         # Annualize
         annual_return = mean_return * periods_per_year
-        annual_downside_dev = downside_dev * math.sqrt(periods_per_year)
+        annual_downside_dev = downside_dev * _sqrt_ppy(periods_per_year)
 
         sortino = (annual_return - risk_free_rate) / annual_downside_dev
 
         return sortino
 
+    @staticmethod
+    def _risk_adjusted_from_stats(
+        mean_return: float,
+        std_dev: float,
+        downside_dev: float,
+        risk_free_rate: float,
+        periods_per_year: int
+    ) -> Tuple[float, float]:
+        """
+        (sharpe, sortino) from precomputed per-period return statistics.
+
+        Same formulas and edge cases as sharpe_ratio / sortino_ratio, without
+        another pass over the returns.
+        """
+        sqrt_ppy = _sqrt_ppy(periods_per_year)
+        excess_return = mean_return * periods_per_year - risk_free_rate
+
+        sharpe = excess_return / (std_dev * sqrt_ppy) if std_dev != 0 else 0.0
+
+        # No downside = infinite Sortino, cap at very high value
+        sortino = excess_return / (downside_dev * sqrt_ppy) if downside_dev != 0 else 10.0
+
+        return sharpe, sortino
+
     @staticmethod
     def max_drawdown(values: List[float]) -> Tuple[float, int, int]:
         """
@@ -183,28 +256,42 @@ class PerformanceCalculator:
         Returns:
             (max_drawdown_pct, peak_index, trough_index)
         """
-        if not values or len(values) < 2:
+        if values is None or len(values) < 2:
             return (0.0, 0, 0)
 
-        peak = values[0]
-        peak_idx = 0
-        max_dd = 0.0
-        max_dd_peak_idx = 0
-        max_dd_trough_idx = 0
+        v = np.asarray(values, dtype=np.float64)
+
+        if NUMBA_AVAILABLE:
+            max_dd, peak_idx, trough_idx = _max_drawdown_nb(v)
+            return (float(max_dd), int(peak_idx), int(trough_idx))
+
+        drawdowns = PerformanceCalculator._drawdown_series(v)
 
-        for i, value in enumerate(values):
-            if value > peak:
-                peak = value
-                peak_idx = i
+        return PerformanceCalculator._max_drawdown_from_series(v, drawdowns)
 
-            drawdown = (peak - value) / peak
+    @staticmethod
+    def _max_drawdown_from_series(
+        values: np.ndarray,
+        drawdowns: np.ndarray
+    ) -> Tuple[float, int, int]:
+        """max_drawdown body, reusing a precomputed drawdown series."""
+        # argmax returns the first occurrence, matching a strict running max
+        trough_idx = int(drawdowns.argmax())
+        max_dd = float(drawdowns[trough_idx])
+
+        if max_dd <= 0:
+            return (0.0, 0, 0)
 
-            if drawdown > max_dd:
-                max_dd = drawdown
-                max_dd_peak_idx = peak_idx
-                max_dd_trough_idx = i
+        peak_idx = int(values[:trough_idx + 1].argmax())
 
-        return (max_dd, max_dd_peak_idx, max_dd_trough_idx)
+        return (max_dd, peak_idx, trough_idx)
+
+    @staticmethod
+    def _drawdown_series(values: np.ndarray) -> np.ndarray:
+        """Fractional drawdown from the running peak at each point."""
+        peaks = np.maximum.accumulate(values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(peaks > 0, (peaks - values) / peaks, 0.0)
 
     @staticmethod
     def calmar_ratio(
@@ -238,16 +325,66 @@ class PerformanceCalculator:
         Returns:
             VaR (as positive number representing potential loss)
         """
-        if not returns:
+        if len(returns) == 0:
             return 0.0
 
-        sorted_returns = sorted(returns)
-        index = int((1 - confidence_level) * len(sorted_returns))
+        part, index = PerformanceCalculator._tail_partition(returns, confidence_level)
+
+        return PerformanceCalculator._var_from_partition(part, index)
+
+    @staticmethod
+    def value_at_risk_multi(
+        returns: List[float],
+        confidence_levels: Tuple[float, ...] = (0.90, 0.95, 0.99)
+    ) -> List[float]:
+        """
+        Value at Risk at several confidence levels from one partition.
+
+        Equivalent to calling value_at_risk once per level, but selects all
+        the order statistics in a single np.partition call.
 
-        if index >= len(sorted_returns):
-            index = len(sorted_returns) - 1
+        Args:
+            returns: Historical returns
+            confidence_levels: e.g., (0.90, 0.95, 0.99)
 
-        var = -sorted_returns[index]  # Make positive (loss)
+        Returns:
+            VaR per confidence level, in the same order
+        """
+        if len(returns) == 0:
+            return [0.0] * len(confidence_levels)
+
+        r = np.asarray(returns, dtype=np.float64)
+        indices = [
+            min(int((1 - level) * r.size), r.size - 1)
+            for level in confidence_levels
+        ]
+        part = np.partition(r, sorted(set(indices)))
+
+        return [PerformanceCalculator._var_from_partition(part, index) for index in indices]
+
+    @staticmethod
+    def _tail_partition(
+        returns: Union[List[float], np.ndarray],
+        confidence_level: float
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Partition returns around the VaR order statistic in O(N).
+
+        Everything left of the VaR index is a worse return, so the same
+        partition serves both value_at_risk and conditional_var.
+        """
+        r = np.asarray(returns, dtype=np.float64)
+        index = int((1 - confidence_level) * r.size)
+
+        return np.partition(r, min(index, r.size - 1)), index
+
+    @staticmethod
+    def _var_from_partition(part: np.ndarray, index: int) -> float:
+        """value_at_risk body, reusing a _tail_partition result."""
+        if index >= len(part):
+            index = len(part) - 1
+
+        var = -float(part[index])  # Make positive (loss)
 
         return max(0, var)
 
@@ -261,22 +398,26 @@ class PerformanceCalculator:
 
         Average loss beyond VaR threshold.
         """
-        if not returns:
+        if len(returns) == 0:
             return 0.0
 
-        sorted_returns = sorted(returns)
-        index = int((1 - confidence_level) * len(sorted_returns))
+        part, index = PerformanceCalculator._tail_partition(returns, confidence_level)
+
+        return PerformanceCalculator._cvar_from_partition(part, index)
 
+    @staticmethod
+    def _cvar_from_partition(part: np.ndarray, index: int) -> float:
+        """conditional_var body, reusing a _tail_partition result."""
         if index == 0:
             index = 1
 
         # Average of worst returns beyond VaR
-        tail_returns = sorted_returns[:index]
+        tail_returns = part[:index]
 
-        if not tail_returns:
+        if tail_returns.size == 0:
             return 0.0
 
-        cvar = -statistics.mean(tail_returns)  # Make positive
+        cvar = -float(tail_returns.mean())  # Make positive
 
         return max(0, cvar)
 
@@ -288,13 +429,12 @@ class PerformanceCalculator:
         Returns:
             Win rate as decimal (0.0 to 1.0)
         """
-        if not returns:
+        if len(returns) == 0:
             return 0.0
 
-        winning_periods = sum(1 for r in returns if r > 0)
-        total_periods = len(returns)
+        r = np.asarray(returns, dtype=np.float64)
 
-        return winning_periods / total_periods
+        return float(np.count_nonzero(r > 0)) / r.size
 
     @staticmethod
     def profit_factor(returns: List[float]) -> float:
@@ -305,11 +445,12 @@ class PerformanceCalculator:
 
         > 1.0 means profitable overall
         """
-        if not returns:
+        if len(returns) == 0:
             return 0.0
 
-        gains = sum(r for r in returns if r > 0)
-        losses = abs(sum(r for r in returns if r < 0))
+        r = np.asarray(returns, dtype=np.float64)
+        gains = float(r[r > 0].sum())
+        losses = -float(r[r < 0].sum())
 
         if losses == 0:
             return float('inf') if gains > 0 else 0.0
@@ -326,32 +467,22 @@ class PerformanceCalculator:
 
         Beta = Covariance(Portfolio, Benchmark) / Variance(Benchmark)
         """
-        if len(portfolio_returns) != len(benchmark_returns):
+        port = np.asarray(portfolio_returns, dtype=np.float64)
+        bench = np.asarray(benchmark_returns, dtype=np.float64)
+
+        if port.ndim != 1 or port.shape != bench.shape:
             raise ValueError("Return series must be same length")
 
-        if len(portfolio_returns) < 2:
+        if port.size < 2:
             return 1.0
 
-        # Calculate means
-        port_mean = statistics.mean(portfolio_returns)
-        bench_mean = statistics.mean(benchmark_returns)
-
-        # Calculate covariance
-        n = len(portfolio_returns)
-        covariance = sum(
-            (portfolio_returns[i] - port_mean) * (benchmark_returns[i] - bench_mean)
-            for i in range(n)
-        ) / (n - 1)
-
-        # Calculate benchmark variance
-        bench_variance = statistics.variance(benchmark_returns)
+        # One 2x2 covariance matrix gives both cov(p, b) and var(b)
+        cov = np.cov(port, bench, ddof=1)
 
-        if bench_variance == 0:
+        if cov[1, 1] == 0:
             return 1.0
 
-        beta = covariance / bench_variance
-
-        return beta
+        return float(cov[0, 1] / cov[1, 1])
 
     @staticmethod
     def alpha(
@@ -389,13 +520,13 @@ class PerformanceCalculator:
             return 0.0
 
         # Calculate excess returns
-        excess_returns = [
-            portfolio_returns[i] - benchmark_returns[i]
-            for i in range(len(portfolio_returns))
-        ]
+        excess_returns = (
+            np.asarray(portfolio_returns, dtype=np.float64)
+            - np.asarray(benchmark_returns, dtype=np.float64)
+        )
 
-        mean_excess = statistics.mean(excess_returns)
-        tracking_error = statistics.stdev(excess_returns)
+        mean_excess = float(excess_returns.mean())
+        tracking_error = float(excess_returns.std(ddof=1))
 
         if tracking_error == 0:
             return 0.0
@@ -409,22 +540,62 @@ class PerformanceCalculator:
 
         Lower is better. Focuses on depth and duration of drawdowns.
         """
-        if not values or len(values) < 2:
+        if values is None or len(values) < 2:
             return 0.0
 
-        squared_drawdowns = []
-        peak = values[0]
+        v = np.asarray(values, dtype=np.float64)
+
+        if NUMBA_AVAILABLE:
+            return float(_ulcer_nb(v))
+
+        return PerformanceCalculator._ulcer_from_series(
+            PerformanceCalculator._drawdown_series(v)
+        )
+
+    @staticmethod
+    def _ulcer_from_series(drawdowns: np.ndarray) -> float:
+        """ulcer_index body, reusing a precomputed drawdown series."""
+        drawdown_pct = drawdowns * 100
+        return math.sqrt(float(np.dot(drawdown_pct, drawdown_pct)) / drawdown_pct.size)
+
+    @staticmethod
+    def _series_stats(values: np.ndarray) -> _SeriesStats:
+        """
+        All return/drawdown reductions for a value series (len >= 2).
 
-        for value in values:
-            if value > peak:
-                peak = value
+        One fused Numba pass when available, otherwise the NumPy equivalents.
+        """
+        if NUMBA_AVAILABLE:
+            (mean, std, downside_dev, num_negative, max_dd, peak_idx, trough_idx,
+             ulcer, gains_sum, losses_sum, win_count) = _fused_stats_nb(values)
+            return _SeriesStats(
+                float(mean), float(std), float(downside_dev), int(num_negative),
+                float(max_dd), int(peak_idx), int(trough_idx), float(ulcer),
+                float(gains_sum), float(losses_sum), int(win_count)
+            )
 
-            drawdown_pct = ((peak - value) / peak) * 100
-            squared_drawdowns.append(drawdown_pct ** 2)
+        returns = np.diff(values) / values[:-1]
+        negative = returns[returns < 0]
+        positive = returns[returns > 0]
 
-        ulcer = math.sqrt(sum(squared_drawdowns) / len(squared_drawdowns))
+        drawdowns = PerformanceCalculator._drawdown_series(values)
+        max_dd, peak_idx, trough_idx = PerformanceCalculator._max_drawdown_from_series(
+            values, drawdowns
+        )
 
-        return ulcer
+        return _SeriesStats(
+            mean=float(returns.mean()),
+            std=float(returns.std(ddof=1)) if returns.size > 1 else 0.0,
+            downside_dev=math.sqrt(float(np.dot(negative, negative)) / returns.size),
+            num_negative=int(negative.size),
+            max_dd=max_dd,
+            peak_idx=peak_idx,
+            trough_idx=trough_idx,
+            ulcer=PerformanceCalculator._ulcer_from_series(drawdowns),
+            gains_sum=float(positive.sum()),
+            losses_sum=-float(negative.sum()),
+            win_count=int(positive.size)
+        )
 
     @staticmethod
     def comprehensive_metrics(
@@ -436,12 +607,52 @@ class PerformanceCalculator:
         """
         Calculate all performance metrics in one go.
 
+        Results are memoized (LRU, 256 entries) by a hash of the value and
+        benchmark series plus the parameters, so repeated calls on the same
+        series are a dict lookup. Callers always get their own copy.
+
         Returns comprehensive dictionary of metrics.
         """
-        if not values or len(values) < 2:
+        if values is None or len(values) < 2:
             return {"error": "Insufficient data"}
 
-        returns = PerformanceCalculator.calculate_returns(values)
+        key = (
+            _series_digest(values),
+            _series_digest(benchmark_values),
+            risk_free_rate,
+            periods_per_year
+        )
+
+        metrics = _metrics_cache.get(key)
+        if metrics is not None:
+            _metrics_cache.move_to_end(key)
+        else:
+            metrics = PerformanceCalculator._compute_comprehensive_metrics(
+                values, benchmark_values, risk_free_rate, periods_per_year
+            )
+            _metrics_cache[key] = metrics
+            if len(_metrics_cache) > _METRICS_CACHE_MAXSIZE:
+                _metrics_cache.popitem(last=False)
+
+        return copy.deepcopy(metrics)
+
+    @staticmethod
+    def clear_metrics_cache():
+        """Drop all memoized comprehensive_metrics results"""
+        _metrics_cache.clear()
+
+    @staticmethod
+    def _compute_comprehensive_metrics(
+        values: List[float],
+        benchmark_values: Optional[List[float]],
+        risk_free_rate: float,
+        periods_per_year: int
+    ) -> Dict:
+        """comprehensive_metrics body (uncached)."""
+
+        values_arr = np.asarray(values, dtype=np.float64)
+        returns = PerformanceCalculator.calculate_returns(values_arr)
+        stats = PerformanceCalculator._series_stats(values_arr)
 
         # Calculate time period
         num_periods = len(returns)
@@ -450,25 +661,33 @@ class PerformanceCalculator:
         # Basic metrics
         total_ret = PerformanceCalculator.total_return(values[0], values[-1])
         annual_ret = PerformanceCalculator.annualized_return(values[0], values[-1], num_years)
-        vol = PerformanceCalculator.volatility(returns, annualize=True, periods_per_year=periods_per_year)
-
-        # Risk-adjusted metrics
-        sharpe = PerformanceCalculator.sharpe_ratio(returns, risk_free_rate, periods_per_year)
-        sortino = PerformanceCalculator.sortino_ratio(returns, risk_free_rate, periods_per_year)
+        vol = stats.std * _sqrt_ppy(periods_per_year) if num_periods >= 2 else 0.0
+
+        # Risk-adjusted metrics (mean/std/downside deviation computed once)
+        if num_periods < 2:
+            sharpe = 0.0
+            sortino = 0.0
+        else:
+            sharpe, sortino = PerformanceCalculator._risk_adjusted_from_stats(
+                stats.mean, stats.std, stats.downside_dev, risk_free_rate, periods_per_year
+            )
 
         # Drawdown metrics
-        max_dd, peak_idx, trough_idx = PerformanceCalculator.max_drawdown(values)
+        max_dd, peak_idx, trough_idx = stats.max_dd, stats.peak_idx, stats.trough_idx
+        ulcer = stats.ulcer
         calmar = PerformanceCalculator.calmar_ratio(annual_ret, max_dd)
 
-        # Risk metrics
-        var_95 = PerformanceCalculator.value_at_risk(returns, 0.95)
-        cvar_95 = PerformanceCalculator.conditional_var(returns, 0.95)
+        # Risk metrics (one partition shared by VaR and CVaR)
+        part, var_index = PerformanceCalculator._tail_partition(returns, 0.95)
+        var_95 = PerformanceCalculator._var_from_partition(part, var_index)
+        cvar_95 = PerformanceCalculator._cvar_from_partition(part, var_index)
 
         # Win/loss metrics
-        win_rate = PerformanceCalculator.win_rate(returns)
-        profit_factor = PerformanceCalculator.profit_factor(returns)
-
-        ulcer = PerformanceCalculator.ulcer_index(values)
+        win_rate = stats.win_count / num_periods
+        if stats.losses_sum == 0:
+            profit_factor = float('inf') if stats.gains_sum > 0 else 0.0
+        else:
+            profit_factor = stats.gains_sum / stats.losses_sum
 
         metrics = {
             "period": {
@@ -504,7 +723,7 @@ class PerformanceCalculator:
         }
 
         # Add benchmark comparison if provided
-        if benchmark_values and len(benchmark_values) == len(values):
+        if benchmark_values is not None and len(benchmark_values) == len(values):
             bench_returns = PerformanceCalculator.calculate_returns(benchmark_values)
             bench_annual_ret = PerformanceCalculator.annualized_return(
                 benchmark_values[0], benchmark_values[-1], num_years
@@ -3,10 +3,54 @@ Safety Hooks for Portfolio Management
 Provides automated validation and risk controls.
 """
 
+import re
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from datetime import datetime
 
 
+# Optimization objectives accepted by pre_optimization_hook
+_VALID_OBJECTIVES = ('max_sharpe', 'min_variance', 'max_return', 'risk_parity')
+_VALID_OBJECTIVES_STR = str(list(_VALID_OBJECTIVES))
+
+# pre_trade_hook leverage check: substring match on the upper-cased symbol,
+# so e.g. 'TQQQ.MI' or 'XYZ3X' are still caught
+_LEVERAGED_RE = re.compile(r'3X|TQQQ|SQQQ|UPRO|SPXU')
+
+# post_analysis_hook classifiers: case-insensitive, one regex scan each
+# instead of upper-casing every recommendation. SELL and LOSS may appear
+# in either order; both classifiers can fire for the same recommendation.
+_SELL_AT_LOSS_RE = re.compile(r'(?=.*SELL)(?=.*LOSS)', re.IGNORECASE | re.DOTALL)
+_HIGH_RISK_RE = re.compile(r'3X|LEVERAGE|DERIVATIVE', re.IGNORECASE)
+
+_RECOMMENDATION_WARNINGS = {
+    'sell_at_loss': '⚠️  Recommendation involves selling at loss',
+    'high_risk': '⚠️  High-risk instrument mentioned',
+}
+
+
+@lru_cache(maxsize=2048)
+def _classify(rec: str) -> tuple:
+    """
+    Classify a recommendation string.
+
+    Recommendation text tends to repeat across sessions, so results are
+    memoized and repeat lookups skip the regex scans.
+
+    Args:
+        rec: Recommendation text
+
+    Returns:
+        Tuple of tags (keys of _RECOMMENDATION_WARNINGS), in warning order
+    """
+    tags = []
+    if _SELL_AT_LOSS_RE.match(rec):
+        tags.append('sell_at_loss')
+    if _HIGH_RISK_RE.search(rec):
+        tags.append('high_risk')
+    return tuple(tags)
+
+
 class PortfolioSafetyHooks:
     """Hooks for trade validation and risk management"""
 
@@ -33,6 +77,25 @@ class PortfolioSafetyHooks:
             'forbidden_symbols': []
         }
 
+        # Bound methods don't change, so the SDK config is built once
+        self._hook_config = {
+            'pre_optimization': {
+                'function': self.pre_optimization_hook,
+                'description': 'Validate portfolio before optimization',
+                'blocking': True
+            },
+            'pre_trade': {
+                'function': self.pre_trade_hook,
+                'description': 'Validate individual trades',
+                'blocking': True
+            },
+            'post_analysis': {
+                'function': self.post_analysis_hook,
+                'description': 'Add safety warnings to analysis',
+                'blocking': False
+            }
+        }
+
     async def pre_optimization_hook(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Hook executed before optimization agent runs.
@@ -48,6 +111,7 @@ class PortfolioSafetyHooks:
                 'modified_constraints': Dict (optional)
             }
         """
+        timestamp = datetime.now().isoformat()
         portfolio = input_data.get('portfolio', {})
         objective = input_data.get('objective', 'max_sharpe')
 
@@ -57,16 +121,15 @@ class PortfolioSafetyHooks:
             return {
                 'permissionDecision': 'deny',
                 'reason': f'Portfolio value too small for optimization (${total_value:.2f} < $1,000)',
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp
             }
 
         # Check 2: Validate objective
-        valid_objectives = ['max_sharpe', 'min_variance', 'max_return', 'risk_parity']
-        if objective not in valid_objectives:
+        if objective not in _VALID_OBJECTIVES:
             return {
                 'permissionDecision': 'deny',
-                'reason': f'Invalid objective: {objective}. Must be one of {valid_objectives}',
-                'timestamp': datetime.now().isoformat()
+                'reason': f'Invalid objective: {objective}. Must be one of {_VALID_OBJECTIVES_STR}',
+                'timestamp': timestamp
             }
 
         # Check 3: Ensure constraints are present
@@ -75,13 +138,22 @@ class PortfolioSafetyHooks:
                 'permissionDecision': 'allow',
                 'reason': 'Adding default constraints',
                 'modified_constraints': self.constraints,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp
             }
 
         return {
             'permissionDecision': 'allow',
             'reason': 'Optimization validated',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp
+        }
+
+    @staticmethod
+    def _result(decision: str, reason: str, timestamp: str) -> Dict[str, Any]:
+        """Build a hook decision dict"""
+        return {
+            'permissionDecision': decision,
+            'reason': reason,
+            'timestamp': timestamp
         }
 
     async def pre_trade_hook(self, trade_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -104,28 +176,29 @@ class PortfolioSafetyHooks:
                 'reason': str
             }
         """
+        timestamp = datetime.now().isoformat()
         symbol = trade_data.get('symbol', '')
         action = trade_data.get('action', '')
         shares = trade_data.get('shares', 0)
         price = trade_data.get('price', 0)
         portfolio = trade_data.get('current_portfolio', {})
 
-        # Check 1: Forbidden symbols (3x leveraged ETFs)
-        forbidden = self.constraints.get('forbidden_symbols', [])
-        if symbol in forbidden:
-            return {
-                'permissionDecision': 'deny',
-                'reason': f'{symbol} is in forbidden list (high-risk leveraged instrument)',
-                'timestamp': datetime.now().isoformat()
-            }
+        # Check 1: Forbidden symbols (3x leveraged ETFs); read on every call
+        # so later edits to self.constraints take effect
+        if symbol in self.constraints.get('forbidden_symbols', ()):
+            return self._result(
+                'deny',
+                f'{symbol} is in forbidden list (high-risk leveraged instrument)',
+                timestamp
+            )
 
         # Check 2: Detect 3x leverage by symbol pattern
-        if any(pattern in symbol.upper() for pattern in ['3X', 'TQQQ', 'SQQQ', 'UPRO', 'SPXU']):
-            return {
-                'permissionDecision': 'warn',
-                'reason': f'{symbol} appears to be a leveraged ETF - high risk warning',
-                'timestamp': datetime.now().isoformat()
-            }
+        if _LEVERAGED_RE.search(symbol.upper()):
+            return self._result(
+                'warn',
+                f'{symbol} appears to be a leveraged ETF - high risk warning',
+                timestamp
+            )
 
         # Check 3: Position size limits (BUY only)
         if action == 'BUY':
@@ -136,11 +209,11 @@ class PortfolioSafetyHooks:
 
             max_pos = self.constraints.get('max_position_size', 0.35)
             if position_weight > max_pos:
-                return {
-                    'permissionDecision': 'deny',
-                    'reason': f'Position size {position_weight:.1%} exceeds max {max_pos:.1%}',
-                    'timestamp': datetime.now().isoformat()
-                }
+                return self._result(
+                    'deny',
+                    f'Position size {position_weight:.1%} exceeds max {max_pos:.1%}',
+                    timestamp
+                )
 
         # Check 4: Large loss detection (SELL only)
         if action == 'SELL':
@@ -150,25 +223,21 @@ class PortfolioSafetyHooks:
                 max_loss = self.constraints.get('max_loss_threshold', -0.10)
 
                 if loss_pct < max_loss:
-                    return {
-                        'permissionDecision': 'warn',
-                        'reason': f'Selling {symbol} at {loss_pct:.1%} loss (threshold: {max_loss:.1%})',
-                        'timestamp': datetime.now().isoformat()
-                    }
+                    return self._result(
+                        'warn',
+                        f'Selling {symbol} at {loss_pct:.1%} loss (threshold: {max_loss:.1%})',
+                        timestamp
+                    )
 
         # Check 5: Zero shares or price
         if shares <= 0 or price <= 0:
-            return {
-                'permissionDecision': 'deny',
-                'reason': f'Invalid trade: shares={shares}, price=${price:.2f}',
-                'timestamp': datetime.now().isoformat()
-            }
+            return self._result(
+                'deny',
+                f'Invalid trade: shares={shares}, price=${price:.2f}',
+                timestamp
+            )
 
-        return {
-            'permissionDecision': 'allow',
-            'reason': 'Trade validated',
-            'timestamp': datetime.now().isoformat()
-        }
+        return self._result('allow', 'Trade validated', timestamp)
 
     async def post_analysis_hook(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -185,16 +254,14 @@ class PortfolioSafetyHooks:
                 'action_required': bool
             }
         """
+        timestamp = datetime.now().isoformat()
         warnings = []
         recommendations = analysis_result.get('recommendations', [])
 
         # Check for high-risk recommendations
         for rec in recommendations:
-            if 'SELL' in rec.upper() and 'LOSS' in rec.upper():
-                warnings.append(f'⚠️  Recommendation involves selling at loss: {rec[:100]}')
-
-            if any(risky in rec.upper() for risky in ['3X', 'LEVERAGE', 'DERIVATIVE']):
-                warnings.append(f'⚠️  High-risk instrument mentioned: {rec[:100]}')
+            for tag in _classify(rec):
+                warnings.append(f'{_RECOMMENDATION_WARNINGS[tag]}: {rec[:100]}')
 
         # Check risk score
         risk_score = analysis_result.get('risk_score', 0)
@@ -212,7 +279,7 @@ class PortfolioSafetyHooks:
             'warnings': warnings,
             'risk_score': risk_score,
             'action_required': len(warnings) > 0,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp
         }
 
     def get_hook_config(self) -> Dict[str, Any]:
@@ -220,22 +287,7 @@ class PortfolioSafetyHooks:
         Get hook configuration for Claude Agent SDK.
 
         Returns:
-            Dict with hook functions and metadata
+            Dict with hook functions and metadata (built once in __init__;
+            the same object is returned on every call)
         """
-        return {
-            'pre_optimization': {
-                'function': self.pre_optimization_hook,
-                'description': 'Validate portfolio before optimization',
-                'blocking': True
-            },
-            'pre_trade': {
-                'function': self.pre_trade_hook,
-                'description': 'Validate individual trades',
-                'blocking': True
-            },
-            'post_analysis': {
-                'function': self.post_analysis_hook,
-                'description': 'Add safety warnings to analysis',
-                'blocking': False
-            }
-        }
+        return self._hook_config
@@ -5,15 +5,194 @@ Coordinates multiple specialized agents to work in parallel on portfolio analysi
 """
 
 import asyncio
-from typing import Dict, List
+from typing import Dict, List, Optional
 import json
+import logging
+import math
+import os
+import re
+import time
+import weakref
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+from claude_agent_sdk import query, ClaudeAgentOptions
+
+try:
+    import orjson
+except ImportError:  # optional C-accelerated JSON
+    orjson = None
 
 from agents.market_agent import MarketDataAgent
 from agents.portfolio_agent import PortfolioAnalysisAgent
 from agents.risk_agent import RiskAssessmentAgent
 from agents.optimization_agent import PortfolioOptimizationAgent
 from utils.real_data_fetcher import RealDataFetcher
+from orchestrator_cache import AsyncMemoCache, canonical_key, stable_payload
+
+# Diagnostics go through logging with deferred %-formatting; only the
+# phase banners (verbose=True) are printed directly. Named explicitly so
+# it is the same logger when this file runs as __main__.
+logger = logging.getLogger("orchestrator")
+
+# Phase banner separators (verbose output)
+_RULE = "-" * 70
+_HEAVY_RULE = "=" * 70
+
+# Body of the first ```json fence in an LLM response (an unclosed fence
+# runs to the end of the text)
+_JSON_FENCE = re.compile(r"```json\s*(.*?)(?:```|\Z)", re.DOTALL)
+
+def _dumps_compact(obj) -> str:
+    """
+    Serialize obj as compact JSON (no indentation or spaces).
+
+    Used for prompt context, where whitespace only adds tokens. Uses orjson
+    when installed, falling back to the stdlib for anything it rejects.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(',', ':'), default=str)
+
+
+def _report_bytes(report: Dict, pretty: bool = False) -> bytes:
+    """
+    JSON bytes for the saved report (orjson when installed).
+
+    Compact by default - reports are mostly read by tools (e.g. the HTML
+    generator); pretty=True indents by 2 for reading by eye.
+    """
+    if orjson is not None:
+        # datetime and numpy values serialize natively
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(report, option=option)
+        except TypeError:
+            pass  # e.g. non-str keys - let the stdlib handle it
+    if pretty:
+        return json.dumps(report, indent=2).encode()
+    return json.dumps(report, separators=(',', ':')).encode()
+
+
+@dataclass(frozen=True)
+class PortfolioView:
+    """
+    Struct-of-arrays view of portfolio['holdings'], built once per run.
+
+    Agents still receive the original portfolio dict, since it is embedded
+    in their prompts as JSON.
+    """
+    symbols: List[str]
+    shares: np.ndarray
+    sectors: List[str]
+    cash: float
+
+
+# Per-symbol market_data fields the optimizer uses; news, sources and
+# quality notes only add prompt tokens for it
+_OPTIMIZER_FIELDS = (
+    'price', 'change_pct', 'volume', 'market_cap', 'pe_ratio',
+    '52w_high', '52w_low', 'volatility', 'beta', 'analyst_rating'
+)
+
+
+@dataclass
+class SummaryData:
+    """
+    Raw figures behind the fallback summary.
+
+    Extracted without any string formatting; to_dict() renders the
+    key_findings / recommendations / action_items strings the report uses.
+    None means the agent result didn't include that figure.
+    """
+    portfolio_value: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    max_drawdown_pct: Optional[float] = None
+    overall_risk: Optional[float] = None
+    recommendations: List[str] = field(default_factory=list)
+    trades: List[Dict] = field(default_factory=list)
+
+    @classmethod
+    def from_results(
+        cls,
+        portfolio_analysis: Dict,
+        risk_assessment: Dict,
+        optimization: Dict
+    ) -> 'SummaryData':
+        results = (portfolio_analysis, risk_assessment, optimization)
+        fields = {}
+        for source, key, extract in _SUMMARY_EXTRACTORS:
+            result = results[source]
+            if key in result:
+                fields.update(extract(result[key]))
+        return cls(**fields)
+
+    def to_dict(self) -> Dict:
+        """Render the summary strings (same format as the lead synthesis)."""
+        key_findings = []
+        if self.portfolio_value is not None:
+            key_findings.append(f"Portfolio Value: ${self.portfolio_value:,.2f}")
+        if self.sharpe_ratio is not None:
+            key_findings.append(f"Sharpe Ratio: {self.sharpe_ratio:.2f}")
+            key_findings.append(f"Max Drawdown: {self.max_drawdown_pct:.1f}%")
+        if self.overall_risk is not None:
+            key_findings.append(f"Overall Risk Score: {self.overall_risk}/10")
+
+        action_items = []
+        if self.trades:
+            action_items.append(f"Rebalancing: {len(self.trades)} trades recommended")
+            for trade in self.trades[:3]:  # Top 3 trades
+                action_items.append(
+                    f"{trade['action'].upper()} {trade['shares']} shares of {trade['symbol']}"
+                )
+
+        return {
+            "key_findings": key_findings,
+            "recommendations": list(self.recommendations),
+            "action_items": action_items
+        }
+
+
+# (result index, key, extractor) for SummaryData.from_results; results are
+# (portfolio_analysis, risk_assessment, optimization). Each extractor maps
+# the value under key to SummaryData fields.
+_SUMMARY_EXTRACTORS = (
+    (0, 'portfolio_value', lambda pv: {'portfolio_value': pv.get('total', 0)}),
+    (0, 'performance_metrics', lambda pm: {
+        'sharpe_ratio': pm.get('sharpe_ratio', 0),
+        'max_drawdown_pct': pm.get('max_drawdown_pct', 0)
+    }),
+    (1, 'risk_scores', lambda rs: {'overall_risk': rs.get('overall', 0)}),
+    (1, 'recommendations', lambda recs: {'recommendations': list(recs)}),
+    (2, 'rebalancing_trades', lambda trades: {'trades': trades}),
+)
+
+_TRIVIAL_NOTE = "trivial portfolio (fewer than 2 holdings or >= 99% cash)"
+
+
+def _strip_market_echo(result):
+    """Agent result without an echoed 'market_data' copy (shallow, no mutation)."""
+    if isinstance(result, dict) and 'market_data' in result:
+        return {key: value for key, value in result.items() if key != 'market_data'}
+    return result
+
+
+async def _resolved(value):
+    """Awaitable stand-in for an agent call that was skipped."""
+    return value
+
+
+def _agent_result_ok(result) -> bool:
+    """Agents report failures as {'error': ...}; those are not memoized."""
+    return isinstance(result, dict) and 'error' not in result
 
 
 class MultiAgentOrchestrator:
@@ -29,24 +208,87 @@ class MultiAgentOrchestrator:
     4. Parallel execution where dependencies allow
 
     Execution Flow:
-    Phase 1: Market Data Collection (sequential) - Foundation data
+    Phase 1: Market Data Collection (parallel per symbol, overlaps Phase 0) - Foundation data
     Phase 2: Portfolio Analysis + Risk Assessment (parallel) - Independent analyses
-    Phase 3: Optimization (sequential) - Depends on Phase 2 results
+    Phase 3: Optimization (starts with Phase 2) - Needs portfolio + market data only
 
     Reference: anthropic.com/engineering/multi-agent-research-system
     """
 
-    def __init__(self):
+    # Process-wide cap on concurrent agent (LLM) queries, shared by every
+    # orchestrator so batch fan-outs stay under API rate limits
+    llm_max_concurrency = int(os.getenv("LLM_MAX_CONC", "8"))
+    # One semaphore per event loop (asyncio primitives are loop-bound)
+    _llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    @classmethod
+    def configure(cls, max_concurrency: int):
+        """
+        Set the process-wide agent query cap.
+
+        Applies to queries started afterwards; queries already holding a
+        slot finish under the previous limit.
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+        cls.llm_max_concurrency = max_concurrency
+        cls._llm_semaphores.clear()
+
+    @classmethod
+    def _llm_semaphore(cls) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = cls._llm_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = cls._llm_semaphores[loop] = asyncio.Semaphore(cls.llm_max_concurrency)
+        return semaphore
+
+    async def _gated(self, agent_call, *args):
+        """Await agent_call(*args) once a process-wide query slot is free."""
+        async with self._llm_semaphore():
+            return await agent_call(*args)
+
+    def __init__(self, verbose: bool = True, agent_cache: Optional[AsyncMemoCache] = None):
+        """
+        Args:
+            verbose: Print phase banners. Per-agent diagnostics are logged
+                to the "orchestrator" logger at INFO/WARNING.
+            agent_cache: Memo cache for Phase 2/3 agent results; pass one in
+                to share it between orchestrators
+        """
+        self._verbose = verbose
+        self.agent_cache = agent_cache if agent_cache is not None else AsyncMemoCache()
+
         # Specialized worker agents
         self.market_agent = MarketDataAgent()
         self.portfolio_agent = PortfolioAnalysisAgent()
         self.risk_agent = RiskAssessmentAgent()
         self.optimization_agent = PortfolioOptimizationAgent()
 
+        # Lead synthesis options, built once like the workers' (the SDK is
+        # already loaded by the agent modules, so nothing is deferred to the
+        # first run_full_analysis call)
+        self.lead_options = ClaudeAgentOptions(
+            system_prompt="You are a Lead Portfolio Analyst following Anthropic's multi-agent best practices. Your role is to synthesize subagent results into coherent, actionable insights with critical reasoning.",
+            allowed_tools=[]  # Lead only synthesizes, doesn't search
+        )
+
         # Real data fetcher (yfinance)
         self.real_data = RealDataFetcher()
 
-        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Max concurrent per-symbol MarketDataAgent queries (API rate limits)
+        self.market_data_concurrency = 8
+        # Once this fraction of symbols has market context, stragglers get
+        # a grace period instead of holding up Phase 2 (None = wait for all)
+        self.market_data_quorum = 0.75
+        self.market_data_straggler_grace: Optional[float] = 20.0
+
+        # session_id is formatted from this on first use
+        self._created_ns = time.time_ns()
+
+        # Agent/fetch tasks still running; aclose() cancels them
+        self._tasks = set()
         self.results = {}
 
         # Track agent coordination to prevent duplicate work
@@ -56,6 +298,41 @@ class MultiAgentOrchestrator:
             "risk_assessment": "Quantify risks and stress test - DO NOT optimize allocation",
             "optimization": "Generate optimal allocation - Uses results from analysis/risk"
         }
+        # Log lines for the above, formatted once instead of per run
+        self._assignment_log = {
+            task: f"Task assignment ({task}): {text}"
+            for task, text in self.task_assignments.items()
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Cancel agent queries and data fetches still in flight.
+
+        Each agent query is a separate SDK session, so tasks left behind by a
+        failed or abandoned run keep consuming API time until cancelled.
+        """
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """asyncio.create_task, tracked so aclose() can cancel it."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @cached_property
+    def session_id(self) -> str:
+        """Creation time as YYYYmmdd_HHMMSS (local time)."""
+        return time.strftime("%Y%m%d_%H%M%S", time.localtime(self._created_ns // 1_000_000_000))
 
     async def run_full_analysis(
         self,
@@ -74,11 +351,13 @@ class MultiAgentOrchestrator:
         Returns:
             Comprehensive analysis results from all agents
         """
-        print(f"\n{'='*70}")
-        print(f"🤖 Multi-Agent Portfolio Analysis - Session {self.session_id}")
-        print(f"{'='*70}\n")
+        if self._verbose:
+            print(f"\n{_HEAVY_RULE}")
+            print(f"🤖 Multi-Agent Portfolio Analysis - Session {self.session_id}")
+            print(f"{_HEAVY_RULE}\n")
 
-        symbols = [h['symbol'] for h in portfolio['holdings']]
+        view = self._portfolio_soa(portfolio)
+        symbols = view.symbols
 
         # Default constraints
         if constraints is None:
@@ -88,58 +367,44 @@ class MultiAgentOrchestrator:
                 "max_sector_exposure": 0.50
             }
 
-        # ========== PHASE 0: Real Data Collection (yfinance) ==========
-        print("📊 Phase 0: Fetching REAL market data (yfinance)...")
-        print("-" * 70)
-        print(f"[ORCHESTRATOR] Fetching real-time prices for: {', '.join(symbols)}")
-        print(f"[ORCHESTRATOR] Data source: Yahoo Finance API (REAL DATA)")
-
-        # Get real current prices
-        real_prices = await self.real_data.get_current_prices(symbols)
+        # Dependency graph instead of strict phases: Phase 1 (market
+        # context) and both halves of Phase 0 start immediately. Phase 2/3
+        # wait only on market context + current prices; the historical
+        # fetch and real metrics are needed only by the final synthesis.
+        market_task = self._spawn(self._collect_market_data(symbols))
 
-        # Get real historical data for accurate calculations
-        print(f"[ORCHESTRATOR] Fetching historical returns (1 year) for accurate metrics...")
-        real_historical = await self.real_data.get_portfolio_historical_values(
-            portfolio['holdings'],
-            period="1y"
+        # ========== PHASE 0: Real Data Collection (yfinance) ==========
+        if self._verbose:
+            print("📊 Phase 0: Fetching REAL market data (yfinance)...")
+            print(_RULE)
+        logger.info("Fetching real-time prices for: %s (Yahoo Finance)", symbols)
+        logger.info("Fetching 1y historical returns in the background")
+
+        real_metrics_task = self._spawn(
+            self._collect_real_metrics(portfolio['holdings'])
         )
 
-        # Calculate real metrics from historical data (if we have data)
-        if real_historical['returns'] and real_historical['values']:
-            real_metrics = self.real_data.calculate_real_metrics(
-                real_historical['returns'],
-                real_historical['values']
-            )
-
-            print(f"[ORCHESTRATOR] ✓ Real data quality: {real_metrics['data_quality']}")
-            print(f"[ORCHESTRATOR] ✓ Historical data points: {real_metrics['num_data_points']}")
-            print(f"[ORCHESTRATOR] ✓ Real Sharpe Ratio: {real_metrics['sharpe_ratio']:.3f}")
-            print(f"[ORCHESTRATOR] ✓ Real Volatility: {real_metrics['volatility']*100:.2f}%")
-            print(f"[ORCHESTRATOR] ✓ Real Max Drawdown: {real_metrics['max_drawdown']*100:.2f}%")
-        else:
-            print(f"[ORCHESTRATOR] ⚠️  Insufficient real data - some symbols not available on Yahoo Finance")
-            print(f"[ORCHESTRATOR] ℹ️  Will use WebSearch data with quality scoring")
-            real_metrics = {}
-
-        self.results['real_data'] = {
-            'prices': real_prices,
-            'historical': real_historical,
-            'metrics': real_metrics
-        }
+        # Get real current prices
+        real_prices = await self.real_data.get_prices_fast(symbols)
 
-        print("✓ Real data collection complete\n")
+        if self._verbose:
+            print("✓ Real-time prices collected\n")
 
         # ========== PHASE 1: Market Data Collection (News/Context) ==========
-        print("📊 Phase 1: Collecting market context (news, analyst ratings)...")
-        print("-" * 70)
-        print(f"[ORCHESTRATOR] Task assignment: {self.task_assignments['market_data']}")
-        print(f"[ORCHESTRATOR] Note: Price data already collected from yfinance (REAL)")
-        print(f"[ORCHESTRATOR] WebSearch focus: News, analyst ratings, qualitative data")
-
-        market_data = await self.market_agent.collect_data(symbols)
+        if self._verbose:
+            print("📊 Phase 1: Collecting market context (news, analyst ratings)...")
+            print(_RULE)
+        logger.info(self._assignment_log['market_data'])
+        logger.info(
+            "Streaming %d per-symbol WebSearch queries (news, analyst ratings; "
+            "max %d concurrent, started with Phase 0)",
+            len(symbols), self.market_data_concurrency
+        )
+        market_data = await market_task
 
-        # Merge real prices with market context
-        if isinstance(market_data, dict) and 'symbols' in market_data:
+        # Merge real prices with market context (_merge_market_data always
+        # returns a dict)
+        if 'symbols' in market_data:
             for symbol in symbols:
                 if symbol in real_prices and symbol in market_data['symbols']:
                     # Override with REAL data
@@ -153,101 +418,157 @@ class MultiAgentOrchestrator:
         self.results['market_data'] = market_data
 
         # Extended thinking: Log data quality
-        if isinstance(market_data, dict):
-            if 'error' in market_data:
-                print(f"[ORCHESTRATOR] ⚠️  Market data collection failed: {market_data.get('error')}")
-                print(f"[ORCHESTRATOR] Raw response preview: {market_data.get('raw', '')[:200]}...")
-            else:
-                data_quality = market_data.get('meta', {}).get('completion', 'unknown')
-                symbols_found = len(market_data.get('symbols', {}))
-                print(f"[ORCHESTRATOR] ✓ Market data quality: {data_quality}")
-                print(f"[ORCHESTRATOR] ✓ Symbols retrieved: {symbols_found}/{len(symbols)}")
-        else:
-            print(f"[ORCHESTRATOR] ⚠️  Unexpected market data format: {type(market_data)}")
-        print("✓ Market data collection complete\n")
+        if 'error' in market_data:
+            logger.warning("Market data collection failed: %s", market_data.get('error'))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Raw response preview: %s...", market_data.get('raw', '')[:200])
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Market data quality: %s, symbols retrieved: %d/%d",
+                market_data.get('meta', {}).get('completion', 'unknown'),
+                len(market_data.get('symbols', {})), len(symbols)
+            )
+        if self._verbose:
+            print("✓ Market data collection complete\n")
 
         # ========== PHASE 2: Parallel Analysis ==========
-        print("📈 Phase 2: Running parallel analysis (Portfolio + Risk)...")
-        print("-" * 70)
-        print(f"[ORCHESTRATOR] Parallel execution strategy: 2 independent agents")
-        print(f"[ORCHESTRATOR] Task 1: {self.task_assignments['portfolio_analysis']}")
-        print(f"[ORCHESTRATOR] Task 2: {self.task_assignments['risk_assessment']}")
-        print(f"[ORCHESTRATOR] Expected speedup: 1.8x vs sequential")
+        if self._verbose:
+            print("📈 Phase 2: Running parallel analysis (Portfolio + Risk)...")
+            print(_RULE)
+        logger.info(self._assignment_log['portfolio_analysis'])
+        logger.info(self._assignment_log['risk_assessment'])
 
         # Run portfolio analysis and risk assessment in PARALLEL
         # Key: These tasks are INDEPENDENT - no shared state, no race conditions
-        print("[ORCHESTRATOR] Launching PortfolioAnalysisAgent...")
-        portfolio_task = asyncio.create_task(
-            self.portfolio_agent.analyze(portfolio, market_data)
-        )
-        print("[ORCHESTRATOR] Launching RiskAssessmentAgent...")
-        risk_task = asyncio.create_task(
-            self.risk_agent.assess(portfolio, market_data)
-        )
-
-        print("[ORCHESTRATOR] Both agents running in parallel (session isolation)...")
-        # Wait for both to complete
-        portfolio_analysis, risk_assessment = await asyncio.gather(
-            portfolio_task,
-            risk_task
-        )
+        # Agent results are memoized on the portfolio and the exact market
+        # payload each agent is sent (minus fetch times), so repeated analyses
+        # of an unchanged portfolio skip the LLM round trips
+        portfolio_key = canonical_key(portfolio)
+        risk_view = self._risk_view(market_data)
+        optimizer_view = self._optimizer_view(market_data)
+
+        # TaskGroup: if one agent raises, its siblings are cancelled rather
+        # than left running (and billing) in the background
+        try:
+            async with asyncio.TaskGroup() as tg:
+                logger.info("Launching PortfolioAnalysisAgent")
+                portfolio_task = tg.create_task(self.agent_cache.get_or_call(
+                    canonical_key('portfolio_analysis', portfolio_key, stable_payload(market_data)),
+                    lambda: self._gated(self.portfolio_agent.analyze, portfolio, market_data),
+                    _agent_result_ok
+                ))
+                if self._is_trivial(view, real_prices):
+                    # MPT risk/optimization is undefined for a single asset and a
+                    # no-op for an all-cash account - don't spend two LLM calls on it
+                    logger.info("Trivial portfolio: skipping RiskAssessmentAgent and OptimizationAgent")
+                    risk_task = tg.create_task(_resolved({
+                        "note": _TRIVIAL_NOTE,
+                        "recommendations": []
+                    }))
+                    optimization_task = tg.create_task(_resolved({
+                        "rebalancing_trades": [],
+                        "note": _TRIVIAL_NOTE
+                    }))
+                else:
+                    logger.info("Launching RiskAssessmentAgent")
+                    risk_task = tg.create_task(self.agent_cache.get_or_call(
+                        canonical_key('risk_assessment', portfolio_key, stable_payload(risk_view)),
+                        lambda: self._gated(self.risk_agent.assess, portfolio, risk_view),
+                        _agent_result_ok
+                    ))
+
+                    # The optimizer's inputs (portfolio, market data, constraints,
+                    # objective) are all known now, so start Phase 3 speculatively
+                    # instead of waiting for Phase 2 to finish
+                    logger.info("Launching OptimizationAgent (Phase 3, overlaps Phase 2)")
+                    optimization_task = tg.create_task(self.agent_cache.get_or_call(
+                        canonical_key('optimization', portfolio_key, stable_payload(optimizer_view),
+                                      constraints, optimization_objective),
+                        lambda: self._gated(
+                            self.optimization_agent.optimize,
+                            portfolio,
+                            optimizer_view,
+                            constraints,
+                            optimization_objective
+                        ),
+                        _agent_result_ok
+                    ))
+
+                # Phase 2 results are final once they land, so serialize them for
+                # the synthesis prompt (off the event loop) while the optimizer runs
+                portfolio_json_task = tg.create_task(self._dumps_when_done(portfolio_task))
+                risk_json_task = tg.create_task(self._dumps_when_done(risk_task))
+
+                logger.info("Phase 2/3 agents running in parallel (session isolation)")
+        except* Exception as eg:
+            for exc in eg.exceptions:
+                logger.error("Agent task failed: %r", exc)
+
+        # The report keeps one top-level market_data; drop any copy an
+        # agent echoed back so it isn't serialized twice
+        portfolio_analysis = _strip_market_echo(self._task_result(portfolio_task, "PortfolioAnalysisAgent"))
+        risk_assessment = _strip_market_echo(self._task_result(risk_task, "RiskAssessmentAgent"))
+        optimization = _strip_market_echo(self._task_result(optimization_task, "OptimizationAgent"))
+        portfolio_json = self._task_result(portfolio_json_task, None)
+        risk_json = self._task_result(risk_json_task, None)
 
         self.results['portfolio_analysis'] = portfolio_analysis
         self.results['risk_assessment'] = risk_assessment
 
         # Extended thinking: Validate Phase 2 results
-        print("[ORCHESTRATOR] PortfolioAnalysisAgent completed")
-        if isinstance(portfolio_analysis, dict) and 'error' in portfolio_analysis:
-            print(f"[ORCHESTRATOR] ⚠️  Portfolio analysis had errors: {portfolio_analysis.get('error')}")
-        elif isinstance(portfolio_analysis, dict) and 'portfolio_value' in portfolio_analysis:
+        if 'error' in portfolio_analysis:
+            logger.warning("Portfolio analysis had errors: %s", portfolio_analysis.get('error'))
+        elif 'portfolio_value' in portfolio_analysis and logger.isEnabledFor(logging.INFO):
             pv = portfolio_analysis['portfolio_value'].get('total', 'N/A')
-            print(f"[ORCHESTRATOR] ✓ Portfolio value calculated: ${pv:,.2f}" if isinstance(pv, (int, float)) else f"[ORCHESTRATOR] ✓ Portfolio analyzed")
-        print("✓ Portfolio analysis complete")
+            if isinstance(pv, (int, float)):
+                logger.info("Portfolio value calculated: $%s", f"{pv:,.2f}")
+            else:
+                logger.info("Portfolio analyzed")
+
+        if 'error' in risk_assessment:
+            logger.warning("Risk assessment had errors: %s", risk_assessment.get('error'))
+        elif 'risk_scores' in risk_assessment:
+            logger.info("Overall risk score: %s/10", risk_assessment['risk_scores'].get('overall', 'N/A'))
 
-        print("[ORCHESTRATOR] RiskAssessmentAgent completed")
-        if isinstance(risk_assessment, dict) and 'error' in risk_assessment:
-            print(f"[ORCHESTRATOR] ⚠️  Risk assessment had errors: {risk_assessment.get('error')}")
-        elif isinstance(risk_assessment, dict) and 'risk_scores' in risk_assessment:
-            overall_risk = risk_assessment['risk_scores'].get('overall', 'N/A')
-            print(f"[ORCHESTRATOR] ✓ Overall risk score: {overall_risk}/10")
-        print("✓ Risk assessment complete\n")
+        if self._verbose:
+            print("✓ Portfolio analysis complete")
+            print("✓ Risk assessment complete\n")
 
         # ========== PHASE 3: Optimization ==========
-        print("🎯 Phase 3: Generating optimal allocation...")
-        print("-" * 70)
-        print(f"[ORCHESTRATOR] Task assignment: {self.task_assignments['optimization']}")
-        print(f"[ORCHESTRATOR] Optimization objective: {optimization_objective}")
-        print(f"[ORCHESTRATOR] Constraints: {constraints}")
-        print(f"[ORCHESTRATOR] Input dependencies: Portfolio metrics + Risk assessment")
-        print("[ORCHESTRATOR] Launching OptimizationAgent...")
-
-        optimization = await self.optimization_agent.optimize(
-            portfolio,
-            market_data,
-            constraints,
-            optimization_objective
-        )
+        if self._verbose:
+            print("🎯 Phase 3: Generating optimal allocation...")
+            print(_RULE)
+        logger.info(self._assignment_log['optimization'])
+        logger.info("Optimization objective: %s, constraints: %s", optimization_objective, constraints)
 
         self.results['optimization'] = optimization
 
         # Extended thinking: Validate Phase 3 results
-        print("[ORCHESTRATOR] OptimizationAgent completed")
-        if isinstance(optimization, dict) and 'error' in optimization:
-            print(f"[ORCHESTRATOR] ⚠️  Optimization had errors: {optimization.get('error')}")
-        elif isinstance(optimization, dict) and 'rebalancing_trades' in optimization:
-            num_trades = len(optimization.get('rebalancing_trades', []))
-            print(f"[ORCHESTRATOR] ✓ Generated {num_trades} rebalancing trades")
-            if 'expected_improvement' in optimization:
-                improvement = optimization['expected_improvement']
-                if 'sharpe_ratio' in improvement:
-                    current_sharpe = improvement['sharpe_ratio'].get('current', 'N/A')
-                    optimal_sharpe = improvement['sharpe_ratio'].get('optimized', 'N/A')
-                    print(f"[ORCHESTRATOR] ✓ Expected Sharpe improvement: {current_sharpe} → {optimal_sharpe}")
-        print("✓ Optimization completed\n")
+        if 'error' in optimization:
+            logger.warning("Optimization had errors: %s", optimization.get('error'))
+        elif 'rebalancing_trades' in optimization and logger.isEnabledFor(logging.INFO):
+            logger.info("Generated %d rebalancing trades", len(optimization['rebalancing_trades']))
+            sharpe = optimization.get('expected_improvement', {}).get('sharpe_ratio')
+            if sharpe:
+                logger.info(
+                    "Expected Sharpe improvement: %s -> %s",
+                    sharpe.get('current', 'N/A'), sharpe.get('optimized', 'N/A')
+                )
+
+        if self._verbose:
+            print("✓ Optimization completed\n")
+
+        real_historical, real_metrics = await real_metrics_task
+        self.results['real_data'] = {
+            'prices': real_prices,
+            'historical': real_historical,
+            'metrics': real_metrics
+        }
 
         # ========== CONSOLIDATE RESULTS ==========
-        print("📋 Consolidating results...")
-        print("-" * 70)
+        if self._verbose:
+            print("📋 Consolidating results...")
+            print(_RULE)
 
         final_report = {
             "session_id": self.session_id,
@@ -263,23 +584,233 @@ class MultiAgentOrchestrator:
                 portfolio_analysis,
                 risk_assessment,
                 optimization,
-                self.results.get('real_data', {}).get('metrics', {})
+                self.results.get('real_data', {}).get('metrics', {}),
+                portfolio_json=portfolio_json,
+                risk_json=risk_json
             )
         }
 
         self.results['final_report'] = final_report
 
-        print("✅ Multi-agent analysis complete!\n")
-        print("=" * 70)
+        if self._verbose:
+            print("✅ Multi-agent analysis complete!\n")
+            print(_HEAVY_RULE)
 
         return final_report
 
+    @staticmethod
+    def _portfolio_soa(portfolio: Dict) -> PortfolioView:
+        """Build the struct-of-arrays view of portfolio['holdings'] in one pass."""
+        holdings = portfolio['holdings']
+        return PortfolioView(
+            symbols=[h['symbol'] for h in holdings],
+            shares=np.fromiter((h['shares'] for h in holdings), dtype=np.float64, count=len(holdings)),
+            sectors=[h.get('sector', 'Unknown') for h in holdings],
+            cash=float(portfolio.get('cash', 0))
+        )
+
+    @staticmethod
+    def _is_trivial(view: PortfolioView, real_prices: Dict[str, Dict]) -> bool:
+        """
+        True when risk assessment and optimization have nothing to work on.
+
+        That is fewer than 2 holdings, or cash >= 99% of total value (only
+        checked when every holding has a real price).
+        """
+        if len(view.symbols) < 2:
+            return True
+
+        try:
+            prices = np.array([real_prices[symbol]['price'] for symbol in view.symbols], dtype=np.float64)
+        except KeyError:
+            return False
+
+        total = view.cash + float(view.shares @ prices)
+        return total > 0 and view.cash >= 0.99 * total
+
+    async def _collect_real_metrics(self, holdings: List[Dict]) -> tuple:
+        """
+        Phase 0b: fetch 1y historical portfolio values and compute real metrics.
+
+        Runs concurrently with Phases 1-3; only the final synthesis uses it.
+
+        Returns:
+            (real_historical, real_metrics) - real_metrics is {} when there
+            isn't enough Yahoo Finance data
+        """
+        real_historical = await self.real_data.get_portfolio_historical_values(
+            holdings,
+            period="1y"
+        )
+
+        # Calculate real metrics from historical data (if we have data)
+        if real_historical['returns'] and real_historical['values']:
+            real_metrics = self.real_data.calculate_real_metrics(
+                real_historical['returns'],
+                real_historical['values']
+            )
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Real data quality: %s, %d data points, Sharpe %.3f, "
+                    "volatility %.2f%%, max drawdown %.2f%%",
+                    real_metrics['data_quality'], real_metrics['num_data_points'],
+                    real_metrics['sharpe_ratio'], real_metrics['volatility'] * 100,
+                    real_metrics['max_drawdown'] * 100
+                )
+        else:
+            logger.warning(
+                "Insufficient real data - some symbols not available on Yahoo Finance; "
+                "using WebSearch data with quality scoring"
+            )
+            real_metrics = {}
+
+        return real_historical, real_metrics
+
+    async def _collect_market_data(self, symbols: List[str]) -> Dict:
+        """
+        Phase 1: stream per-symbol MarketDataAgent results as they complete.
+
+        At most market_data_concurrency queries run at once. Once
+        market_data_quorum of the symbols have landed, stragglers get
+        market_data_straggler_grace more seconds before they are cancelled
+        and reported as errors (their yfinance prices are still merged in
+        Phase 0/1). Results are merged back into the collect_data format
+        ({'symbols', 'meta'}).
+        """
+        results = {}
+        quorum = math.ceil(self.market_data_quorum * len(symbols))
+        grace = self.market_data_straggler_grace
+        stream = self.market_agent.stream_data(
+            symbols, self.market_data_concurrency, limiter=self._llm_semaphore()
+        )
+
+        try:
+            async with asyncio.timeout(None) as deadline:
+                async for symbol, result in stream:
+                    results[symbol] = result
+                    logger.info("Market context received: %s (%d/%d)", symbol, len(results), len(symbols))
+
+                    if grace is not None and len(results) == quorum < len(symbols):
+                        deadline.reschedule(asyncio.get_running_loop().time() + grace)
+        except TimeoutError:
+            if not deadline.expired():
+                raise
+            missing = [symbol for symbol in symbols if symbol not in results]
+            logger.warning("Market context timed out for %s after %gs grace", missing, grace)
+            for symbol in missing:
+                results[symbol] = {"error": f"Market context not ready within {grace:g}s of quorum"}
+        finally:
+            # Cancels any straggler queries still running
+            await stream.aclose()
+
+        return self._merge_market_data(symbols, [results[symbol] for symbol in symbols])
+
+    @staticmethod
+    async def _dumps_when_done(task: asyncio.Task) -> str:
+        """Compact JSON of task's result, serialized in a worker thread."""
+        return await asyncio.to_thread(_dumps_compact, _strip_market_echo(await task))
+
+    @staticmethod
+    def _task_result(task: asyncio.Task, agent_name: Optional[str]):
+        """
+        Result of a finished TaskGroup task.
+
+        Agent results are validated here, once: failed or cancelled tasks
+        and non-dict responses become {'error': ...} dicts, like the agents'
+        own failure results, so later checks only need key lookups. With
+        agent_name=None, failures become None and no validation is done.
+        """
+        if not task.cancelled() and task.exception() is None:
+            result = task.result()
+            if agent_name is None or isinstance(result, dict):
+                return result
+            return {"error": f"{agent_name} returned {type(result).__name__}, expected a JSON object"}
+        if agent_name is None:
+            return None
+        if task.cancelled():
+            return {"error": f"{agent_name} cancelled after another agent failed"}
+        return {"error": f"{agent_name} failed: {task.exception()!r}"}
+
+    @staticmethod
+    def _optimizer_view(market_data: Dict) -> Dict:
+        """Quantitative per-symbol fields only (see _OPTIMIZER_FIELDS)."""
+        if 'symbols' not in market_data:
+            return market_data
+        return {
+            "symbols": {
+                symbol: {field: data[field] for field in _OPTIMIZER_FIELDS if field in data}
+                for symbol, data in market_data['symbols'].items()
+            }
+        }
+
+    @staticmethod
+    def _risk_view(market_data: Dict) -> Dict:
+        """market_data without per-symbol source lists (news is kept for stress tests)."""
+        if 'symbols' not in market_data:
+            return market_data
+        return {
+            **market_data,
+            "symbols": {
+                symbol: {field: value for field, value in data.items() if field != 'sources'}
+                for symbol, data in market_data['symbols'].items()
+            }
+        }
+
+    @staticmethod
+    def _merge_market_data(symbols: List[str], results: List[Dict]) -> Dict:
+        """Combine per-symbol MarketDataAgent results into one market_data dict"""
+        merged = {}
+        errors = {}
+        searches = 0
+        notes = []
+        complete = True
+
+        for symbol, result in zip(symbols, results):
+            if not isinstance(result, dict) or 'error' in result:
+                errors[symbol] = (
+                    result.get('error') if isinstance(result, dict)
+                    else f"Unexpected response type: {type(result).__name__}"
+                )
+                complete = False
+                continue
+
+            merged.update(result.get('symbols', {}))
+
+            meta = result.get('meta', {})
+            if isinstance(meta.get('searches_performed'), int):
+                searches += meta['searches_performed']
+            if meta.get('completion') != 'full':
+                complete = False
+            if meta.get('notes'):
+                notes.append(f"{symbol}: {meta['notes']}")
+
+        if not merged and errors:
+            return {
+                "error": "Market data collection failed for all symbols",
+                "raw": "; ".join(f"{symbol}: {error}" for symbol, error in errors.items()),
+                "symbols_requested": symbols
+            }
+
+        meta = {
+            "searches_performed": searches,
+            "strategy": "per-symbol",
+            "completion": "full" if complete else "partial",
+            "notes": "; ".join(notes)
+        }
+        if errors:
+            meta["errors"] = errors
+
+        return {"symbols": merged, "meta": meta}
+
     async def _generate_summary(
         self,
         portfolio_analysis: Dict,
         risk_assessment: Dict,
         optimization: Dict,
-        real_metrics: Dict = None
+        real_metrics: Dict = None,
+        portfolio_json: str = None,
+        risk_json: str = None
     ) -> Dict:
         """
         Generate executive summary using Lead Agent synthesis.
@@ -288,10 +819,11 @@ class MultiAgentOrchestrator:
         with critical reasoning and synthesis of subagent results.
 
         Now includes REAL metrics from yfinance for accurate reporting.
-        """
-        from claude_agent_sdk import query, ClaudeAgentOptions
 
-        print("[ORCHESTRATOR] Lead agent synthesizing final report...")
+        portfolio_json / risk_json may be passed pre-serialized (see
+        run_full_analysis) to skip re-serializing the Phase 2 results.
+        """
+        logger.info("Lead agent synthesizing final report")
 
         # Prepare context for lead agent
         real_metrics_text = ""
@@ -307,18 +839,25 @@ class MultiAgentOrchestrator:
    ✅ All metrics calculated from real Yahoo Finance historical data
 """
 
+        # Serialize each agent result once, compactly (indentation only adds tokens)
+        if portfolio_json is None:
+            portfolio_json = _dumps_compact(portfolio_analysis)
+        if risk_json is None:
+            risk_json = _dumps_compact(risk_assessment)
+        optimization_json = _dumps_compact(optimization)
+
         synthesis_prompt = f"""You are the Lead Portfolio Analyst synthesizing results from specialist agents.
 
 AGENT RESULTS:
 
 1. PortfolioAgent Analysis:
-{json.dumps(portfolio_analysis, indent=2)}
+{portfolio_json}
 
 2. RiskAgent Assessment:
-{json.dumps(risk_assessment, indent=2)}
+{risk_json}
 
 3. OptimizationAgent Recommendations:
-{json.dumps(optimization, indent=2)}{real_metrics_text}
+{optimization_json}{real_metrics_text}
 
 TASK:
 Write a concise executive summary with critical analysis. Include:
@@ -352,15 +891,11 @@ Return ONLY valid JSON:
 }}
 """
 
-        options = ClaudeAgentOptions(
-            system_prompt="You are a Lead Portfolio Analyst following Anthropic's multi-agent best practices. Your role is to synthesize subagent results into coherent, actionable insights with critical reasoning.",
-            allowed_tools=[]  # Lead only synthesizes, doesn't search
-        )
-
-        result_text = ""
+        parts = []
         try:
-            async with asyncio.timeout(60):  # 1-minute max for synthesis
-                async for message in query(prompt=synthesis_prompt, options=options):
+            # Timeout starts once a concurrency slot is acquired
+            async with self._llm_semaphore(), asyncio.timeout(60):  # 1-minute max for synthesis
+                async for message in query(prompt=synthesis_prompt, options=self.lead_options):
                     message_type = type(message).__name__
                     if 'System' in message_type:
                         continue
@@ -376,28 +911,25 @@ Return ONLY valid JSON:
                     if isinstance(raw_content, list):
                         for block in raw_content:
                             if hasattr(block, 'text'):
-                                result_text += block.text + "\n"
+                                parts.append(block.text + "\n")
                     elif raw_content:
-                        result_text += str(raw_content) + "\n"
+                        parts.append(str(raw_content) + "\n")
         except asyncio.TimeoutError:
-            print("[ORCHESTRATOR] ⚠️  Synthesis timeout, using fallback summary")
+            logger.warning("Synthesis timeout, using fallback summary")
             return self._fallback_summary(portfolio_analysis, risk_assessment, optimization)
 
+        result_text = "".join(parts)
+
         # Parse JSON
         try:
-            if "```json" in result_text:
-                start = result_text.find("```json") + 7
-                end = result_text.find("```", start)
-                json_str = result_text[start:end].strip()
-                summary = json.loads(json_str)
-            else:
-                summary = json.loads(result_text)
+            fence = _JSON_FENCE.search(result_text)
+            summary = json.loads(fence.group(1).strip() if fence else result_text)
 
-            print(f"[ORCHESTRATOR] ✓ Lead synthesis complete ({len(summary.get('key_findings', []))} findings)")
+            logger.info("Lead synthesis complete (%d findings)", len(summary.get('key_findings', [])))
             return summary
 
         except json.JSONDecodeError as e:
-            print(f"[ORCHESTRATOR] ⚠️  Synthesis parse failed: {e}")
+            logger.warning("Synthesis parse failed: %s", e)
             return self._fallback_summary(portfolio_analysis, risk_assessment, optimization)
 
     def _fallback_summary(
@@ -407,61 +939,41 @@ Return ONLY valid JSON:
         optimization: Dict
     ) -> Dict:
         """Fallback mechanical summary if lead synthesis fails"""
+        return SummaryData.from_results(
+            portfolio_analysis, risk_assessment, optimization
+        ).to_dict()
 
-        summary = {
-            "key_findings": [],
-            "recommendations": [],
-            "action_items": []
-        }
-
-        # Extract key metrics
-        if 'portfolio_value' in portfolio_analysis:
-            pv = portfolio_analysis['portfolio_value']
-            summary['key_findings'].append(
-                f"Portfolio Value: ${pv.get('total', 0):,.2f}"
-            )
-
-        if 'performance_metrics' in portfolio_analysis:
-            pm = portfolio_analysis['performance_metrics']
-            summary['key_findings'].append(
-                f"Sharpe Ratio: {pm.get('sharpe_ratio', 0):.2f}"
-            )
-            summary['key_findings'].append(
-                f"Max Drawdown: {pm.get('max_drawdown_pct', 0):.1f}%"
-            )
+    def save_report(self, filepath: str = None, pretty: bool = False):
+        """Save final report to JSON file (compact unless pretty=True)"""
+        if filepath is None:
+            filepath = f"portfolio_report_{self.session_id}.json"
 
-        # Risk highlights
-        if 'risk_scores' in risk_assessment:
-            rs = risk_assessment['risk_scores']
-            summary['key_findings'].append(
-                f"Overall Risk Score: {rs.get('overall', 0)}/10"
-            )
+        data = _report_bytes(self.results['final_report'], pretty)
+        with open(filepath, 'wb') as f:
+            f.write(data)
 
-        if 'recommendations' in risk_assessment:
-            summary['recommendations'].extend(risk_assessment['recommendations'])
+        if self._verbose:
+            print(f"💾 Report saved to: {filepath}")
+        return filepath
 
-        # Optimization actions
-        if 'rebalancing_trades' in optimization:
-            trades = optimization['rebalancing_trades']
-            if trades:
-                summary['action_items'].append(
-                    f"Rebalancing: {len(trades)} trades recommended"
-                )
-                for trade in trades[:3]:  # Top 3 trades
-                    action = f"{trade['action'].upper()} {trade['shares']} shares of {trade['symbol']}"
-                    summary['action_items'].append(action)
+    def save_report_pretty(self, filepath: str = None):
+        """Save final report as indented JSON, for reading by eye"""
+        return self.save_report(filepath, pretty=True)
 
-        return summary
+    async def save_report_async(self, filepath: str = None, pretty: bool = False):
+        """
+        Save final report to JSON file without blocking the event loop.
 
-    def save_report(self, filepath: str = None):
-        """Save final report to JSON file"""
+        Serialization and the file write both run in a worker thread.
+        """
         if filepath is None:
             filepath = f"portfolio_report_{self.session_id}.json"
 
-        with open(filepath, 'w') as f:
-            json.dump(self.results['final_report'], f, indent=2)
+        data = await asyncio.to_thread(_report_bytes, self.results['final_report'], pretty)
+        await asyncio.to_thread(Path(filepath).write_bytes, data)
 
-        print(f"💾 Report saved to: {filepath}")
+        if self._verbose:
+            print(f"💾 Report saved to: {filepath}")
         return filepath
 
 
@@ -481,17 +993,16 @@ async def main():
     }
 
     # Create orchestrator
-    orchestrator = MultiAgentOrchestrator()
-
-    # Run full analysis with agents working in parallel
-    report = await orchestrator.run_full_analysis(
-        portfolio=portfolio,
-        optimization_objective="max_sharpe",
-        constraints={
-            "max_position_size": 0.40,
-            "min_position_size": 0.05
-        }
-    )
+    async with MultiAgentOrchestrator() as orchestrator:
+        # Run full analysis with agents working in parallel
+        report = await orchestrator.run_full_analysis(
+            portfolio=portfolio,
+            optimization_objective="max_sharpe",
+            constraints={
+                "max_position_size": 0.40,
+                "min_position_size": 0.05
+            }
+        )
 
     # Print summary
     print("\n📊 EXECUTIVE SUMMARY")
@@ -509,8 +1020,9 @@ async def main():
         print(f"  ➤ {action}")
 
     # Save report
-    orchestrator.save_report()
+    await orchestrator.save_report_async()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s")
     asyncio.run(main())
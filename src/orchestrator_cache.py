@@ -0,0 +1,144 @@
+"""
+Async memoization for agent calls.
+
+Repeated analyses of the same portfolio (iterative UI, retries, backtest
+loops) would otherwise re-run every LLM agent. AsyncMemoCache keys results
+on a canonical hash of the inputs and coalesces concurrent identical calls
+onto a single in-flight task.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# Keys that change from run to run without changing what an agent is told:
+# fetch times and WebSearch bookkeeping
+_VOLATILE_FIELDS = frozenset({'timestamp', 'fetched_at', 'searches_performed'})
+
+
+def canonical_key(*parts: Any) -> str:
+    """
+    Stable hash of JSON-serializable values.
+
+    Dict key order and whitespace don't affect the key; non-JSON values
+    fall back to str().
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def stable_payload(payload: Any) -> Any:
+    """
+    payload without _VOLATILE_FIELDS, at any depth.
+
+    Agent results are keyed on exactly the market data each agent is sent;
+    only fields that differ between otherwise identical runs are dropped,
+    so any change in prices, news or ratings still misses the cache.
+    """
+    if isinstance(payload, dict):
+        return {
+            key: stable_payload(value)
+            for key, value in payload.items()
+            if key not in _VOLATILE_FIELDS
+        }
+    if isinstance(payload, (list, tuple)):
+        return [stable_payload(value) for value in payload]
+    return payload
+
+
+class AsyncMemoCache:
+    """
+    Bounded LRU cache of awaited results.
+
+    Concurrent callers with the same key share one task, so a burst of
+    identical requests costs a single agent round trip. Failed calls
+    (exceptions, or results rejected by `cacheable`) are not stored.
+    Every caller gets its own deep copy of the result. The shared task is
+    cancelled when the last caller waiting on it is cancelled.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Args:
+            maxsize: Maximum number of completed results kept
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results: "OrderedDict[str, Any]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[str, int] = {}
+
+    async def get_or_call(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Return the cached result for key, or await factory() to produce it.
+
+        Args:
+            key: Cache key (see canonical_key)
+            factory: Zero-argument callable returning the awaitable to run on a miss
+            cacheable: Optional predicate; results it rejects are returned
+                but not stored
+
+        Returns:
+            Deep copy of the result
+        """
+        if key in self._results:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(self._results[key])
+
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            # Left over from another event loop (a shared cache across
+            # asyncio.run calls); it can't be awaited here
+            task = None
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._store, key, cacheable))
+        else:
+            self.hits += 1
+
+        # shield: one caller being cancelled must not cancel the shared task,
+        # but once every caller has given up there is no point finishing it
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+        return copy.deepcopy(result)
+
+    def _store(self, key: str, cacheable: Optional[Callable[[Any], bool]], task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        result = task.result()
+        if cacheable is not None and not cacheable(result):
+            return
+
+        self._results[key] = result
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        """Drop all completed results (in-flight calls are unaffected)."""
+        self._results.clear()
@@ -0,0 +1,74 @@
+"""
+Optional Numba kernels for background simulations.
+
+Numba is not a hard dependency. When it is not installed NUMBA_AVAILABLE is
+False and BackgroundTaskManager falls back to its NumPy implementation.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Paths simulated per RNG seed, so a chunk's output depends only on its seeds
+# and blocks can be split across workers without changing results
+SEED_BLOCK = 64
+
+
+if NUMBA_AVAILABLE:
+
+    # Not parallel=True: the kernel runs inside executor workers, and a
+    # parallel region launched off the main thread can hang the TBB layer at
+    # interpreter exit. nogil lets it run without holding up the event loop.
+    # No fastmath: it would let LLVM reorder the Welford update, so seeded
+    # runs would no longer reproduce bit-for-bit.
+    @njit(cache=True, nogil=True)
+    def _mc_bootstrap_nb(log_prefix, out, horizon_days, block_size, block_seeds):
+        """
+        Block bootstrap of cumulative returns, one path per inner loop.
+
+        Takes the prefix sums of log1p(historical returns) (see _log_prefix),
+        so each block's log return is one subtraction, and streams each path's
+        total in a scalar: O(num_paths) memory, O(blocks) work per path.
+        Runs of block_size consecutive returns are drawn together (1 = i.i.d.).
+        Fills out (one cumulative return per path, any float dtype) in place;
+        block_seeds needs ceil(len(out) / SEED_BLOCK) entries. Accumulation
+        and the returned moments are float64 regardless of out's dtype.
+
+        Returns (mean, m2, num_losses): the Welford mean, sum of squared
+        deviations and count of negative returns, accumulated as paths finish.
+        """
+        num_paths = out.shape[0]
+        num_starts = log_prefix.shape[0] - block_size
+        mean = 0.0
+        m2 = 0.0
+        num_losses = 0
+
+        for b in range(block_seeds.shape[0]):
+            np.random.seed(block_seeds[b])
+            stop = min((b + 1) * SEED_BLOCK, num_paths)
+
+            for i in range(b * SEED_BLOCK, stop):
+                log_cum = 0.0
+                day = 0
+                while day < horizon_days:
+                    start = np.random.randint(0, num_starts)
+                    run = min(block_size, horizon_days - day)
+                    log_cum += log_prefix[start + run] - log_prefix[start]
+                    day += run
+                value = math.expm1(log_cum)
+                out[i] = value
+
+                delta = value - mean
+                mean += delta / (i + 1)
+                m2 += delta * (value - mean)
+                if value < 0:
+                    num_losses += 1
+
+        return mean, m2, num_losses
@@ -5,19 +5,286 @@ Uses asyncio to run Monte Carlo simulations and backtests without blocking.
 
 import asyncio
 import json
-from typing import Dict, Any, Callable, Optional
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from datetime import datetime
-from dataclasses import asdict
-import random
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from operator import attrgetter
+
+import numpy as np
+
+try:
+    import cupy as cp
+except ImportError:  # optional GPU backend
+    cp = None
+
+from ._numba import NUMBA_AVAILABLE, SEED_BLOCK
+
+if NUMBA_AVAILABLE:
+    from ._numba import _mc_bootstrap_nb
+
+
+logger = logging.getLogger(__name__)
+
+# Task states that can be evicted
+_TERMINAL_STATES = frozenset(('completed', 'failed', 'cancelled'))
+
+# Seconds between sweeps for result_ttl_seconds
+_SWEEP_INTERVAL = 60.0
+
+# Storage type for simulated path returns. Statistics are accumulated in
+# float64 as paths are produced; float32 is ample for the percentiles and
+# halves the shared buffer and the bytes the partition has to move.
+_PATH_DTYPE = np.float32
+
+# Max start indices per GPU batch (int64), bounding device memory
+_GPU_BATCH_ELEMENTS = 1 << 24
+
+# Paths simulated between progress updates
+_PROGRESS_CHUNK = 1000
+
+# Worker processes for CPU-bound simulation, created on first use
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _pool
+
+
+def _log_prefix(hr: np.ndarray) -> np.ndarray:
+    """[0, cumsum(log1p(hr))]: the log return of hr[a:b] is prefix[b] - prefix[a]."""
+    prefix = np.empty(hr.size + 1)
+    prefix[0] = 0.0
+    np.cumsum(np.log1p(hr), out=prefix[1:])
+    return prefix
+
+
+def _bootstrap_returns(
+    log_prefix: np.ndarray,
+    num_paths: int,
+    horizon_days: int,
+    rng: np.random.Generator,
+    block_size: int = 1
+) -> np.ndarray:
+    """
+    Block bootstrap of cumulative returns.
+
+    Each path is built from randomly chosen runs of block_size consecutive
+    historical returns (block_size=1 is the plain i.i.d. bootstrap), which
+    keeps the serial correlation within a block. Working in log space with
+    the _log_prefix sums makes each block's return a single subtraction, so
+    memory is O(num_paths * blocks) rather than O(num_paths * horizon_days),
+    and long horizons can't overflow.
+
+    Returns:
+        Array of num_paths cumulative returns
+    """
+    num_starts = log_prefix.size - block_size
+    num_blocks = -(-horizon_days // block_size)
+    starts = rng.integers(0, num_starts, size=(num_paths, num_blocks))
+
+    # Full blocks, then a final partial block if horizon_days isn't a multiple
+    num_full, remainder = divmod(horizon_days, block_size)
+    full = starts[:, :num_full]
+    total = (log_prefix[full + block_size] - log_prefix[full]).sum(axis=1)
+    if remainder:
+        last = starts[:, -1]
+        total += log_prefix[last + remainder] - log_prefix[last]
+    return np.expm1(total)
+
+
+def _simulate_chunk(
+    log_prefix: np.ndarray,
+    shm_name: str,
+    start: int,
+    num_paths: int,
+    horizon_days: int,
+    block_size: int,
+    seed_seq: np.random.SeedSequence
+) -> Tuple[float, float, int]:
+    """
+    Bootstrap num_paths cumulative returns, on the Numba kernel when available.
+
+    Runs in a worker process. Paths are written straight into the parent's
+    shared-memory array at [start, start + num_paths), so only the summary
+    comes back through the pool; the chunk takes its own child SeedSequence
+    rather than a shared Generator.
+
+    Returns:
+        (mean, m2, num_losses) - m2 is the sum of squared deviations from the
+        mean, for merging with _merge_moments
+    """
+    rng = np.random.Generator(np.random.PCG64(seed_seq))
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        itemsize = np.dtype(_PATH_DTYPE).itemsize
+        out = np.ndarray((num_paths,), dtype=_PATH_DTYPE, buffer=shm.buf, offset=start * itemsize)
+        if NUMBA_AVAILABLE:
+            block_seeds = rng.integers(0, 2**31 - 1, size=-(-num_paths // SEED_BLOCK))
+            mean, m2, num_losses = _mc_bootstrap_nb(log_prefix, out, horizon_days, block_size, block_seeds)
+        else:
+            chunk = _bootstrap_returns(log_prefix, num_paths, horizon_days, rng, block_size)
+            out[:] = chunk
+            mean = float(chunk.mean())
+            deviations = chunk - mean
+            m2 = float(np.dot(deviations, deviations))
+            num_losses = int(np.count_nonzero(chunk < 0))
+        del out  # release the view before closing the mapping
+    finally:
+        shm.close()
+
+    return mean, m2, num_losses
+
+
+def _gpu_stats(
+    log_prefix: np.ndarray,
+    num_simulations: int,
+    horizon_days: int,
+    block_size: int,
+    seed_seq: np.random.SeedSequence
+) -> Dict[str, float]:
+    """
+    CuPy version of the block bootstrap plus its summary statistics.
+
+    Same sampling as _bootstrap_returns, run on the device in batches that
+    bound the start-index matrix to _GPU_BATCH_ELEMENTS. Paths never leave
+    the GPU; only the summary is copied back. Blocking - call via a thread.
+    """
+    rng = cp.random.default_rng(int(seed_seq.generate_state(1)[0]))
+    prefix = cp.asarray(log_prefix)
+    num_starts = log_prefix.size - block_size
+    num_blocks = -(-horizon_days // block_size)
+    num_full, remainder = divmod(horizon_days, block_size)
+    batch = max(1, _GPU_BATCH_ELEMENTS // num_blocks)
+
+    paths = cp.empty(num_simulations)
+    for start in range(0, num_simulations, batch):
+        stop = min(start + batch, num_simulations)
+        starts = rng.integers(0, num_starts, size=(stop - start, num_blocks))
+        full = starts[:, :num_full]
+        total = (prefix[full + block_size] - prefix[full]).sum(axis=1)
+        if remainder:
+            last = starts[:, -1]
+            total += prefix[last + remainder] - prefix[last]
+        paths[start:stop] = cp.expm1(total)
+
+    n = num_simulations
+    k5, k50, k95 = int(0.05 * n), n // 2, int(0.95 * n)
+    ordered = cp.sort(paths)
+    var_95 = abs(float(ordered[k5]))
+    return {
+        'mean_return': float(paths.mean()),
+        'median_return': float(ordered[k50]),
+        'std_return': float(paths.std()),
+        'percentile_5': float(ordered[k5]),
+        'percentile_95': float(ordered[k95]),
+        'var_95': var_95,
+        'expected_shortfall_95': abs(float(ordered[:k5].mean())) if k5 else 0,
+        'probability_loss': int((paths < 0).sum()) / n
+    }
+
+
+def _merge_moments(
+    count: int, mean: float, m2: float,
+    other_count: int, other_mean: float, other_m2: float
+) -> Tuple[int, float, float]:
+    """Combine two (count, mean, m2) summaries (Chan et al. parallel Welford)."""
+    total = count + other_count
+    delta = other_mean - mean
+    mean += delta * other_count / total
+    m2 += other_m2 + delta * delta * count * other_count / total
+    return total, mean, m2
+
+
+def _dataclass_records(items: List[Any]) -> List[Dict[str, Any]]:
+    """
+    [asdict(item) for item in items] for a list of same-type dataclasses.
+
+    Field names are resolved once and read with a single attrgetter; values
+    are shared rather than deep-copied. Nested dataclass fields (e.g. a
+    result's BacktestPeriod) are still converted to dicts.
+    """
+    if not items:
+        return []
+
+    names = tuple(f.name for f in fields(items[0]))
+    getter = attrgetter(*names)
+    if len(names) == 1:
+        rows = [(getter(item),) for item in items]
+    else:
+        rows = [getter(item) for item in items]
+
+    records = [dict(zip(names, row)) for row in rows]
+    for name in names:
+        column = [record[name] for record in records]
+        if column and all(is_dataclass(value) for value in column):
+            for record, nested in zip(records, _dataclass_records(column)):
+                record[name] = nested
+    return records
+
+
+def _finished_at(status: Dict[str, Any]) -> float:
+    """Epoch seconds a finished task's status entry was recorded."""
+    return status.get('completed_at') or status.get('failed_at') or status.get('cancelled_at') or 0.0
+
+
+def _render_status(status: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a status entry with its epoch-second '*_at' fields as ISO strings."""
+    return {
+        key: datetime.fromtimestamp(value).isoformat() if key.endswith('_at') else value
+        for key, value in status.items()
+    }
+
+
+def _constant_return_stats(daily_return: float, num_simulations: int, horizon_days: int) -> Dict[str, float]:
+    """
+    Closed-form Monte Carlo summary when every historical return is equal.
+
+    Same fields and definitions as a simulated run, without sampling.
+    """
+    value = math.expm1(horizon_days * math.log1p(daily_return))
+    has_tail = int(0.05 * num_simulations) > 0
+    return {
+        'mean_return': value,
+        'median_return': value,
+        'std_return': 0.0,
+        'percentile_5': value,
+        'percentile_95': value,
+        'var_95': abs(value),
+        'expected_shortfall_95': abs(value) if has_tail else 0,
+        'probability_loss': 1.0 if value < 0 else 0.0
+    }
 
 
 class BackgroundTaskManager:
     """Manages long-running tasks in background"""
 
-    def __init__(self):
-        self.tasks = {}
+    def __init__(self, max_entries: int = 1000, result_ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Tasks kept before the oldest finished ones are
+                dropped (running tasks are never evicted)
+            result_ttl_seconds: Optional time after finishing at which a task
+                and its result are dropped, swept every minute
+        """
+        self.max_entries = max_entries
+        self.result_ttl_seconds = result_ttl_seconds
+        self._sweeper: Optional[asyncio.Task] = None
+
+        # Kept in registration order, oldest first
+        self.tasks: "OrderedDict[str, asyncio.Task]" = OrderedDict()
         self.results = {}
-        self.status = {}
+        # Timestamps are stored as epoch seconds; get_status renders them
+        self.status: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 
     async def run_monte_carlo_background(
         self,
@@ -25,88 +292,84 @@ class BackgroundTaskManager:
         historical_returns: list,
         num_simulations: int = 10000,
         horizon_days: int = 252,
-        callback: Optional[Callable] = None
+        callback: Optional[Callable] = None,
+        block_size: int = 21,
+        seed: Optional[int] = None,
+        backend: str = 'cpu'
     ) -> str:
         """
         Run Monte Carlo simulation in background.
 
         Args:
             task_id: Unique task identifier
-            historical_returns: List of daily returns
+            historical_returns: List of daily returns (finite, each > -1)
             num_simulations: Number of paths to simulate
             horizon_days: Forecast horizon (252 = 1 year)
             callback: Optional callback when complete
+            block_size: Consecutive days resampled together (21 = one trading
+                month) to preserve serial correlation; 1 = i.i.d. bootstrap.
+                Must be smaller than len(historical_returns).
+            seed: RNG seed for a reproducible run. When omitted, fresh entropy
+                is used; either way the seed is reported in the result.
+            backend: 'cpu' (worker processes) or 'gpu' (CuPy, worth it for
+                around 1e6+ paths); 'gpu' falls back to 'cpu' if CuPy is
+                not installed
 
         Returns:
             Task ID for checking status
         """
+        if block_size < 1:
+            raise ValueError(f"block_size must be >= 1, got {block_size}")
+        if backend not in ('cpu', 'gpu'):
+            raise ValueError(f"backend must be 'cpu' or 'gpu', got {backend!r}")
+        if backend == 'gpu' and cp is None:
+            logger.warning("CuPy is not installed; running Monte Carlo %s on CPU", task_id)
+            backend = 'cpu'
+
+        # Validated once here rather than discovered inside the simulation
+        hr = np.ascontiguousarray(historical_returns, dtype=np.float64)
+        if hr.size < 2:
+            raise ValueError(f"historical_returns needs at least 2 values, got {hr.size}")
+        if not np.isfinite(hr).all() or hr.min() <= -1:
+            # log1p(-1) is -inf, which poisons every later _log_prefix sum
+            raise ValueError("historical_returns must be finite and greater than -1 (a total loss)")
+        if hr.size <= block_size:
+            # A block spanning the whole history has a single start, so every
+            # path would be the same and std/VaR/ES would all be 0
+            raise ValueError(
+                f"historical_returns needs more than block_size={block_size} values, "
+                f"got {hr.size}; pass a smaller block_size"
+            )
+        seed_seq = np.random.SeedSequence(seed)
+
         self.status[task_id] = {
             'status': 'running',
             'progress': 0,
-            'started_at': datetime.now().isoformat()
+            'started_at': time.time()
         }
 
         async def monte_carlo_task():
             try:
                 print(f"[BackgroundTask] Starting Monte Carlo ({num_simulations} simulations)...")
 
-                simulated_returns = []
-
-                for i in range(num_simulations):
-                    # Bootstrap resampling
-                    path_returns = [
-                        random.choice(historical_returns)
-                        for _ in range(horizon_days)
-                    ]
-
-                    # Calculate cumulative return
-                    cumulative_return = 1.0
-                    for r in path_returns:
-                        cumulative_return *= (1 + r)
-
-                    simulated_returns.append(cumulative_return - 1)
-
-                    # Update progress every 1000 simulations
-                    if (i + 1) % 1000 == 0:
-                        progress = (i + 1) / num_simulations
-                        self.status[task_id]['progress'] = progress
-                        print(f"[BackgroundTask] Progress: {progress*100:.0f}%")
-
-                # Sort for percentiles
-                simulated_returns.sort()
-
-                # Calculate statistics
-                mean_return = sum(simulated_returns) / len(simulated_returns)
-                median_return = simulated_returns[len(simulated_returns) // 2]
-
-                # Calculate std
-                variance = sum((r - mean_return) ** 2 for r in simulated_returns) / len(simulated_returns)
-                std_return = variance ** 0.5
-
-                # Percentiles
-                percentile_5 = simulated_returns[int(0.05 * len(simulated_returns))]
-                percentile_95 = simulated_returns[int(0.95 * len(simulated_returns))]
-
-                # VaR and CVaR (Expected Shortfall)
-                var_95 = abs(percentile_5)
-                losses = [r for r in simulated_returns if r < 0]
-                tail_losses = simulated_returns[:int(0.05 * len(simulated_returns))]
-                expected_shortfall_95 = abs(sum(tail_losses) / len(tail_losses)) if tail_losses else 0
-
-                # Probability of loss
-                num_losses = sum(1 for r in simulated_returns if r < 0)
-                probability_loss = num_losses / len(simulated_returns)
+                hr_min, hr_max = float(hr.min()), float(hr.max())
+                if hr_min == hr_max:
+                    # Every path is the same compounded return; nothing to sample
+                    stats = _constant_return_stats(hr_min, num_simulations, horizon_days)
+                elif backend == 'gpu':
+                    stats = await asyncio.to_thread(
+                        _gpu_stats, _log_prefix(hr), num_simulations, horizon_days,
+                        block_size, seed_seq
+                    )
+                else:
+                    stats = await self._simulate_stats(
+                        task_id, hr, num_simulations, horizon_days, block_size, seed_seq
+                    )
 
                 result = {
                     'num_simulations': num_simulations,
-                    'mean_return': mean_return,
-                    'median_return': median_return,
-                    'std_return': std_return,
-                    'percentile_5': percentile_5,
-                    'percentile_95': percentile_95,
-                    'var_95': var_95,
-                    'expected_shortfall_95': expected_shortfall_95,
-                    'probability_loss': probability_loss,
+                    **stats,
+                    'seed': seed_seq.entropy,
                     'completed_at': datetime.now().isoformat()
                 }
 
@@ -114,13 +377,13 @@ class BackgroundTaskManager:
                 self.status[task_id] = {
                     'status': 'completed',
                     'progress': 1.0,
-                    'completed_at': datetime.now().isoformat()
+                    'completed_at': time.time()
                 }
 
                 print(f"[BackgroundTask] ✓ Monte Carlo complete")
-                print(f"[BackgroundTask] Mean return: {mean_return*100:.2f}%")
-                print(f"[BackgroundTask] VaR 95%: {var_95*100:.2f}%")
-                print(f"[BackgroundTask] Prob of loss: {probability_loss*100:.1f}%")
+                print(f"[BackgroundTask] Mean return: {stats['mean_return']*100:.2f}%")
+                print(f"[BackgroundTask] VaR 95%: {stats['var_95']*100:.2f}%")
+                print(f"[BackgroundTask] Prob of loss: {stats['probability_loss']*100:.1f}%")
 
                 if callback:
                     await callback(result)
@@ -131,7 +394,7 @@ class BackgroundTaskManager:
                 self.status[task_id] = {
                     'status': 'failed',
                     'error': str(e),
-                    'failed_at': datetime.now().isoformat()
+                    'failed_at': time.time()
                 }
                 print(f"[BackgroundTask] ❌ Monte Carlo failed: {e}")
                 raise
@@ -139,9 +402,112 @@ class BackgroundTaskManager:
         # Start task in background
         task = asyncio.create_task(monte_carlo_task())
         self.tasks[task_id] = task
+        self._track(task_id)
 
         return task_id
 
+    async def _simulate_stats(
+        self,
+        task_id: str,
+        hr: np.ndarray,
+        num_simulations: int,
+        horizon_days: int,
+        block_size: int,
+        seed_seq: np.random.SeedSequence
+    ) -> Dict[str, float]:
+        """Bootstrap the paths in worker processes and summarize them."""
+        # Computed once per run and shipped to every chunk
+        log_prefix = _log_prefix(hr)
+        loop = asyncio.get_running_loop()
+        pool = _process_pool()
+
+        # Workers write paths into one shared buffer instead of pickling
+        # them back; only per-chunk summaries cross the process boundary
+        itemsize = np.dtype(_PATH_DTYPE).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(num_simulations, 1) * itemsize)
+        simulated_returns = np.ndarray((num_simulations,), dtype=_PATH_DTYPE, buffer=shm.buf)
+
+        # Chunks run in worker processes so the event loop stays free;
+        # progress updates as each 1000-path chunk lands
+        async def run_chunk(start: int, chunk_seq: np.random.SeedSequence):
+            num_paths = min(_PROGRESS_CHUNK, num_simulations - start)
+            summary = await loop.run_in_executor(
+                pool, _simulate_chunk, log_prefix, shm.name, start, num_paths,
+                horizon_days, block_size, chunk_seq
+            )
+            return start, num_paths, summary
+
+        # One independent PCG64 stream per chunk, so results depend
+        # only on the seed, not on which worker ran what
+        starts = range(0, num_simulations, _PROGRESS_CHUNK)
+        chunks = [
+            asyncio.ensure_future(run_chunk(start, chunk_seq))
+            for start, chunk_seq in zip(starts, seed_seq.spawn(len(starts)))
+        ]
+
+        chunk_moments = [None] * len(chunks)
+        num_losses = 0
+        done_paths = 0
+        try:
+            for next_done in asyncio.as_completed(chunks):
+                start, num_paths, (chunk_mean, chunk_m2, chunk_losses) = await next_done
+                chunk_moments[start // _PROGRESS_CHUNK] = (num_paths, chunk_mean, chunk_m2)
+                num_losses += chunk_losses
+                done_paths += num_paths
+
+                if num_paths == _PROGRESS_CHUNK:
+                    progress = done_paths / num_simulations
+                    self.status[task_id]['progress'] = progress
+                    logger.debug("Monte Carlo %s progress: %.0f%%", task_id, progress * 100)
+
+            # Partial sort copies out of the shared buffer: only the order
+            # statistics we report are placed, everything below k5 ends up in
+            # part[:k5] (the loss tail)
+            n = num_simulations
+            k5, k50, k95 = int(0.05 * n), n // 2, int(0.95 * n)
+            part = np.partition(simulated_returns, (k5, k50, k95))
+        finally:
+            # Cancelled or failed: drop chunks that haven't started
+            for chunk_task in chunks:
+                chunk_task.cancel()
+            del simulated_returns
+            shm.close()
+            shm.unlink()
+
+        # Mean/std/loss count come from the pass that produced the paths
+        # (Welford summaries merged in chunk order, so a seeded run is
+        # bit-for-bit reproducible); only the partition touches the array again
+        count, mean_return, m2 = 0, 0.0, 0.0
+        for moments in chunk_moments:
+            count, mean_return, m2 = _merge_moments(count, mean_return, m2, *moments)
+        std_return = math.sqrt(m2 / count)
+
+        # Calculate statistics
+        median_return = float(part[k50])
+
+        # Percentiles
+        percentile_5 = float(part[k5])
+        percentile_95 = float(part[k95])
+
+        # VaR and CVaR (Expected Shortfall)
+        var_95 = abs(percentile_5)
+        tail_losses = part[:k5]
+        expected_shortfall_95 = abs(float(tail_losses.mean(dtype=np.float64))) if tail_losses.size else 0
+
+        # Probability of loss
+        probability_loss = num_losses / n
+
+        return {
+            'mean_return': mean_return,
+            'median_return': median_return,
+            'std_return': std_return,
+            'percentile_5': percentile_5,
+            'percentile_95': percentile_95,
+            'var_95': var_95,
+            'expected_shortfall_95': expected_shortfall_95,
+            'probability_loss': probability_loss
+        }
+
     async def run_walk_forward_background(
         self,
         task_id: str,
@@ -172,7 +538,7 @@ class BackgroundTaskManager:
         self.status[task_id] = {
             'status': 'running',
             'progress': 0,
-            'started_at': datetime.now().isoformat()
+            'started_at': time.time()
         }
 
         async def walk_forward_task():
@@ -194,7 +560,7 @@ class BackgroundTaskManager:
                 )
 
                 # Convert dataclass to dict
-                results_dict = [asdict(r) for r in results]
+                results_dict = _dataclass_records(results)
 
                 self.results[task_id] = {
                     'iterations': len(results_dict),
@@ -205,7 +571,7 @@ class BackgroundTaskManager:
                 self.status[task_id] = {
                     'status': 'completed',
                     'progress': 1.0,
-                    'completed_at': datetime.now().isoformat()
+                    'completed_at': time.time()
                 }
 
                 print(f"[BackgroundTask] ✓ Walk-Forward complete ({len(results_dict)} iterations)")
@@ -219,7 +585,7 @@ class BackgroundTaskManager:
                 self.status[task_id] = {
                     'status': 'failed',
                     'error': str(e),
-                    'failed_at': datetime.now().isoformat()
+                    'failed_at': time.time()
                 }
                 print(f"[BackgroundTask] ❌ Walk-Forward failed: {e}")
                 raise
@@ -227,9 +593,51 @@ class BackgroundTaskManager:
         # Start task in background
         task = asyncio.create_task(walk_forward_task())
         self.tasks[task_id] = task
+        self._track(task_id)
 
         return task_id
 
+    def _track(self, task_id: str):
+        """Mark task_id newest, enforce max_entries, start the TTL sweeper."""
+        self.tasks.move_to_end(task_id)
+        self.status.move_to_end(task_id)
+
+        excess = len(self.tasks) - self.max_entries
+        if excess > 0:
+            finished = [
+                tid for tid in self.tasks
+                if self.status.get(tid, {}).get('status') in _TERMINAL_STATES
+            ]
+            for tid in finished[:excess]:
+                self._forget(tid)
+
+        if self.result_ttl_seconds is not None and self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_expired())
+
+    def _forget(self, task_id: str):
+        self.tasks.pop(task_id, None)
+        self.results.pop(task_id, None)
+        self.status.pop(task_id, None)
+
+    async def _sweep_expired(self):
+        """Drop finished tasks older than result_ttl_seconds, periodically."""
+        while True:
+            await asyncio.sleep(min(_SWEEP_INTERVAL, self.result_ttl_seconds))
+            cutoff = time.time() - self.result_ttl_seconds
+            expired = [
+                tid for tid, status in self.status.items()
+                if status.get('status') in _TERMINAL_STATES
+                and _finished_at(status) < cutoff
+            ]
+            for tid in expired:
+                self._forget(tid)
+
+    def close(self):
+        """Stop the TTL sweeper (running tasks are left alone)."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
     def get_status(self, task_id: str) -> Dict[str, Any]:
         """
         Get status of a background task.
@@ -238,9 +646,12 @@ class BackgroundTaskManager:
             task_id: Task identifier
 
         Returns:
-            Status dict with 'status', 'progress', timestamps
+            Status dict with 'status', 'progress', ISO timestamps
         """
-        return self.status.get(task_id, {'status': 'not_found'})
+        status = self.status.get(task_id)
+        if status is None:
+            return {'status': 'not_found'}
+        return _render_status(status)
 
     def get_result(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -312,7 +723,7 @@ class BackgroundTaskManager:
             task.cancel()
             self.status[task_id] = {
                 'status': 'cancelled',
-                'cancelled_at': datetime.now().isoformat()
+                'cancelled_at': time.time()
             }
             return True
 
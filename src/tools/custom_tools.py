@@ -3,10 +3,170 @@ Custom Tools for Claude Agent SDK
 Provides fast, specialized functions for portfolio analysis.
 """
 
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from collections import OrderedDict
 import yfinance as yf
 from datetime import datetime
 import asyncio
+import math
+import time
+
+import numpy as np
+
+
+# Short-lived cache of yf.Ticker(symbol).history(period) results (and
+# fast_info quotes, under period "fast_info"), so tool calls in the same
+# turn don't re-download overlapping symbols
+_HISTORY_CACHE_MAXSIZE = 2048
+_HISTORY_CACHE_TTL = 30.0  # seconds
+_history_cache: "OrderedDict[Tuple[str, str], Tuple[float, object]]" = OrderedDict()
+_history_inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+_history_stats = {'hits': 0, 'misses': 0}
+
+
+def _history_cache_get(key: Tuple[str, str]):
+    """Fresh cached history for key, or None."""
+    entry = _history_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        _history_cache.move_to_end(key)
+        return entry[1]
+    return None
+
+
+def _history_cache_put(key: Tuple[str, str], hist):
+    _history_cache[key] = (time.monotonic() + _HISTORY_CACHE_TTL, hist)
+    _history_cache.move_to_end(key)
+    while len(_history_cache) > _HISTORY_CACHE_MAXSIZE:
+        _history_cache.popitem(last=False)
+
+
+async def _cached_history(symbol: str, period: str):
+    """
+    yf.Ticker(symbol).history(period=period), cached for _HISTORY_CACHE_TTL.
+
+    Concurrent requests for the same key share one download. Failed
+    downloads are not cached. The returned DataFrame is shared; treat it as
+    read-only.
+    """
+    key = (symbol, period)
+    hist = _history_cache_get(key)
+    if hist is not None:
+        _history_stats['hits'] += 1
+        return hist
+
+    future = _history_inflight.get(key)
+    if future is not None:
+        _history_stats['hits'] += 1
+        return await asyncio.shield(future)
+
+    _history_stats['misses'] += 1
+    future = asyncio.ensure_future(
+        asyncio.to_thread(lambda: yf.Ticker(symbol).history(period=period))
+    )
+    _history_inflight[key] = future
+    try:
+        hist = await asyncio.shield(future)
+    finally:
+        _history_inflight.pop(key, None)
+
+    _history_cache_put(key, hist)
+    return hist
+
+
+async def _fast_quote(symbol: str) -> Optional[Tuple[float, float, int]]:
+    """
+    (last_price, previous_close, last_volume) from yf.Ticker.fast_info.
+
+    A lightweight quote lookup instead of downloading days of OHLCV. Cached
+    like _cached_history. Returns None when fast_info has no usable price,
+    so the caller can fall back to history().
+    """
+    key = (symbol, "fast_info")
+    quote = _history_cache_get(key)
+    if quote is not None:
+        _history_stats['hits'] += 1
+        return quote
+
+    def read_fast_info():
+        info = yf.Ticker(symbol).fast_info
+        return info.last_price, info.previous_close, info.last_volume
+
+    try:
+        price, prev_close, volume = await asyncio.to_thread(read_fast_info)
+    except Exception:
+        return None
+
+    if price is None or not math.isfinite(price) or price <= 0:
+        return None
+
+    _history_stats['misses'] += 1
+    quote = (float(price), prev_close, volume)
+    _history_cache_put(key, quote)
+    return quote
+
+
+async def _download_histories(symbols: List[str], period: str) -> Dict[str, object]:
+    """
+    Histories for several symbols in one batched yf.download request.
+
+    Results are cached like _cached_history. Symbols missing from the
+    response (or the whole batch, on error) are left out of the returned
+    dict so callers can fall back to per-symbol requests.
+    """
+    try:
+        df = await asyncio.to_thread(
+            yf.download, " ".join(symbols), period=period,
+            group_by="ticker", progress=False, threads=True
+        )
+    except Exception:
+        return {}
+
+    if df is None or df.empty:
+        return {}
+
+    histories = {}
+    multi = df.columns.nlevels > 1
+    tickers = set(df.columns.get_level_values(0)) if multi else set()
+    for symbol in symbols:
+        if multi:
+            if symbol not in tickers:
+                continue
+            hist = df[symbol]
+        elif len(symbols) == 1:
+            hist = df
+        else:
+            continue
+
+        # Dates are aligned across tickers; drop rows this symbol didn't trade
+        hist = hist.dropna(subset=['Close'])
+        if len(hist) == 0:
+            continue
+
+        _history_stats['misses'] += 1
+        _history_cache_put((symbol, period), hist)
+        histories[symbol] = hist
+
+    return histories
+
+
+class Trade(NamedTuple):
+    """A candidate trade, as passed to validate_trade_constraints."""
+    symbol: str
+    action: str  # 'BUY' or 'SELL'
+    shares: float
+    price: float
+    average_cost: Optional[float] = None  # defaults to price
+
+    @classmethod
+    def from_dict(cls, trade: Dict) -> "Trade":
+        return cls(
+            trade['symbol'], trade['action'], trade['shares'], trade['price'],
+            trade.get('average_cost')
+        )
+
+
+# Selling below average cost by more than this is flagged
+_SELL_LOSS_THRESHOLD = -0.10
 
 
 class CustomPortfolioTools:
@@ -25,11 +185,39 @@ class CustomPortfolioTools:
         """
         result = {}
 
-        # Process symbols in parallel
+        # One batched download for everything not already cached; symbols it
+        # misses fall back to a per-symbol request in fetch_single
+        uncached = [
+            symbol for symbol in dict.fromkeys(symbols)
+            if _history_cache_get((symbol, "5d")) is None
+            and _history_cache_get((symbol, "fast_info")) is None
+        ]
+        batch = await _download_histories(uncached, "5d") if len(uncached) > 1 else {}
+
         async def fetch_single(symbol: str):
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period="5d")
+                hist = batch.get(symbol)
+                if hist is None and _history_cache_get((symbol, "5d")) is None:
+                    # Quote endpoint first; history() only if it has no price
+                    quote = await _fast_quote(symbol)
+                    if quote is not None:
+                        current_price, prev_price, volume = quote
+                        if prev_price and math.isfinite(prev_price):
+                            change_pct = (current_price / prev_price - 1) * 100
+                        else:
+                            change_pct = 0.0
+
+                        return symbol, {
+                            'price': current_price,
+                            'change_pct': change_pct,
+                            'volume': int(volume) if volume and math.isfinite(volume) else 0,
+                            'timestamp': datetime.now().isoformat(),
+                            'data_source': 'yfinance (real-time)',
+                            'status': 'success'
+                        }
+
+                if hist is None:
+                    hist = await _cached_history(symbol, "5d")
 
                 if len(hist) > 0:
                     current_price = float(hist['Close'].iloc[-1])
@@ -61,7 +249,7 @@ class CustomPortfolioTools:
                     'error': str(e)
                 }
 
-        # Fetch all symbols in parallel
+        # Fallback fetches run in parallel
         tasks = [fetch_single(symbol) for symbol in symbols]
         results = await asyncio.gather(*tasks)
 
@@ -82,7 +270,13 @@ class CustomPortfolioTools:
         Returns:
             Dict with total_value, weights, concentration metrics
         """
-        total_value = sum(h['shares'] * h.get('price', 0) for h in holdings)
+        # One pass over the holdings into column arrays
+        symbols = [h['symbol'] for h in holdings]
+        shares = np.array([h['shares'] for h in holdings], dtype=np.float64)
+        prices = np.array([h.get('price', 0) for h in holdings], dtype=np.float64)
+
+        values = shares * prices
+        total_value = float(values.sum())
 
         if total_value == 0:
             return {
@@ -91,18 +285,14 @@ class CustomPortfolioTools:
             }
 
         # Calculate weights
-        weights = []
-        for holding in holdings:
-            position_value = holding['shares'] * holding.get('price', 0)
-            weight = position_value / total_value
-            weights.append({
-                'symbol': holding['symbol'],
-                'weight': weight,
-                'value': position_value
-            })
+        position_weights = values / total_value
+        weights = [
+            {'symbol': symbol, 'weight': weight, 'value': value}
+            for symbol, weight, value in zip(symbols, position_weights.tolist(), values.tolist())
+        ]
 
         # Herfindahl index (concentration)
-        hhi = sum(w['weight'] ** 2 for w in weights)
+        hhi = float(np.dot(position_weights, position_weights))
         effective_n = 1 / hhi if hhi > 0 else 0
 
         # Concentration category
@@ -140,17 +330,31 @@ class CustomPortfolioTools:
 
         for symbol in symbols:
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period="1d")
+                hist = await _cached_history(symbol, "1d")
                 result[symbol] = len(hist) > 0
             except:
                 result[symbol] = False
 
         return result
 
+    @staticmethod
+    def clear_cache():
+        """Drop cached price histories (e.g. to force a fresh quote)."""
+        _history_cache.clear()
+
+    @staticmethod
+    def cache_stats() -> Dict[str, int]:
+        """
+        Price history cache counters.
+
+        Returns:
+            Dict with hits, misses and current size
+        """
+        return {**_history_stats, 'size': len(_history_cache)}
+
     @staticmethod
     def validate_trade_constraints(
-        trade: Dict,
+        trade: Union[Dict, Trade],
         current_portfolio: Dict,
         constraints: Dict
     ) -> Dict:
@@ -158,21 +362,24 @@ class CustomPortfolioTools:
         Validate if a trade respects portfolio constraints.
 
         Args:
-            trade: {symbol, action, shares, price}
+            trade: {symbol, action, shares, price} dict or Trade
             current_portfolio: Current portfolio dict
             constraints: {max_position_size, min_position_size, max_sector_exposure}
 
         Returns:
             Dict with valid: bool, reason: str
         """
+        if not isinstance(trade, Trade):
+            trade = Trade.from_dict(trade)
+
         max_pos = constraints.get('max_position_size', 0.35)
         min_pos = constraints.get('min_position_size', 0.05)
 
         # Calculate new portfolio value
         current_value = current_portfolio.get('total_value', 0)
-        trade_value = trade['shares'] * trade['price']
+        trade_value = trade.shares * trade.price
 
-        if trade['action'] == 'BUY':
+        if trade.action == 'BUY':
             new_value = current_value + trade_value
             position_weight = trade_value / new_value if new_value > 0 else 0
 
@@ -182,12 +389,12 @@ class CustomPortfolioTools:
                     'reason': f'Position would exceed max size ({position_weight:.1%} > {max_pos:.1%})'
                 }
 
-        elif trade['action'] == 'SELL':
+        elif trade.action == 'SELL':
             # Check if selling into loss >10%
-            avg_cost = trade.get('average_cost', trade['price'])
-            loss_pct = (trade['price'] - avg_cost) / avg_cost if avg_cost > 0 else 0
+            avg_cost = trade.price if trade.average_cost is None else trade.average_cost
+            loss_pct = (trade.price - avg_cost) / avg_cost if avg_cost > 0 else 0
 
-            if loss_pct < -0.10:
+            if loss_pct < _SELL_LOSS_THRESHOLD:
                 return {
                     'valid': False,
                     'reason': f'Selling at {loss_pct:.1%} loss (>10% threshold)',
@@ -198,3 +405,45 @@ class CustomPortfolioTools:
             'valid': True,
             'reason': 'Trade respects all constraints'
         }
+
+    @staticmethod
+    def validate_trade_constraints_batch(
+        trades: Sequence[Union[Dict, Trade]],
+        current_portfolio: Dict,
+        constraints: Dict
+    ) -> np.ndarray:
+        """
+        Vectorized validate_trade_constraints for many candidate trades.
+
+        Each trade is checked independently against the current portfolio,
+        with the same rules as the single-trade version.
+
+        Args:
+            trades: Trade dicts or Trade tuples
+            current_portfolio: Current portfolio dict
+            constraints: {max_position_size, ...}
+
+        Returns:
+            Boolean array, True where the single-trade check would report valid
+        """
+        trades = [t if isinstance(t, Trade) else Trade.from_dict(t) for t in trades]
+        max_pos = constraints.get('max_position_size', 0.35)
+        current_value = current_portfolio.get('total_value', 0)
+
+        actions = np.array([t.action for t in trades])
+        shares = np.array([t.shares for t in trades], dtype=np.float64)
+        prices = np.array([t.price for t in trades], dtype=np.float64)
+        avg_costs = np.array(
+            [t.price if t.average_cost is None else t.average_cost for t in trades],
+            dtype=np.float64
+        )
+
+        trade_values = shares * prices
+        new_values = current_value + trade_values
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights = np.where(new_values > 0, trade_values / new_values, 0.0)
+            loss_pcts = np.where(avg_costs > 0, (prices - avg_costs) / avg_costs, 0.0)
+
+        too_large = (actions == 'BUY') & (weights > max_pos)
+        selling_at_loss = (actions == 'SELL') & (loss_pcts < _SELL_LOSS_THRESHOLD)
+        return ~(too_large | selling_at_loss)
@@ -0,0 +1,38 @@
+"""
+Optional Numba kernels for portfolio metrics.
+
+Numba is not a hard dependency. When it is not installed NUMBA_AVAILABLE is
+False and PortfolioMetrics falls back to its NumPy implementations.
+Kernels take contiguous float64 arrays.
+"""
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _max_dd_nb(values):
+        """
+        Maximum drawdown in one pass, without a running-peak array.
+
+        Points whose running peak is <= 0 have no defined drawdown and are
+        skipped, as in PortfolioMetrics' NumPy fallback.
+        """
+        peak = values[0]
+        max_dd = 0.0
+
+        for i in range(values.shape[0]):
+            value = values[i]
+            if value > peak:
+                peak = value
+            if peak > 0:
+                dd = (peak - value) / peak
+                if dd > max_dd:
+                    max_dd = dd
+
+        return max_dd
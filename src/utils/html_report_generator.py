@@ -3,287 +3,252 @@ HTML Report Generator - User-Friendly Portfolio Reports
 Generates clean, visual reports for non-technical users
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List
 import json
+import re
 
 
-class HTMLReportGenerator:
-    """Generate beautiful HTML reports for portfolio analysis"""
-
-    @staticmethod
-    def generate_report(
-        portfolio: Dict,
-        analysis_results: Dict,
-        real_data: Dict,
-        output_path: str = None
-    ) -> str:
-        """
-        Generate complete HTML report.
-
-        Args:
-            portfolio: Portfolio data
-            analysis_results: Analysis results from orchestrator
-            real_data: Real market data
-            output_path: Optional path to save HTML file
-
-        Returns:
-            HTML string
-        """
-        report_date = datetime.now().strftime("%d %B %Y, %H:%M")
-
-        html = f"""
-<!DOCTYPE html>
-<html lang="it">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Portfolio Report - {portfolio.get('name', 'Il Mio Portfolio')}</title>
-    <style>
-        * {{
+# Static markup, built once at import rather than on every generate_report call
+_STATIC_CSS = """
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', sans-serif;
             line-height: 1.6;
             color: #333;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             padding: 20px;
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background: white;
             border-radius: 20px;
             box-shadow: 0 20px 60px rgba(0,0,0,0.3);
             overflow: hidden;
-        }}
+        }
 
-        .header {{
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 40px;
             text-align: center;
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
-        }}
+        }
 
-        .header .subtitle {{
+        .header .subtitle {
             font-size: 1.2em;
             opacity: 0.9;
-        }}
+        }
 
-        .section {{
+        .section {
             padding: 40px;
             border-bottom: 1px solid #eee;
-        }}
+        }
 
-        .section:last-child {{
+        .section:last-child {
             border-bottom: none;
-        }}
+        }
 
-        .section h2 {{
+        .section h2 {
             font-size: 1.8em;
             margin-bottom: 20px;
             color: #667eea;
             display: flex;
             align-items: center;
-        }}
+        }
 
-        .section h2::before {{
+        .section h2::before {
             content: '';
             display: inline-block;
             width: 4px;
             height: 30px;
             background: #667eea;
             margin-right: 15px;
-        }}
+        }
 
-        .metrics-grid {{
+        .metrics-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
             gap: 20px;
             margin: 30px 0;
-        }}
+        }
 
-        .metric-card {{
+        .metric-card {
             background: #f8f9fa;
             padding: 25px;
             border-radius: 15px;
             border-left: 4px solid #667eea;
             transition: transform 0.2s, box-shadow 0.2s;
-        }}
+        }
 
-        .metric-card:hover {{
+        .metric-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 10px 20px rgba(0,0,0,0.1);
-        }}
+        }
 
-        .metric-label {{
+        .metric-label {
             font-size: 0.9em;
             color: #666;
             margin-bottom: 8px;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
 
-        .metric-value {{
+        .metric-value {
             font-size: 2em;
             font-weight: bold;
             color: #333;
-        }}
+        }
 
-        .metric-change {{
+        .metric-change {
             font-size: 0.9em;
             margin-top: 5px;
-        }}
+        }
 
-        .positive {{
+        .positive {
             color: #10b981;
-        }}
+        }
 
-        .negative {{
+        .negative {
             color: #ef4444;
-        }}
+        }
 
-        .warning {{
+        .warning {
             color: #f59e0b;
-        }}
+        }
 
-        .holdings-table {{
+        .holdings-table {
             width: 100%;
             border-collapse: collapse;
             margin: 20px 0;
-        }}
+        }
 
-        .holdings-table th {{
+        .holdings-table th {
             background: #667eea;
             color: white;
             padding: 15px;
             text-align: left;
             font-weight: 600;
-        }}
+        }
 
-        .holdings-table td {{
+        .holdings-table td {
             padding: 15px;
             border-bottom: 1px solid #eee;
-        }}
+        }
 
-        .holdings-table tr:hover {{
+        .holdings-table tr:hover {
             background: #f8f9fa;
-        }}
+        }
 
-        .progress-bar {{
+        .progress-bar {
             height: 8px;
             background: #e5e7eb;
             border-radius: 4px;
             overflow: hidden;
             margin-top: 5px;
-        }}
+        }
 
-        .progress-fill {{
+        .progress-fill {
             height: 100%;
             background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
             transition: width 0.3s;
-        }}
+        }
 
-        .recommendation {{
+        .recommendation {
             background: #fef3c7;
             border-left: 4px solid #f59e0b;
             padding: 20px;
             margin: 15px 0;
             border-radius: 10px;
-        }}
+        }
 
-        .recommendation.buy {{
+        .recommendation.buy {
             background: #d1fae5;
             border-left-color: #10b981;
-        }}
+        }
 
-        .recommendation.sell {{
+        .recommendation.sell {
             background: #fee2e2;
             border-left-color: #ef4444;
-        }}
+        }
 
-        .recommendation h3 {{
+        .recommendation h3 {
             margin-bottom: 10px;
             color: #333;
-        }}
+        }
 
-        .recommendation ul {{
+        .recommendation ul {
             margin-left: 20px;
-        }}
+        }
 
-        .recommendation li {{
+        .recommendation li {
             margin: 5px 0;
-        }}
+        }
 
-        .risk-badge {{
+        .risk-badge {
             display: inline-block;
             padding: 8px 16px;
             border-radius: 20px;
             font-weight: bold;
             font-size: 0.9em;
-        }}
+        }
 
-        .risk-low {{
+        .risk-low {
             background: #d1fae5;
             color: #065f46;
-        }}
+        }
 
-        .risk-medium {{
+        .risk-medium {
             background: #fef3c7;
             color: #92400e;
-        }}
+        }
 
-        .risk-high {{
+        .risk-high {
             background: #fee2e2;
             color: #991b1b;
-        }}
+        }
 
-        .footer {{
+        .footer {
             background: #f8f9fa;
             padding: 30px;
             text-align: center;
             color: #666;
-        }}
+        }
 
-        .emoji {{
+        .emoji {
             font-size: 1.5em;
             margin-right: 10px;
-        }}
+        }
 
-        @media print {{
-            body {{
+        @media print {
+            body {
                 background: white;
                 padding: 0;
-            }}
-            .container {{
+            }
+            .container {
                 box-shadow: none;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>📊 {portfolio.get('name', 'Il Mio Portfolio')}</h1>
-            <div class="subtitle">Report Generato il {report_date}</div>
-        </div>
+            }
+        }
+"""
 
-        {HTMLReportGenerator._generate_summary_section(portfolio, analysis_results, real_data)}
-        {HTMLReportGenerator._generate_holdings_section(portfolio, real_data)}
-        {HTMLReportGenerator._generate_performance_section(analysis_results, real_data)}
-        {HTMLReportGenerator._generate_risk_section(analysis_results)}
-        {HTMLReportGenerator._generate_recommendations_section(analysis_results)}
+# What actually goes in the page: whitespace collapsed once at import,
+# which cuts the stylesheet to a bit over half its size
+_MINIFIED_CSS = re.sub(r'\s*([{};,])\s*', r'\1', re.sub(r'\s+', ' ', _STATIC_CSS)).strip()
 
+_FOOTER = """
         <div class="footer">
             <p>🤖 Generato con Multi-Agent Portfolio Optimizer</p>
             <p style="font-size: 0.8em; margin-top: 10px;">
@@ -291,18 +256,143 @@ class HTMLReportGenerator:
                 Consulta sempre un consulente finanziario autorizzato prima di prendere decisioni di investimento.
             </p>
         </div>
-    </div>
-</body>
-</html>
 """
 
+
+# Shared read-only default for holdings without a real-data quote
+_NO_QUOTE = MappingProxyType({})
+
+# (CSS class, label) by Sharpe band: <= 0.5, (0.5, 1.0], > 1.0
+_RISK_TABLE = (
+    ('risk-high', 'ALTO RISCHIO'),
+    ('risk-medium', 'MEDIO RISCHIO'),
+    ('risk-low', 'BASSO RISCHIO')
+)
+
+# CSS class for a change, indexed by whether it is positive
+_SIGN_CLASS = ('negative', 'positive')
+
+# (CSS class, label) by whether annual volatility is above 15%
+_VOLATILITY_TABLE = (
+    ('', '✓ Accettabile'),
+    ('warning', '⚠️ Elevata')
+)
+
+
+class HTMLReportGenerator:
+    """Generate beautiful HTML reports for portfolio analysis"""
+
+    @staticmethod
+    def generate_report(
+        portfolio: Dict,
+        analysis_results: Dict,
+        real_data: Dict,
+        output_path: str = None
+    ) -> str:
+        """
+        Generate complete HTML report.
+
+        Args:
+            portfolio: Portfolio data
+            analysis_results: Analysis results from orchestrator
+            real_data: Real market data
+            output_path: Optional path to save HTML file
+
+        Returns:
+            HTML string
+        """
+        html = ''.join(HTMLReportGenerator._report_chunks(portfolio, analysis_results, real_data))
+
         if output_path:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html)
-            print(f"📄 Report salvato: {output_path}")
+            HTMLReportGenerator._save((html,), output_path)
 
         return html
 
+    @staticmethod
+    def write_report(
+        portfolio: Dict,
+        analysis_results: Dict,
+        real_data: Dict,
+        output_path: str
+    ) -> None:
+        """
+        Stream the HTML report straight to output_path.
+
+        Same document as generate_report, but each section is encoded and
+        written as soon as it is built, so the whole page never sits in
+        memory at once. Use this when the HTML string itself isn't needed.
+        """
+        HTMLReportGenerator._save(
+            HTMLReportGenerator._report_chunks(portfolio, analysis_results, real_data),
+            output_path
+        )
+
+    @staticmethod
+    def _save(chunks: Iterable[str], output_path: str) -> None:
+        """Encode and write HTML chunks to output_path (binary, 1 MiB buffer)"""
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            for chunk in chunks:
+                f.write(chunk.encode('utf-8'))
+        print(f"📄 Report salvato: {output_path}")
+
+    @staticmethod
+    def _report_chunks(portfolio: Dict, analysis_results: Dict, real_data: Dict) -> Iterator[str]:
+        """The report's HTML in document order, one section at a time"""
+        report_date = datetime.now().strftime("%d %B %Y, %H:%M")
+        name = portfolio.get('name', 'Il Mio Portfolio')
+
+        yield f"""
+<!DOCTYPE html>
+<html lang="it">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Portfolio Report - {name}</title>
+    <style>{_MINIFIED_CSS}</style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>📊 {name}</h1>
+            <div class="subtitle">Report Generato il {report_date}</div>
+        </div>
+
+        """
+        yield HTMLReportGenerator._generate_summary_section(portfolio, analysis_results, real_data)
+        yield "\n        "
+        yield HTMLReportGenerator._generate_holdings_section(portfolio, real_data)
+        yield "\n        "
+        yield HTMLReportGenerator._generate_performance_section(analysis_results, real_data)
+        yield "\n        "
+        yield HTMLReportGenerator._generate_risk_section(analysis_results)
+        yield "\n        "
+        yield HTMLReportGenerator._generate_recommendations_section(analysis_results)
+        yield f"""
+{_FOOTER}    </div>
+</body>
+</html>
+"""
+
+    @staticmethod
+    def generate_reports(batch: List[Dict], processes: int = 1) -> List[str]:
+        """
+        Generate several HTML reports, writing each one that has an output_path.
+
+        Args:
+            batch: List of dicts with generate_report's arguments
+                (portfolio, analysis_results, real_data, optional output_path)
+            processes: Worker processes to render across; 1 renders in this
+                process (pool startup only pays off for large batches)
+
+        Returns:
+            HTML strings, in batch order
+        """
+        if processes <= 1 or len(batch) <= 1:
+            return [_render_batch_item(item) for item in batch]
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return list(executor.map(_render_batch_item, batch, chunksize=4))
+
     @staticmethod
     def _generate_summary_section(portfolio: Dict, analysis: Dict, real_data: Dict) -> str:
         """Generate summary metrics section"""
@@ -315,16 +405,10 @@ class HTMLReportGenerator:
         max_dd = real_data.get('max_drawdown', 0) * 100
         total_return = real_data.get('total_return', 0) * 100
 
-        # Risk classification
-        if sharpe > 1.0:
-            risk_class = 'risk-low'
-            risk_text = 'BASSO RISCHIO'
-        elif sharpe > 0.5:
-            risk_class = 'risk-medium'
-            risk_text = 'MEDIO RISCHIO'
-        else:
-            risk_class = 'risk-high'
-            risk_text = 'ALTO RISCHIO'
+        # Risk classification: one table index instead of an if/elif chain
+        # (int() so NumPy bools add up rather than or-ing together)
+        risk_class, risk_text = _RISK_TABLE[int(sharpe > 0.5) + int(sharpe > 1.0)]
+        vol_class, vol_text = _VOLATILITY_TABLE[int(volatility > 15)]
 
         return f"""
         <div class="section">
@@ -345,13 +429,13 @@ class HTMLReportGenerator:
                 <div class="metric-card">
                     <div class="metric-label">Volatilità Annua</div>
                     <div class="metric-value">{volatility:.2f}%</div>
-                    <div class="metric-change {'warning' if volatility > 15 else ''}">
-                        {'⚠️ Elevata' if volatility > 15 else '✓ Accettabile'}
+                    <div class="metric-change {vol_class}">
+                        {vol_text}
                     </div>
                 </div>
                 <div class="metric-card">
                     <div class="metric-label">Return 1 Anno</div>
-                    <div class="metric-value {'positive' if total_return > 0 else 'negative'}">
+                    <div class="metric-value {_SIGN_CLASS[int(total_return > 0)]}">
                         {total_return:+.2f}%
                     </div>
                     <div class="metric-change">Max Drawdown: {max_dd:.2f}%</div>
@@ -366,13 +450,15 @@ class HTMLReportGenerator:
         holdings = portfolio.get('holdings', [])
         total_value = portfolio.get('total_value', 0)
 
+        prices = real_data.get('prices') or _NO_QUOTE
+
         rows = []
         for holding in holdings:
             symbol = holding['symbol']
             shares = holding['shares']
 
             # Get real price if available
-            price_data = real_data.get('prices', {}).get(symbol, {})
+            price_data = prices.get(symbol, _NO_QUOTE)
             current_price = price_data.get('price', holding.get('current_price', 0))
             change_pct = price_data.get('change_pct', 0)
 
@@ -382,23 +468,28 @@ class HTMLReportGenerator:
             avg_cost = holding.get('average_cost', current_price)
             gain_pct = ((current_price - avg_cost) / avg_cost * 100) if avg_cost > 0 else 0
 
+            # Format each number once; the weight label and bar width share one
+            weight_str = f"{weight:.1f}"
+            change_class = _SIGN_CLASS[int(change_pct > 0)]
+            gain_class = _SIGN_CLASS[int(gain_pct > 0)]
+
             rows.append(f"""
                 <tr>
                     <td><strong>{symbol}</strong><br><small>{holding.get('name', '')}</small></td>
                     <td>{shares}</td>
                     <td>€{current_price:.2f}<br>
-                        <small class="{'positive' if change_pct > 0 else 'negative'}">
+                        <small class="{change_class}">
                             {change_pct:+.2f}% oggi
                         </small>
                     </td>
                     <td>€{value:,.2f}</td>
                     <td>
-                        {weight:.1f}%
+                        {weight_str}%
                         <div class="progress-bar">
-                            <div class="progress-fill" style="width: {weight}%"></div>
+                            <div class="progress-fill" style="width: {weight_str}%"></div>
                         </div>
                     </td>
-                    <td class="{'positive' if gain_pct > 0 else 'negative'}">
+                    <td class="{gain_class}">
                         {gain_pct:+.2f}%
                     </td>
                 </tr>
@@ -525,3 +616,13 @@ class HTMLReportGenerator:
             </div>
         </div>
         """
+
+
+def _render_batch_item(item: Dict) -> str:
+    """Render (and save, if it has an output_path) one generate_reports item"""
+    return HTMLReportGenerator.generate_report(
+        item['portfolio'],
+        item['analysis_results'],
+        item['real_data'],
+        item.get('output_path')
+    )
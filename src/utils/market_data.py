@@ -7,8 +7,102 @@ happens via Claude Code agents with web search capabilities.
 """
 
 import json
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional C-accelerated JSON
+    orjson = None
+
+# Body of the first ```json fence in an agent response (an unclosed fence
+# runs to the end of the text)
+_JSON_FENCE = re.compile(r"```json\s*(.*?)(?:```|\Z)", re.DOTALL)
+
+
+@lru_cache(maxsize=None)
+def _max_dd_kernel():
+    """
+    The Numba max-drawdown kernel, or None when numba isn't installed.
+
+    Imported on first use rather than with this module: loading numba takes
+    ~0.1 s, which callers that never compute a drawdown shouldn't pay.
+    """
+    from ._numba import NUMBA_AVAILABLE
+    if not NUMBA_AVAILABLE:
+        return None
+    from ._numba import _max_dd_nb
+    return _max_dd_nb
+
+
+def _loads(text: str):
+    """json.loads via orjson when installed (its errors subclass JSONDecodeError)"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# Annualization for daily returns
+_TRADING_DAYS = 252
+_SQRT_TRADING_DAYS = _TRADING_DAYS ** 0.5
+
+# Fields validate_price_data requires; checked as one subset test
+_REQUIRED_PRICE_FIELDS = frozenset(('symbol', 'price', 'change', 'timestamp'))
+
+
+@dataclass(slots=True)
+class Position:
+    """
+    A priced holding, as produced by MarketDataProcessor.calculate_positions.
+
+    Slotted, so large position lists stay compact; orjson serializes it
+    directly, and to_dict() gives the plain-dict form used in reports.
+    """
+    symbol: str
+    shares: float
+    price: float
+    value: float
+    weight: float
+
+    def to_dict(self) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'shares': self.shares,
+            'price': self.price,
+            'value': self.value,
+            'weight': self.weight
+        }
+
+
+def _to_soa(holdings: List[Dict], prices: Dict) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Split holdings into (symbols, shares, prices) columns in one pass.
+
+    Holdings without a price are skipped. Shares and prices are float64
+    arrays, aligned with symbols.
+    """
+    symbols = []
+    shares = []
+    price_list = []
+    for holding in holdings:
+        symbol = holding['symbol']
+        quote = prices.get(symbol)
+        if quote is not None:
+            symbols.append(symbol)
+            shares.append(holding['shares'])
+            price_list.append(quote['price'])
+
+    return (
+        symbols,
+        np.asarray(shares, dtype=np.float64),
+        np.asarray(price_list, dtype=np.float64)
+    )
 
 
 class MarketDataProcessor:
@@ -17,61 +111,65 @@ class MarketDataProcessor:
     @staticmethod
     def validate_price_data(data: Dict) -> bool:
         """Validate that price data has required fields"""
-        required_fields = ['symbol', 'price', 'change', 'timestamp']
-        return all(field in data for field in required_fields)
+        return _REQUIRED_PRICE_FIELDS <= data.keys()
+
+    @staticmethod
+    def calculate_positions(holdings: List[Dict], prices: Dict) -> List[Position]:
+        """Value each priced holding and its weight in the portfolio"""
+        return MarketDataProcessor._value_positions(holdings, prices)[0]
 
     @staticmethod
     def calculate_portfolio_value(holdings: List[Dict], prices: Dict) -> Dict:
         """Calculate total portfolio value from holdings and current prices"""
-        total_value = 0
-        positions = []
-
-        for holding in holdings:
-            symbol = holding['symbol']
-            shares = holding['shares']
-
-            if symbol in prices:
-                current_price = prices[symbol]['price']
-                position_value = shares * current_price
-                total_value += position_value
-
-                positions.append({
-                    'symbol': symbol,
-                    'shares': shares,
-                    'price': current_price,
-                    'value': position_value,
-                    'weight': 0  # Will calculate after total is known
-                })
-
-        # Calculate weights
-        for position in positions:
-            position['weight'] = position['value'] / total_value if total_value > 0 else 0
+        positions, total_value = MarketDataProcessor._value_positions(holdings, prices)
 
         return {
             'total_value': total_value,
-            'positions': positions,
+            'positions': [position.to_dict() for position in positions],
             'timestamp': datetime.now().isoformat()
         }
 
     @staticmethod
-    def format_agent_query(symbols: List[str]) -> str:
-        """Format a web search query for market data"""
+    def _value_positions(holdings: List[Dict], prices: Dict) -> Tuple[List[Position], float]:
+        """(positions, total value) for the holdings that have a price"""
+        symbols, shares, price_arr = _to_soa(holdings, prices)
+
+        values = shares * price_arr
+        total_value = float(values.sum())
+        weights = values * (1.0 / total_value if total_value > 0 else 0.0)
+
+        positions = list(map(
+            Position,
+            symbols, shares.tolist(), price_arr.tolist(),
+            values.tolist(), weights.tolist()
+        ))
+        return positions, total_value
+
+    @staticmethod
+    def format_agent_query(symbols: List[str], today: Optional[str] = None) -> str:
+        """
+        Format a web search query for market data.
+
+        Args:
+            symbols: Ticker symbols to query together
+            today: YYYY-MM-DD date to search for (default: today). Callers
+                building many queries can compute it once and pass it in.
+        """
         symbol_str = ' OR '.join(symbols)
-        today = datetime.now().strftime('%Y-%m-%d')
+        if today is None:
+            today = date.today().isoformat()
         return f"({symbol_str}) stock price {today} current market data"
 
     @staticmethod
     def parse_agent_response(response: str) -> Dict:
         """Parse JSON response from market data agent"""
         try:
-            return json.loads(response)
+            return _loads(response)
         except json.JSONDecodeError:
             # Try to extract JSON from markdown code blocks
-            if '```json' in response:
-                start = response.find('```json') + 7
-                end = response.find('```', start)
-                json_str = response[start:end].strip()
-                return json.loads(json_str)
+            fence = _JSON_FENCE.search(response)
+            if fence:
+                return _loads(fence.group(1).strip())
             raise ValueError("Could not parse agent response as JSON")
 
 
@@ -83,44 +181,72 @@ class PortfolioMetrics:
         """Calculate simple returns from price series"""
         if len(prices) < 2:
             return []
-        return [(prices[i] - prices[i-1]) / prices[i-1] for i in range(1, len(prices))]
+        p = np.asarray(prices, dtype=float)
+        return (np.diff(p) / p[:-1]).tolist()
 
     @staticmethod
     def calculate_sharpe_ratio(returns: List[float], risk_free_rate: float = 0.04) -> float:
         """Calculate Sharpe ratio (annualized)"""
-        if not returns:
+        if len(returns) == 0:
             return 0.0
 
-        import statistics
-        avg_return = statistics.mean(returns)
-        std_return = statistics.stdev(returns) if len(returns) > 1 else 0
+        r = np.asarray(returns, dtype=float)
+        avg_return = r.mean()
+        std_return = r.std(ddof=1) if len(r) > 1 else 0
 
         if std_return == 0:
             return 0.0
 
         # Annualize assuming daily returns
-        excess_return = (avg_return * 252) - risk_free_rate
-        annualized_vol = std_return * (252 ** 0.5)
+        excess_return = (avg_return * _TRADING_DAYS) - risk_free_rate
+        annualized_vol = std_return * _SQRT_TRADING_DAYS
 
-        return excess_return / annualized_vol
+        return float(excess_return / annualized_vol)
+
+    @staticmethod
+    def calculate_sharpe_batch(returns_matrix: np.ndarray, risk_free_rate: float = 0.04) -> np.ndarray:
+        """
+        Annualized Sharpe ratios for many return series at once.
+
+        Args:
+            returns_matrix: (n_symbols, n_days) daily returns, one row per series
+            risk_free_rate: Annual risk-free rate
+
+        Returns:
+            (n_symbols,) array; 0.0 where calculate_sharpe_ratio would return
+            0.0 (fewer than two returns or zero volatility)
+
+        Raises:
+            ValueError: If returns_matrix is not 2-D
+        """
+        r = np.asarray(returns_matrix, dtype=float)
+        if r.ndim != 2:
+            raise ValueError("returns_matrix must be 2-D (n_symbols, n_days)")
+        if r.shape[1] < 2:
+            return np.zeros(r.shape[0])
+
+        excess = r.mean(axis=1) * _TRADING_DAYS - risk_free_rate
+        vol = r.std(axis=1, ddof=1) * _SQRT_TRADING_DAYS
+
+        return np.divide(excess, vol, out=np.zeros_like(excess), where=vol != 0)
 
     @staticmethod
     def calculate_max_drawdown(values: List[float]) -> float:
         """Calculate maximum drawdown from portfolio values"""
-        if not values:
+        if len(values) == 0:
             return 0.0
 
-        peak = values[0]
-        max_dd = 0.0
+        v = np.asarray(values, dtype=float)
+        kernel = _max_dd_kernel()
+        if kernel is not None:
+            return float(kernel(v))
 
-        for value in values:
-            if value > peak:
-                peak = value
-            dd = (peak - value) / peak
-            if dd > max_dd:
-                max_dd = dd
-
-        return max_dd
+        # Drawdown is undefined while the running peak is <= 0 (the kernel
+        # skips those points too)
+        peaks = np.maximum.accumulate(v)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdowns = np.where(peaks > 0, (peaks - v) / peaks, 0.0)
+        return float(drawdowns.max())
 
     @staticmethod
     def calculate_volatility(returns: List[float], annualize: bool = True) -> float:
@@ -128,56 +254,80 @@ class PortfolioMetrics:
         if len(returns) < 2:
             return 0.0
 
-        import statistics
-        vol = statistics.stdev(returns)
+        vol = float(np.std(returns, ddof=1))
 
         if annualize:
-            vol *= (252 ** 0.5)  # Assuming daily returns
+            vol *= _SQRT_TRADING_DAYS  # Assuming daily returns
 
         return vol
 
 
-def create_sample_portfolio() -> Dict:
-    """Create a sample portfolio for testing"""
+# Sample portfolio, built once; create_sample_portfolio hands out copies or
+# a read-only view of it
+_SAMPLE_PORTFOLIO = {
+    "name": "Sample Diversified Portfolio",
+    "holdings": [
+        {
+            "symbol": "SPY",
+            "name": "SPDR S&P 500 ETF",
+            "shares": 100,
+            "sector": "Broad Market",
+            "asset_class": "Equity"
+        },
+        {
+            "symbol": "QQQ",
+            "name": "Invesco QQQ Trust",
+            "shares": 50,
+            "sector": "Technology",
+            "asset_class": "Equity"
+        },
+        {
+            "symbol": "GLD",
+            "name": "SPDR Gold Trust",
+            "shares": 30,
+            "sector": "Precious Metals",
+            "asset_class": "Commodity"
+        },
+        {
+            "symbol": "TLT",
+            "name": "iShares 20+ Year Treasury Bond",
+            "shares": 40,
+            "sector": "Bonds",
+            "asset_class": "Fixed Income"
+        },
+        {
+            "symbol": "VNQ",
+            "name": "Vanguard Real Estate ETF",
+            "shares": 25,
+            "sector": "Real Estate",
+            "asset_class": "Real Estate"
+        }
+    ],
+    "cash": 15000,
+    "currency": "USD"
+}
+
+_SAMPLE_PORTFOLIO_VIEW = MappingProxyType({
+    **_SAMPLE_PORTFOLIO,
+    'holdings': tuple(MappingProxyType(h) for h in _SAMPLE_PORTFOLIO['holdings'])
+})
+
+
+def create_sample_portfolio(mutable: bool = True) -> Mapping:
+    """
+    Create a sample portfolio for testing.
+
+    Args:
+        mutable: True (default) returns a fresh dict the caller may modify.
+            False returns a shared read-only view (holdings as a tuple of
+            read-only mappings), with no copying.
+    """
+    if not mutable:
+        return _SAMPLE_PORTFOLIO_VIEW
+
+    # All leaf values are immutable, so copying each level is a full copy
+    # (and much cheaper than copy.deepcopy)
     return {
-        "name": "Sample Diversified Portfolio",
-        "holdings": [
-            {
-                "symbol": "SPY",
-                "name": "SPDR S&P 500 ETF",
-                "shares": 100,
-                "sector": "Broad Market",
-                "asset_class": "Equity"
-            },
-            {
-                "symbol": "QQQ",
-                "name": "Invesco QQQ Trust",
-                "shares": 50,
-                "sector": "Technology",
-                "asset_class": "Equity"
-            },
-            {
-                "symbol": "GLD",
-                "name": "SPDR Gold Trust",
-                "shares": 30,
-                "sector": "Precious Metals",
-                "asset_class": "Commodity"
-            },
-            {
-                "symbol": "TLT",
-                "name": "iShares 20+ Year Treasury Bond",
-                "shares": 40,
-                "sector": "Bonds",
-                "asset_class": "Fixed Income"
-            },
-            {
-                "symbol": "VNQ",
-                "name": "Vanguard Real Estate ETF",
-                "shares": 25,
-                "sector": "Real Estate",
-                "asset_class": "Real Estate"
-            }
-        ],
-        "cash": 15000,
-        "currency": "USD"
+        **_SAMPLE_PORTFOLIO,
+        'holdings': [dict(holding) for holding in _SAMPLE_PORTFOLIO['holdings']]
     }
@@ -5,10 +5,170 @@ Provides real historical data for portfolio analysis.
 Ensures all calculations use actual market data, not estimates.
 """
 
-import yfinance as yf
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import asyncio
+import logging
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .market_data import PortfolioMetrics
+from .yf_cache import HistoryCache, period_ttl
+
+# Per-symbol messages go through logging (not print) at DEBUG/WARNING; each
+# fetch logs one INFO summary
+logger = logging.getLogger(__name__)
+
+# Histories already fetched this session (or recently, by another run)
+_history_cache = HistoryCache()
+
+# Results of get_historical_returns / get_portfolio_historical_values in
+# this process: key -> (time computed, result). Entries expire with the
+# period's history cache TTL.
+_memo: Dict[Tuple, Tuple[float, Dict]] = {}
+
+# (symbol, period) -> time Yahoo returned no rows for it; such symbols
+# (delisted, misspelled) aren't requested again for _MISSING_TTL seconds
+_missing: Dict[Tuple[str, str], float] = {}
+_MISSING_TTL = 3600
+
+# Fundamentals reported for a symbol whose .info lookup failed
+_NO_FUNDAMENTALS = {'market_cap': 0, 'pe_ratio': 0, '52w_high': 0, '52w_low': 0}
+
+
+@lru_cache(maxsize=None)
+def _yf():
+    """
+    The yfinance module, imported on first fetch rather than with this one.
+
+    yfinance pulls in requests, curl_cffi and friends at import; code that
+    only imports RealDataFetcher (or the rest of utils) shouldn't pay that.
+    """
+    import yfinance
+    return yfinance
+
+
+@lru_cache(maxsize=512)
+def _ticker(symbol: str):
+    """yf.Ticker for symbol, built once per process and reused"""
+    return _yf().Ticker(symbol)
+
+
+def _download_histories(symbols: List[str], period: str) -> Dict[str, object]:
+    """
+    Daily history for several symbols in one batched yf.download request.
+
+    Returns symbol -> OHLCV DataFrame, like yf.Ticker(symbol).history(period)
+    would. Symbols missing from the response (or all of them, if the
+    request fails) are left out, so callers can fall back to a per-symbol
+    history() call and keep their usual error reporting.
+    """
+    try:
+        df = _yf().download(
+            " ".join(dict.fromkeys(symbols)), period=period, auto_adjust=True,
+            group_by="ticker", progress=False, threads=True
+        )
+    except Exception:
+        return {}
+
+    if df is None or df.empty:
+        return {}
+
+    histories = {}
+    multi = df.columns.nlevels > 1
+    tickers = set(df.columns.get_level_values(0)) if multi else set()
+    for symbol in symbols:
+        if multi:
+            if symbol not in tickers:
+                continue
+            hist = df[symbol]
+        elif len(symbols) == 1:
+            hist = df
+        else:
+            continue
+
+        # Dates are the union across tickers; drop rows this symbol didn't trade
+        hist = hist.dropna(subset=['Close'])
+        if len(hist) > 0:
+            histories[symbol] = hist
+
+    return histories
+
+
+def _load_histories(symbols: List[str], period: str) -> Dict[str, object]:
+    """
+    Histories for symbols: cached ones from disk, the rest in one batch.
+
+    Like _download_histories, symbols that couldn't be fetched are left
+    out. Fresh downloads are written to the cache.
+    """
+    histories = {}
+    missing = []
+    for symbol in dict.fromkeys(symbols):
+        if _known_missing(symbol, period):
+            continue
+        hist = _history_cache.get(symbol, period)
+        if hist is None:
+            missing.append(symbol)
+        else:
+            histories[symbol] = hist
+
+    if missing:
+        downloaded = _download_histories(missing, period)
+        for symbol, hist in downloaded.items():
+            _history_cache.set(symbol, period, hist)
+        histories.update(downloaded)
+
+    return histories
+
+
+def _history(histories: Dict[str, object], symbol: str, period: str):
+    """symbol's history from _load_histories, else a per-symbol request"""
+    hist = histories.get(symbol)
+    if hist is None:
+        if _known_missing(symbol, period):
+            return pd.DataFrame()
+        hist = _ticker(symbol).history(period=period)
+        if len(hist) > 0:
+            _history_cache.set(symbol, period, hist)
+        else:
+            _missing[(symbol, period)] = time.time()
+    return hist
+
+
+def _known_missing(symbol: str, period: str) -> bool:
+    """True if symbol recently had no history for period"""
+    failed_at = _missing.get((symbol, period))
+    return failed_at is not None and time.time() - failed_at < _MISSING_TTL
+
+
+def _memo_get(key: Tuple, period: str) -> Optional[Dict]:
+    """A fresh _memo entry for key, or None"""
+    entry = _memo.get(key)
+    if entry is None or time.time() - entry[0] > period_ttl(period):
+        return None
+    return entry[1]
+
+
+def _copy_result(result: Dict) -> Dict:
+    """Copy of a memoized result whose list values the caller may modify"""
+    return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+
+
+async def _fetch_each(fn: Callable[[str], Any], symbols: List[str]) -> List[Any]:
+    """
+    fn(symbol) for every symbol, concurrently on worker threads.
+
+    Results come back in symbols order; a call that raised yields its
+    exception instead, so callers can report failures per symbol.
+    """
+    return await asyncio.gather(
+        *(asyncio.to_thread(fn, symbol) for symbol in symbols),
+        return_exceptions=True
+    )
 
 
 class RealDataFetcher:
@@ -19,19 +179,48 @@ class RealDataFetcher:
         """
         Get current prices and basic info for symbols using real data.
 
+        get_prices_fast plus get_fundamentals, fetched concurrently. Callers
+        that only need price/change should use get_prices_fast: the .info
+        lookups behind the fundamentals are a second, much slower request
+        per symbol.
+
         Args:
             symbols: List of ticker symbols
 
         Returns:
             Dict with symbol -> {price, change_pct, volume, etc.}
         """
+        result, fundamentals = await asyncio.gather(
+            RealDataFetcher.get_prices_fast(symbols),
+            RealDataFetcher.get_fundamentals(symbols)
+        )
+
+        for symbol, quote in result.items():
+            quote.update(fundamentals.get(symbol, _NO_FUNDAMENTALS))
+
+        return result
+
+    @staticmethod
+    async def get_prices_fast(symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Get current prices from recent daily history only (no .info lookups).
+
+        Args:
+            symbols: List of ticker symbols
+
+        Returns:
+            Dict with symbol -> {price, change_pct, volume, data_source, timestamp}
+        """
         result = {}
 
-        for symbol in symbols:
+        # Last 5 days for change calc, all symbols in one request
+        histories = await asyncio.to_thread(_load_histories, symbols, "5d")
+        fetched = await _fetch_each(lambda symbol: _history(histories, symbol, "5d"), symbols)
+
+        for symbol, hist in zip(symbols, fetched):
             try:
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
-                hist = ticker.history(period="5d")  # Last 5 days for change calc
+                if isinstance(hist, Exception):
+                    raise hist
 
                 if len(hist) > 0:
                     current_price = float(hist['Close'].iloc[-1])
@@ -47,20 +236,46 @@ class RealDataFetcher:
                         'price': current_price,
                         'change_pct': change_pct,
                         'volume': int(hist['Volume'].iloc[-1]) if 'Volume' in hist else 0,
-                        'market_cap': info.get('marketCap', 0),
-                        'pe_ratio': info.get('trailingPE', 0),
-                        '52w_high': info.get('fiftyTwoWeekHigh', 0),
-                        '52w_low': info.get('fiftyTwoWeekLow', 0),
                         'data_source': 'yfinance (real)',
                         'timestamp': datetime.now().isoformat()
                     }
 
-                    print(f"[RealData] ✓ {symbol}: ${current_price:.2f} ({change_pct:+.2f}%)")
+                    logger.debug("%s: $%.2f (%+.2f%%)", symbol, current_price, change_pct)
                 else:
-                    print(f"[RealData] ⚠️  No data for {symbol} - will use WebSearch fallback")
+                    logger.warning("No data for %s - will use WebSearch fallback", symbol)
 
             except Exception as e:
-                print(f"[RealData] ⚠️  {symbol} not available on Yahoo Finance - will use WebSearch fallback")
+                logger.warning("%s not available on Yahoo Finance - will use WebSearch fallback", symbol)
+
+        logger.info("Real prices for %d/%d symbols", len(result), len(symbols))
+        return result
+
+    @staticmethod
+    async def get_fundamentals(symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Get market cap, P/E and 52-week range from yf.Ticker(symbol).info.
+
+        Args:
+            symbols: List of ticker symbols
+
+        Returns:
+            Dict with symbol -> {market_cap, pe_ratio, 52w_high, 52w_low};
+            symbols whose info couldn't be fetched are left out
+        """
+        result = {}
+        fetched = await _fetch_each(lambda symbol: _ticker(symbol).info, symbols)
+
+        for symbol, info in zip(symbols, fetched):
+            if isinstance(info, Exception):
+                logger.warning("No fundamentals for %s: %s", symbol, info)
+                continue
+
+            result[symbol] = {
+                'market_cap': info.get('marketCap', 0),
+                'pe_ratio': info.get('trailingPE', 0),
+                '52w_high': info.get('fiftyTwoWeekHigh', 0),
+                '52w_low': info.get('fiftyTwoWeekLow', 0)
+            }
 
         return result
 
@@ -76,27 +291,42 @@ class RealDataFetcher:
         Returns:
             Dict with symbol -> list of daily returns
         """
+        key = ('returns', tuple(sorted(set(symbols))), period)
+        cached = _memo_get(key, period)
+        if cached is not None:
+            return {symbol: list(cached[symbol]) for symbol in symbols}
+
         result = {}
+        histories = await asyncio.to_thread(_load_histories, symbols, period)
+        fetched = await _fetch_each(lambda symbol: _history(histories, symbol, period), symbols)
 
-        for symbol in symbols:
+        for symbol, hist in zip(symbols, fetched):
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period=period)
+                if isinstance(hist, Exception):
+                    raise hist
 
                 if len(hist) > 1:
                     # Calculate daily returns
-                    prices = hist['Close'].values
-                    returns = [(prices[i] - prices[i-1]) / prices[i-1] for i in range(1, len(prices))]
+                    prices = hist['Close'].to_numpy(dtype=np.float64)
+                    returns = (np.diff(prices) / prices[:-1]).tolist()
                     result[symbol] = returns
-                    print(f"[RealData] ✓ {symbol}: {len(returns)} daily returns from real data")
+                    logger.debug("%s: %d daily returns from real data", symbol, len(returns))
                 else:
                     result[symbol] = []
-                    print(f"[RealData] ⚠️  Insufficient data for {symbol}")
+                    logger.warning("Insufficient data for %s", symbol)
 
             except Exception as e:
-                print(f"[RealData] ❌ Error fetching returns for {symbol}: {e}")
+                logger.error("Error fetching returns for %s: %s", symbol, e)
                 result[symbol] = []
 
+        logger.info(
+            "Daily returns (%s) for %d/%d symbols",
+            period, sum(1 for returns in result.values() if returns), len(result)
+        )
+
+        # Failed or empty fetches may be transient; only reuse complete results
+        if all(result.values()):
+            _memo[key] = (time.time(), _copy_result(result))
         return result
 
     @staticmethod
@@ -114,74 +344,66 @@ class RealDataFetcher:
         Returns:
             Dict with dates, values, returns
         """
-        # Get symbols
-        symbols = [h['symbol'] for h in holdings]
-
-        # Fetch historical data
-        all_hist = {}
-        common_dates = None
-
-        for symbol in symbols:
+        # Shares per symbol (repeated holdings of a symbol add up)
+        shares_by_symbol: Dict[str, float] = {}
+        for holding in holdings:
+            symbol = holding['symbol']
+            shares_by_symbol[symbol] = shares_by_symbol.get(symbol, 0) + holding['shares']
+        symbols = list(shares_by_symbol)
+
+        key = ('values', tuple(sorted(shares_by_symbol.items())), period)
+        cached = _memo_get(key, period)
+        if cached is not None:
+            return _copy_result(cached)
+
+        # Fetch historical data: one Close series per symbol, keyed by date
+        closes = {}
+        histories = await asyncio.to_thread(_load_histories, symbols, period)
+        fetched = await _fetch_each(lambda symbol: _history(histories, symbol, period), symbols)
+
+        for symbol, hist in zip(symbols, fetched):
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period=period)
+                if isinstance(hist, Exception):
+                    raise hist
 
                 if len(hist) > 0:
-                    all_hist[symbol] = hist
-
-                    # Find common dates
-                    dates = set(hist.index.strftime('%Y-%m-%d'))
-                    if common_dates is None:
-                        common_dates = dates
-                    else:
-                        common_dates = common_dates.intersection(dates)
+                    # Key rows by local trading day (exchange timezone dropped)
+                    days = hist.index.tz_localize(None).normalize()
+                    close = pd.Series(hist['Close'].to_numpy(dtype=np.float64), index=days)
+                    closes[symbol] = close[~days.duplicated()]
 
             except Exception as e:
-                print(f"[RealData] ❌ Error fetching history for {symbol}: {e}")
+                logger.error("Error fetching history for %s: %s", symbol, e)
 
-        if not common_dates:
-            print("[RealData] ⚠️  No common dates found")
-            return {'dates': [], 'values': [], 'returns': []}
-
-        # Sort dates
-        sorted_dates = sorted(list(common_dates))
-
-        # Calculate portfolio value for each date
-        portfolio_values = []
+        # (dates x symbols) price matrix over the dates every symbol traded
+        prices = pd.concat(closes, axis=1, join='inner').sort_index() if closes else None
 
-        for date_str in sorted_dates:
-            total_value = 0
-
-            for holding in holdings:
-                symbol = holding['symbol']
-                shares = holding['shares']
-
-                if symbol in all_hist:
-                    hist = all_hist[symbol]
-                    date_prices = hist[hist.index.strftime('%Y-%m-%d') == date_str]
+        if prices is None or prices.empty:
+            logger.warning("No common dates found")
+            return {'dates': [], 'values': [], 'returns': []}
 
-                    if len(date_prices) > 0:
-                        price = float(date_prices['Close'].iloc[0])
-                        total_value += shares * price
+        sorted_dates = prices.index.strftime('%Y-%m-%d').tolist()
 
-            portfolio_values.append(total_value)
+        # Portfolio value for each date in one matrix-vector product
+        shares = np.array([shares_by_symbol[symbol] for symbol in prices.columns], dtype=np.float64)
+        values = prices.to_numpy() @ shares
+        portfolio_values = values.tolist()
 
         # Calculate returns
-        returns = []
-        if len(portfolio_values) > 1:
-            returns = [
-                (portfolio_values[i] - portfolio_values[i-1]) / portfolio_values[i-1]
-                for i in range(1, len(portfolio_values))
-            ]
+        returns = (np.diff(values) / values[:-1]).tolist()
 
-        print(f"[RealData] ✓ Portfolio: {len(portfolio_values)} historical values calculated from real data")
+        logger.info("Portfolio: %d historical values calculated from real data", len(portfolio_values))
 
-        return {
+        result = {
             'dates': sorted_dates,
             'values': portfolio_values,
             'returns': returns,
             'data_source': 'yfinance (real historical)'
         }
+        # Values missing a symbol (failed or empty fetch) aren't reused
+        if len(closes) == len(symbols):
+            _memo[key] = (time.time(), _copy_result(result))
+        return result
 
     @staticmethod
     def calculate_real_metrics(returns: List[float], values: List[float]) -> Dict:
@@ -195,9 +417,7 @@ class RealDataFetcher:
         Returns:
             Dict with Sharpe, volatility, max drawdown, etc.
         """
-        import statistics
-
-        if not returns or not values:
+        if len(returns) == 0 or len(values) == 0:
             return {
                 'sharpe_ratio': 0.0,
                 'volatility': 0.0,
@@ -206,9 +426,12 @@ class RealDataFetcher:
                 'data_quality': 'insufficient'
             }
 
+        r = np.asarray(returns, dtype=np.float64)
+        v = np.asarray(values, dtype=np.float64)
+
         # Sharpe ratio
-        avg_return = statistics.mean(returns)
-        std_return = statistics.stdev(returns) if len(returns) > 1 else 0
+        avg_return = float(r.mean())
+        std_return = float(r.std(ddof=1)) if len(r) > 1 else 0.0
 
         risk_free_rate = 0.04
         excess_return = (avg_return * 252) - risk_free_rate
@@ -216,19 +439,11 @@ class RealDataFetcher:
 
         sharpe = excess_return / annualized_vol if annualized_vol > 0 else 0.0
 
-        # Max drawdown
-        peak = values[0]
-        max_dd = 0.0
-
-        for value in values:
-            if value > peak:
-                peak = value
-            dd = (peak - value) / peak
-            if dd > max_dd:
-                max_dd = dd
+        # Max drawdown (the Numba kernel when available)
+        max_dd = PortfolioMetrics.calculate_max_drawdown(v)
 
         # Total return
-        total_return = (values[-1] - values[0]) / values[0] if values[0] > 0 else 0.0
+        total_return = float((v[-1] - v[0]) / v[0]) if v[0] > 0 else 0.0
 
         return {
             'sharpe_ratio': sharpe,
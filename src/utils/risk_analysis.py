@@ -4,10 +4,11 @@ Risk Analysis Utilities
 Functions for portfolio risk assessment and stress testing.
 """
 
-import statistics
 from typing import List, Dict, Tuple
 from datetime import datetime
 
+import numpy as np
+
 
 class RiskAnalyzer:
     """Portfolio risk analysis tools"""
@@ -24,14 +25,7 @@ class RiskAnalyzer:
         Returns:
             VaR as a positive number (loss)
         """
-        if not returns:
-            return 0.0
-
-        sorted_returns = sorted(returns)
-        index = int((1 - confidence_level) * len(sorted_returns))
-        var = -sorted_returns[index] if index < len(sorted_returns) else 0
-
-        return max(0, var)
+        return RiskAnalyzer.calculate_var_cvar(returns, confidence_level)[0]
 
     @staticmethod
     def calculate_cvar(returns: List[float], confidence_level: float = 0.95) -> float:
@@ -45,71 +39,106 @@ class RiskAnalyzer:
         Returns:
             CVaR as a positive number (expected loss beyond VaR)
         """
-        if not returns:
-            return 0.0
+        return RiskAnalyzer.calculate_var_cvar(returns, confidence_level)[1]
+
+    @staticmethod
+    def calculate_var_cvar(returns: List[float], confidence_level: float = 0.95) -> Tuple[float, float]:
+        """
+        VaR and CVaR together, from one partial sort of the returns.
+
+        Same values as calculate_var and calculate_cvar; use this when both
+        are needed. np.partition places the k smallest returns before
+        index k in O(n), instead of fully sorting.
+
+        Args:
+            returns: List of historical returns
+            confidence_level: Confidence level (default 95%)
+
+        Returns:
+            (VaR, CVaR), both as positive numbers (losses)
+        """
+        if len(returns) == 0:
+            return 0.0, 0.0
+
+        r = np.asarray(returns, dtype=np.float64)
+        n = r.size
+        index = int((1 - confidence_level) * n)
 
-        sorted_returns = sorted(returns)
-        index = int((1 - confidence_level) * len(sorted_returns))
+        if index >= n:
+            return 0.0, max(0.0, -float(r.mean()))
 
-        # Average of returns beyond VaR
-        tail_returns = sorted_returns[:index] if index > 0 else [sorted_returns[0]]
-        cvar = -statistics.mean(tail_returns) if tail_returns else 0
+        part = np.partition(r, [0, index])
+        var = -float(part[index])
 
-        return max(0, cvar)
+        # Average of returns beyond VaR (just the worst one if that's empty)
+        tail = part[:index] if index > 0 else part[:1]
+        cvar = -float(tail.mean())
+
+        return max(0.0, var), max(0.0, cvar)
 
     @staticmethod
     def calculate_correlation_matrix(returns_dict: Dict[str, List[float]]) -> Dict:
         """
         Calculate correlation matrix between assets.
 
+        Series of different lengths are aligned on their most recent common
+        length. Series with fewer than 2 returns (e.g. a symbol whose fetch
+        failed) are left out of that alignment, and they and constant series
+        get 0.0 against everything; the diagonal is always 1.0.
+
         Args:
             returns_dict: Dictionary of {symbol: [returns]}
 
         Returns:
             Correlation matrix as nested dictionary
         """
-        symbols = list(returns_dict.keys())
-        n = len(symbols)
+        symbols, corr = RiskAnalyzer.calculate_correlation_array(returns_dict)
 
-        if n == 0:
-            return {}
-
-        # Calculate correlation for each pair
-        corr_matrix = {}
-        for i, sym1 in enumerate(symbols):
-            corr_matrix[sym1] = {}
-            for j, sym2 in enumerate(symbols):
-                if i == j:
-                    corr_matrix[sym1][sym2] = 1.0
-                else:
-                    corr = RiskAnalyzer._calculate_correlation(
-                        returns_dict[sym1],
-                        returns_dict[sym2]
-                    )
-                    corr_matrix[sym1][sym2] = corr
-
-        return corr_matrix
+        rows = corr.tolist()
+        return {
+            sym1: dict(zip(symbols, row))
+            for sym1, row in zip(symbols, rows)
+        }
 
     @staticmethod
-    def _calculate_correlation(x: List[float], y: List[float]) -> float:
-        """Calculate Pearson correlation coefficient"""
-        if len(x) != len(y) or len(x) < 2:
-            return 0.0
-
-        n = len(x)
-        mean_x = statistics.mean(x)
-        mean_y = statistics.mean(y)
+    def calculate_correlation_array(returns_dict: Dict[str, List[float]]) -> Tuple[List[str], np.ndarray]:
+        """
+        Correlation matrix as an (assets x assets) array.
 
-        numerator = sum((x[i] - mean_x) * (y[i] - mean_y) for i in range(n))
-        denominator_x = sum((x[i] - mean_x) ** 2 for i in range(n))
-        denominator_y = sum((y[i] - mean_y) ** 2 for i in range(n))
+        Same values as calculate_correlation_matrix, without building the
+        nested dict (which dominates for large universes).
 
-        denominator = (denominator_x * denominator_y) ** 0.5
+        Args:
+            returns_dict: Dictionary of {symbol: [returns]}
 
-        if denominator == 0:
-            return 0.0
+        Returns:
+            (symbols, matrix) with rows/columns in symbols order
+        """
+        symbols = list(returns_dict.keys())
+        n = len(symbols)
 
-        return numerator / denominator
+        if n == 0:
+            return symbols, np.zeros((0, 0))
+
+        corr = np.zeros((n, n))
+        usable = [i for i, symbol in enumerate(symbols) if len(returns_dict[symbol]) >= 2]
+        if usable:
+            min_len = min(len(returns_dict[symbols[i]]) for i in usable)
+
+            # (assets x days): standardize each series once, then every pair
+            # is one BLAS matrix product
+            z = np.array([returns_dict[symbols[i]][-min_len:] for i in usable], dtype=np.float64)
+            constant = np.ptp(z, axis=1) == 0
+            z -= z.mean(axis=1, keepdims=True)
+            norms = np.sqrt(np.einsum('ij,ij->i', z, z))
+            # Constant series standardize to all zeros (rounding in the mean
+            # would otherwise leave noise that correlates at +/-1)
+            norms[constant] = np.inf
+            z /= norms[:, None]
+            corr[np.ix_(usable, usable)] = np.nan_to_num(np.clip(z @ z.T, -1.0, 1.0), nan=0.0)
+        np.fill_diagonal(corr, 1.0)
+
+        return symbols, corr
 
     @staticmethod
     def stress_test_scenarios() -> List[Dict]:
@@ -190,41 +219,80 @@ class RiskAnalyzer:
         Returns:
             Stressed portfolio values and total impact
         """
-        stressed_values = {}
-        total_current = 0
-        total_stressed = 0
-
-        for holding in portfolio.get('holdings', []):
-            symbol = holding['symbol']
-            sector = holding.get('sector', 'Unknown')
-            asset_class = holding.get('asset_class', 'Unknown')
-
-            current_value = current_values.get(symbol, 0)
-            total_current += current_value
-
-            # Apply impact based on sector or asset class
-            impact = scenario['impacts'].get(sector, scenario['impacts'].get(asset_class, 0))
-            stressed_value = current_value * (1 + impact)
-            total_stressed += stressed_value
-
-            stressed_values[symbol] = {
-                'current': current_value,
-                'stressed': stressed_value,
-                'impact': impact,
-                'change': stressed_value - current_value
+        return RiskAnalyzer.apply_stress_scenarios(
+            portfolio, [scenario], current_values, include_positions=True
+        )[0]
+
+    @staticmethod
+    def apply_stress_scenarios(
+        portfolio: Dict,
+        scenarios: List[Dict],
+        current_values: Dict[str, float],
+        include_positions: bool = False
+    ) -> List[Dict]:
+        """
+        Apply several stress scenarios to a portfolio at once.
+
+        Impacts are stacked into a (scenarios x holdings) matrix, so every
+        scenario's stressed values and totals come from one broadcast.
+
+        Args:
+            portfolio: Portfolio holdings
+            scenarios: Stress scenarios with impacts
+            current_values: Current values of positions
+            include_positions: Also build each scenario's per-position
+                breakdown (the 'positions' entry of apply_stress_scenario)
+
+        Returns:
+            One apply_stress_scenario result per scenario, in order
+        """
+        holdings = portfolio.get('holdings', [])
+        symbols = [holding['symbol'] for holding in holdings]
+        current = np.array([current_values.get(symbol, 0) for symbol in symbols], dtype=np.float64)
+
+        # Impact based on sector, else asset class
+        keys = [(holding.get('sector', 'Unknown'), holding.get('asset_class', 'Unknown')) for holding in holdings]
+        impact = np.array([
+            [impacts.get(sector, impacts.get(asset_class, 0)) for sector, asset_class in keys]
+            for impacts in (scenario['impacts'] for scenario in scenarios)
+        ], dtype=np.float64).reshape(len(scenarios), len(holdings))
+
+        stressed = current * (1 + impact)
+        total_current = float(current.sum())
+        total_stressed = stressed.sum(axis=1).tolist()
+
+        results = []
+        for i, scenario in enumerate(scenarios):
+            result = {
+                'scenario': scenario['name'],
+                'description': scenario['description']
             }
 
-        total_impact = (total_stressed - total_current) / total_current if total_current > 0 else 0
+            if include_positions:
+                result['positions'] = {
+                    symbol: {
+                        'current': current_value,
+                        'stressed': stressed_value,
+                        'impact': impact_value,
+                        'change': change
+                    }
+                    for symbol, current_value, stressed_value, impact_value, change in zip(
+                        symbols, current.tolist(), stressed[i].tolist(),
+                        impact[i].tolist(), (stressed[i] - current).tolist()
+                    )
+                }
 
-        return {
-            'scenario': scenario['name'],
-            'description': scenario['description'],
-            'positions': stressed_values,
-            'total_current_value': total_current,
-            'total_stressed_value': total_stressed,
-            'total_impact_pct': total_impact * 100,
-            'total_impact_dollar': total_stressed - total_current
-        }
+            total_impact = (total_stressed[i] - total_current) / total_current if total_current > 0 else 0
+
+            result.update({
+                'total_current_value': total_current,
+                'total_stressed_value': total_stressed[i],
+                'total_impact_pct': total_impact * 100,
+                'total_impact_dollar': total_stressed[i] - total_current
+            })
+            results.append(result)
+
+        return results
 
     @staticmethod
     def calculate_concentration_risk(positions: List[Dict]) -> Dict:
@@ -240,16 +308,16 @@ class RiskAnalyzer:
         if not positions:
             return {"herfindahl_index": 0, "max_position": 0, "top_3_concentration": 0}
 
+        weights = np.fromiter((p.get('weight', 0) for p in positions), dtype=np.float64, count=len(positions))
+
         # Herfindahl-Hirschman Index (HHI)
-        weights = [p.get('weight', 0) for p in positions]
-        hhi = sum(w ** 2 for w in weights)
+        hhi = float(weights @ weights)
 
         # Max single position
-        max_position = max(weights) if weights else 0
+        max_position = float(weights.max())
 
-        # Top 3 concentration
-        sorted_weights = sorted(weights, reverse=True)
-        top_3 = sum(sorted_weights[:3])
+        # Top 3 concentration (the 3 largest moved to the end, unsorted)
+        top_3 = float(np.partition(weights, -3)[-3:].sum()) if weights.size > 3 else float(weights.sum())
 
         return {
             "herfindahl_index": hhi,
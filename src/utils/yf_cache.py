@@ -0,0 +1,89 @@
+"""
+On-disk cache for yfinance price histories.
+
+Repeated analyses of the same symbols within a session would otherwise
+re-download every history from Yahoo. Entries are JSON files (same layout
+as backtesting's FileCache) keyed by symbol and period, and expire after a
+period-dependent time-to-live: short for the recent quotes used as current
+prices, longer for multi-month histories.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds an entry stays valid, by yfinance period; anything not listed
+# (1y, 2y, 5y, ...) uses _DEFAULT_TTL
+_PERIOD_TTL = {
+    "1d": 300,
+    "5d": 300,
+    "1mo": 3600,
+    "3mo": 3600,
+    "6mo": 3600,
+}
+_DEFAULT_TTL = 6 * 3600
+
+# History columns stored per entry (whichever the frame has)
+_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def period_ttl(period: str) -> int:
+    """Seconds data for a yfinance period stays fresh"""
+    return _PERIOD_TTL.get(period, _DEFAULT_TTL)
+
+
+class HistoryCache:
+    """
+    JSON file cache of yf.Ticker(symbol).history(period) frames.
+
+    Entries live in {cache_dir}/{md5(symbol:history:period)}.json and
+    expire once the file's mtime is older than the period's TTL. Only the
+    trading date of each row is kept. Read/write errors are treated as
+    misses so a broken cache never blocks a fetch.
+    """
+
+    def __init__(self, cache_dir: str = ".cache/yf"):
+        self.cache_dir = cache_dir
+
+    def _path(self, symbol: str, period: str) -> str:
+        digest = hashlib.md5(f"{symbol}:history:{period}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, symbol: str, period: str) -> Optional[pd.DataFrame]:
+        """Return the cached history, or None if missing/expired"""
+        path = self._path(symbol, period)
+        try:
+            if time.time() - os.path.getmtime(path) > period_ttl(period):
+                return None
+            with open(path, 'r') as f:
+                data = json.load(f)
+            return pd.DataFrame(
+                {column: data[column] for column in _COLUMNS if column in data},
+                index=pd.DatetimeIndex(data["date"])
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, symbol: str, period: str, hist: pd.DataFrame):
+        """Store a history frame (atomic replace)"""
+        path = self._path(symbol, period)
+        tmp_path = f"{path}.tmp"
+        data: Dict[str, list] = {"date": hist.index.strftime("%Y-%m-%d").tolist()}
+        for column in _COLUMNS:
+            if column in hist:
+                data[column] = hist[column].astype(float).tolist()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Could not write history cache entry: %s", e)
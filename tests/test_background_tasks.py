@@ -0,0 +1,63 @@
+"""
+BackgroundTaskManager Monte Carlo tests.
+
+Run with: python -m unittest discover -s tests
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from tasks.background_tasks import BackgroundTaskManager
+
+
+def _run_monte_carlo(historical_returns, **kwargs):
+    """Run one simulation to completion and return its result"""
+    async def run():
+        manager = BackgroundTaskManager()
+        task_id = await manager.run_monte_carlo_background('mc', historical_returns, **kwargs)
+        await manager.tasks[task_id]
+        return manager.results[task_id]
+    return asyncio.run(run())
+
+
+class MonteCarloTests(unittest.TestCase):
+
+    def test_history_not_longer_than_block_is_rejected(self):
+        for returns, block_size in (([0.01, -0.02, 0.005], 21), ([0.01, -0.02, 0.005], 3)):
+            with self.assertRaises(ValueError):
+                _run_monte_carlo(returns, block_size=block_size)
+
+    def test_total_loss_and_non_finite_returns_are_rejected(self):
+        for bad in (-1.0, -1.5, float("nan"), float("inf")):
+            with self.assertRaises(ValueError):
+                _run_monte_carlo([0.01, -0.02, bad, 0.005, 0.012], block_size=1)
+
+    def test_seeded_run_is_reproducible(self):
+        returns = np.random.default_rng(1).normal(0.0005, 0.01, 60).tolist()
+        first = _run_monte_carlo(returns, num_simulations=3000, seed=11)
+        second = _run_monte_carlo(returns, num_simulations=3000, seed=11)
+        first.pop('completed_at')
+        second.pop('completed_at')
+        self.assertEqual(first, second)
+
+    def test_short_history_with_small_block_varies(self):
+        returns = [0.01, -0.02, 0.005, 0.012, -0.007, 0.003]
+        result = _run_monte_carlo(returns, num_simulations=2000, horizon_days=20, block_size=2, seed=7)
+        self.assertGreater(result['std_return'], 0.0)
+        self.assertGreater(result['percentile_95'], result['percentile_5'])
+
+    def test_default_block_varies(self):
+        returns = np.random.default_rng(0).normal(0.0005, 0.01, 60).tolist()
+        result = _run_monte_carlo(returns, num_simulations=2000, seed=7)
+        self.assertGreater(result['std_return'], 0.0)
+        self.assertGreater(result['var_95'], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,232 @@
+"""
+Backtesting regression tests.
+
+The price blocks switched from a list of per-day dicts to one array per
+column; these pin the new readers, the backtester's window slicing and the
+performance metrics to what the list-based code produced.
+
+Run with: python -m unittest discover -s tests
+"""
+
+import asyncio
+import math
+import statistics
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from backtesting import PerformanceCalculator, PortfolioBacktester, close_by_date, num_prices, price_records
+from backtesting.historical_data import NO_DATA_ERROR, _prices_from_json, empty_prices
+
+
+def _legacy_prices(dates, seed):
+    """Per-day dicts as fetch_historical_prices used to return them"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, len(dates)))
+    return [
+        {"date": date, "open": c * 0.99, "high": c * 1.01, "low": c * 0.98, "close": c, "volume": 1000 + i}
+        for i, (date, c) in enumerate(zip(dates, close.tolist()))
+    ]
+
+
+DATES = [str(d) for d in np.arange("2024-01-01", "2024-03-01", dtype="datetime64[D]") if np.is_busday(d)]
+LEGACY = {
+    "AAA": _legacy_prices(DATES, 1),
+    # Misses a few days, and repeats one
+    "BBB": _legacy_prices([d for i, d in enumerate(DATES) if i % 7 != 3], 2),
+}
+LEGACY["BBB"].insert(5, {**LEGACY["BBB"][5], "close": 1.0})
+
+
+def _old_daily_values(portfolio, historical_prices, start_date, end_date):
+    """The list-based PortfolioBacktester._calculate_daily_portfolio_values"""
+    price_by_date = {}
+    for symbol, data in historical_prices.items():
+        price_by_date[symbol] = {}
+        for price_entry in data.get("prices", []):
+            price_by_date[symbol][price_entry["date"]] = price_entry["close"]
+
+    all_dates = set()
+    for symbol_prices in price_by_date.values():
+        all_dates.update(symbol_prices.keys())
+    valid_dates = sorted(d for d in all_dates if start_date <= d <= end_date)
+
+    daily_values = []
+    for date in valid_dates:
+        total_value = 0
+        holdings_value = {}
+        missing_prices = []
+        for holding in portfolio["holdings"]:
+            symbol = holding["symbol"]
+            if symbol in price_by_date and date in price_by_date[symbol]:
+                value = holding["shares"] * price_by_date[symbol][date]
+                total_value += value
+                holdings_value[symbol] = value
+            else:
+                missing_prices.append(symbol)
+        total_value += portfolio.get("cash", 0)
+        if not missing_prices:
+            daily_values.append({"date": date, "total_value": total_value, "holdings": holdings_value})
+    return daily_values
+
+
+class FakeFetcher:
+    """HistoricalDataFetcher stand-in serving LEGACY (end date exclusive, like yfinance)"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def fetch_multiple_symbols(self, symbols, start_date, end_date):
+        self.calls.append((tuple(symbols), start_date, end_date))
+        result = {}
+        for symbol in symbols:
+            rows = [p for p in LEGACY.get(symbol, []) if start_date <= p["date"] < end_date]
+            result[symbol] = {"symbol": symbol, "start_date": start_date, "end_date": end_date}
+            if rows:
+                result[symbol].update(prices=_prices_from_json(rows), metadata={})
+            else:
+                result[symbol].update(prices=empty_prices(), metadata={"error": NO_DATA_ERROR})
+        return result
+
+
+class FlakyFetcher(FakeFetcher):
+    """FakeFetcher whose first call fails the way HistoricalDataFetcher reports errors"""
+
+    async def fetch_multiple_symbols(self, symbols, start_date, end_date):
+        result = await super().fetch_multiple_symbols(symbols, start_date, end_date)
+        if len(self.calls) == 1:
+            for data in result.values():
+                data.update(prices=empty_prices(), metadata={"error": "429 Too Many Requests"})
+        return result
+
+
+class PriceBlockTests(unittest.TestCase):
+
+    def test_price_records_round_trip(self):
+        for records in LEGACY.values():
+            restored = price_records(_prices_from_json(records))
+            self.assertEqual(restored, records)
+            self.assertTrue(all(isinstance(row["volume"], int) for row in restored))
+            self.assertTrue(all(isinstance(row["date"], str) for row in restored))
+
+    def test_num_prices(self):
+        for records in LEGACY.values():
+            self.assertEqual(num_prices(_prices_from_json(records)), len(records))
+        self.assertEqual(num_prices(None), 0)
+        self.assertEqual(num_prices(empty_prices()), 0)
+        self.assertEqual(price_records(empty_prices()), [])
+
+    def test_close_by_date_matches_list_loop(self):
+        for records in LEGACY.values():
+            expected = {}
+            for p in records:
+                expected[p["date"]] = p["close"]
+            self.assertEqual(close_by_date(_prices_from_json(records)), expected)
+        self.assertEqual(close_by_date(None), {})
+
+
+class BacktesterSlicingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.backtester = PortfolioBacktester()
+        self.fetcher = FakeFetcher()
+        self.backtester.historical_fetcher = self.fetcher
+
+    def test_period_is_sliced_from_prefetched_window(self):
+        asyncio.run(self.backtester._get_or_fetch(["AAA", "BBB"], "2024-01-01", "2024-03-01"))
+        sliced = asyncio.run(self.backtester._get_or_fetch(["AAA", "BBB"], "2024-01-15", "2024-02-09"))
+
+        self.assertEqual(len(self.fetcher.calls), 1)
+        for symbol in ("AAA", "BBB"):
+            expected = [p for p in LEGACY[symbol] if "2024-01-15" <= p["date"] < "2024-02-09"]
+            self.assertEqual(price_records(sliced[symbol]["prices"]), expected)
+            self.assertEqual(sliced[symbol]["start_date"], "2024-01-15")
+
+    def test_symbol_without_history_is_fetched_once(self):
+        asyncio.run(self.backtester._get_or_fetch(["AAA", "ZZZ"], "2024-01-01", "2024-03-01"))
+        first = asyncio.run(self.backtester._get_or_fetch(["AAA", "ZZZ"], "2024-01-15", "2024-02-09"))
+        second = asyncio.run(self.backtester._get_or_fetch(["ZZZ"], "2024-02-01", "2024-02-20"))
+
+        self.assertEqual(len(self.fetcher.calls), 1)
+        for result in (first, second):
+            self.assertEqual(num_prices(result["ZZZ"]["prices"]), 0)
+        self.assertGreater(num_prices(first["AAA"]["prices"]), 0)
+
+    def test_failed_fetch_is_retried_next_period(self):
+        self.fetcher = FlakyFetcher()
+        self.backtester.historical_fetcher = self.fetcher
+        failed = asyncio.run(self.backtester._get_or_fetch(["AAA"], "2024-01-01", "2024-03-01"))
+        retried = asyncio.run(self.backtester._get_or_fetch(["AAA"], "2024-01-15", "2024-02-09"))
+
+        self.assertEqual(num_prices(failed["AAA"]["prices"]), 0)
+        self.assertEqual(len(self.fetcher.calls), 2)
+        expected = [p for p in LEGACY["AAA"] if "2024-01-15" <= p["date"] < "2024-02-09"]
+        self.assertEqual(price_records(retried["AAA"]["prices"]), expected)
+
+    def test_daily_values_match_list_implementation(self):
+        portfolio = {"holdings": [{"symbol": "AAA", "shares": 10}, {"symbol": "BBB", "shares": 4}], "cash": 250}
+        start, end = "2024-01-03", "2024-02-20"
+        columnar = asyncio.run(self.backtester._get_or_fetch(["AAA", "BBB"], start, end))
+        legacy = {symbol: {"prices": price_records(data["prices"])} for symbol, data in columnar.items()}
+
+        new = self.backtester._calculate_daily_portfolio_values(portfolio, columnar, start, end)
+        old = _old_daily_values(portfolio, legacy, start, end)
+
+        self.assertEqual([row["date"] for row in new], [row["date"] for row in old])
+        for new_row, old_row in zip(new, old):
+            self.assertAlmostEqual(new_row["total_value"], old_row["total_value"], places=9)
+            for symbol, value in old_row["holdings"].items():
+                self.assertAlmostEqual(new_row["holdings"][symbol], value, places=9)
+
+
+class PerformanceMetricTests(unittest.TestCase):
+    """PerformanceCalculator against the original statistics-module formulas"""
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.returns = rng.normal(0.0004, 0.012, 300).tolist()
+        self.values = (10000 * np.cumprod(1 + np.array(self.returns))).tolist()
+
+    def test_returns(self):
+        v = self.values
+        expected = [(v[i] - v[i - 1]) / v[i - 1] for i in range(1, len(v))]
+        np.testing.assert_allclose(PerformanceCalculator.calculate_returns(v), expected, rtol=1e-12)
+
+    def test_volatility_and_sharpe(self):
+        r = self.returns
+        std = statistics.stdev(r)
+        self.assertAlmostEqual(PerformanceCalculator.volatility(r), std * math.sqrt(252), places=12)
+        expected_sharpe = (statistics.mean(r) * 252 - 0.04) / (std * math.sqrt(252))
+        self.assertAlmostEqual(PerformanceCalculator.sharpe_ratio(r, risk_free_rate=0.04), expected_sharpe, places=10)
+
+    def test_sortino(self):
+        r = self.returns
+        downside = math.sqrt(sum(x ** 2 for x in r if x < 0) / len(r))
+        expected = (statistics.mean(r) * 252 - 0.04) / (downside * math.sqrt(252))
+        self.assertAlmostEqual(PerformanceCalculator.sortino_ratio(r, risk_free_rate=0.04), expected, places=10)
+
+    def test_max_drawdown(self):
+        peak, peak_idx, best = self.values[0], 0, (0.0, 0, 0)
+        for i, value in enumerate(self.values):
+            if value > peak:
+                peak, peak_idx = value, i
+            drawdown = (peak - value) / peak
+            if drawdown > best[0]:
+                best = (drawdown, peak_idx, i)
+
+        max_dd, peak_at, trough_at = PerformanceCalculator.max_drawdown(self.values)
+        self.assertAlmostEqual(max_dd, best[0], places=12)
+        self.assertEqual((peak_at, trough_at), best[1:])
+
+    def test_value_at_risk(self):
+        ordered = sorted(self.returns)
+        expected = max(0, -ordered[int(0.05 * len(ordered))])
+        self.assertAlmostEqual(PerformanceCalculator.value_at_risk(self.returns, 0.95), expected, places=15)
+
+
+if __name__ == "__main__":
+    unittest.main()
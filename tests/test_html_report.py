@@ -0,0 +1,66 @@
+"""
+HTML report writing tests.
+
+Run with: python -m unittest discover -s tests
+"""
+
+import io
+import re
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from utils.html_report_generator import HTMLReportGenerator
+
+
+PORTFOLIO = {
+    "name": "Test <P>",
+    "total_value": 12345.678,
+    "cash": 100.5,
+    "holdings": [
+        {"symbol": "SPY", "shares": 10, "current_price": 500.0, "average_cost": 450, "name": "S&P"},
+        {"symbol": "GLD", "shares": 3, "current_price": 180.0},
+    ],
+}
+REAL_DATA = {
+    "sharpe_ratio": 0.7, "volatility": 0.18, "max_drawdown": 0.12, "total_return": -0.03,
+    "prices": {"SPY": {"price": 510.25, "change_pct": 1.234}},
+}
+
+
+def _undated(html):
+    return re.sub(r"Report Generato il [^<]*", "", html)
+
+
+class ReportWriteTests(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+
+    def test_batch_files_match_returned_html(self):
+        batch = [
+            {"portfolio": PORTFOLIO, "analysis_results": {}, "real_data": REAL_DATA, "output_path": str(self.dir / "a.html")},
+            {"portfolio": PORTFOLIO, "analysis_results": {}, "real_data": {}},
+        ]
+        with redirect_stdout(io.StringIO()):
+            htmls = HTMLReportGenerator.generate_reports(batch)
+        self.assertEqual((self.dir / "a.html").read_bytes(), htmls[0].encode("utf-8"))
+        self.assertEqual(sorted(p.name for p in self.dir.iterdir()), ["a.html"])
+
+    def test_write_report_matches_generate_report(self):
+        streamed, saved = self.dir / "streamed.html", self.dir / "saved.html"
+        with redirect_stdout(io.StringIO()):
+            html = HTMLReportGenerator.generate_report(PORTFOLIO, {}, REAL_DATA, str(saved))
+            HTMLReportGenerator.write_report(PORTFOLIO, {}, REAL_DATA, str(streamed))
+        self.assertEqual(saved.read_text(encoding="utf-8"), html)
+        self.assertEqual(_undated(streamed.read_text(encoding="utf-8")), _undated(html))
+
+
+if __name__ == "__main__":
+    unittest.main()
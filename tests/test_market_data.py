@@ -0,0 +1,49 @@
+"""
+PortfolioMetrics tests.
+
+Run with: python -m unittest discover -s tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from utils import market_data
+from utils.market_data import PortfolioMetrics
+
+
+class MaxDrawdownTests(unittest.TestCase):
+
+    CASES = [
+        [100.0, 120.0, 90.0, 130.0, 104.0],
+        [0.0, 0.0, 5.0, 4.0],
+        [0.0, -1.0, -2.0],
+        [-5.0, -3.0, 2.0, 1.0],
+        [50.0],
+    ]
+    EXPECTED = [0.25, 0.2, 0.0, 0.5, 0.0]
+
+    def _fallback(self, values):
+        with mock.patch.object(market_data, "_max_dd_kernel", lambda: None):
+            return PortfolioMetrics.calculate_max_drawdown(values)
+
+    def test_numpy_fallback(self):
+        for values, expected in zip(self.CASES, self.EXPECTED):
+            self.assertAlmostEqual(self._fallback(values), expected)
+
+    def test_kernel_matches_fallback(self):
+        if market_data._max_dd_kernel() is None:
+            self.skipTest("numba not installed")
+        rng = np.random.default_rng(0)
+        cases = self.CASES + [(100 * np.cumprod(1 + rng.normal(0, 0.02, 500))).tolist()]
+        for values in cases:
+            self.assertEqual(PortfolioMetrics.calculate_max_drawdown(values), self._fallback(values))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Agent memo cache tests.
+
+Run with: python -m unittest discover -s tests
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from orchestrator_cache import AsyncMemoCache, canonical_key, stable_payload
+
+
+def _market(spy_price=500.0, news="Stocks rally", timestamp="2026-10-15T10:00:00", searches=3):
+    return {
+        "symbols": {
+            "SPY": {"price": spy_price, "news": [{"title": news, "timestamp": timestamp}], "timestamp": timestamp},
+            "GLD": {"price": 180.0, "analyst_rating": "Hold"},
+        },
+        "meta": {"searches_performed": searches, "completion": "full"},
+    }
+
+
+def _key(market_data):
+    return canonical_key(stable_payload(market_data))
+
+
+class StablePayloadTests(unittest.TestCase):
+
+    def test_fetch_times_and_search_counts_keep_the_key(self):
+        later = _market(timestamp="2026-10-15T15:30:00", searches=5)
+        self.assertEqual(_key(_market()), _key(later))
+
+    def test_any_price_move_changes_the_key(self):
+        self.assertNotEqual(_key(_market(500.0)), _key(_market(500.2)))
+
+    def test_news_changes_the_key(self):
+        self.assertNotEqual(_key(_market()), _key(_market(news="Breaking: rate hike")))
+
+    def test_payload_is_not_modified(self):
+        market = _market()
+        stripped = stable_payload(market)
+        self.assertNotIn("timestamp", stripped["symbols"]["SPY"])
+        self.assertEqual(market["symbols"]["SPY"]["timestamp"], "2026-10-15T10:00:00")
+
+
+class AsyncMemoCacheTests(unittest.TestCase):
+
+    def test_shared_across_event_loops(self):
+        cache = AsyncMemoCache()
+        calls = []
+
+        async def agent():
+            calls.append(1)
+            return {"value": 1}
+
+        first = asyncio.run(cache.get_or_call("k", agent))
+        second = asyncio.run(cache.get_or_call("k", agent))
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 1)
+
+    def test_inflight_task_from_closed_loop_is_not_awaited(self):
+        cache = AsyncMemoCache()
+        # An abandoned call from an earlier asyncio.run
+        old_loop = asyncio.new_event_loop()
+        cache._inflight["k"] = old_loop.create_future()
+        old_loop.close()
+
+        async def agent():
+            return {"value": 2}
+
+        self.assertEqual(asyncio.run(cache.get_or_call("k", agent)), {"value": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+RealDataFetcher memoization, with a stub in place of yfinance.
+
+Run with: python -m unittest discover -s tests
+"""
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from utils import real_data_fetcher
+from utils.real_data_fetcher import RealDataFetcher
+from utils.yf_cache import HistoryCache
+
+
+class StubTicker:
+    """yf.Ticker stand-in: raises for symbols in `failing`, else a 10-day history"""
+
+    failing = set()
+    calls = []
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+
+    def history(self, period: str = "1mo"):
+        StubTicker.calls.append(self.symbol)
+        if self.symbol in StubTicker.failing:
+            raise ConnectionError("network down")
+        close = 100 + np.arange(10, dtype=float) + len(self.symbol)
+        index = pd.bdate_range(end="2026-10-14", periods=10, tz="America/New_York")
+        return pd.DataFrame({"Close": close, "Volume": 1000.0}, index=index)
+
+
+class MemoTests(unittest.TestCase):
+
+    def setUp(self):
+        StubTicker.failing = set()
+        StubTicker.calls = []
+        real_data_fetcher._memo.clear()
+        real_data_fetcher._missing.clear()
+        self._tmp = tempfile.TemporaryDirectory()
+        patches = [
+            mock.patch.object(real_data_fetcher, "_ticker", StubTicker),
+            mock.patch.object(real_data_fetcher, "_download_histories", lambda symbols, period: {}),
+            mock.patch.object(real_data_fetcher, "_history_cache", HistoryCache(self._tmp.name)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self._tmp.cleanup)
+
+    def test_failed_returns_are_not_memoized(self):
+        StubTicker.failing = {"AAPL", "MSFT"}
+        first = asyncio.run(RealDataFetcher.get_historical_returns(["AAPL", "MSFT"]))
+        self.assertEqual(first, {"AAPL": [], "MSFT": []})
+
+        StubTicker.failing = set()
+        second = asyncio.run(RealDataFetcher.get_historical_returns(["AAPL", "MSFT"]))
+        self.assertEqual(StubTicker.calls, ["AAPL", "MSFT", "AAPL", "MSFT"])
+        self.assertEqual(len(second["AAPL"]), 9)
+        self.assertEqual(len(second["MSFT"]), 9)
+
+    def test_complete_returns_are_memoized(self):
+        first = asyncio.run(RealDataFetcher.get_historical_returns(["AAPL", "MSFT"]))
+        first["AAPL"].append(1.0)
+        second = asyncio.run(RealDataFetcher.get_historical_returns(["MSFT", "AAPL"]))
+        self.assertEqual(StubTicker.calls, ["AAPL", "MSFT"])
+        self.assertEqual(len(second["AAPL"]), 9)
+
+    def test_partial_portfolio_values_are_not_memoized(self):
+        holdings = [{"symbol": "AAPL", "shares": 2}, {"symbol": "MSFT", "shares": 1}]
+        StubTicker.failing = {"MSFT"}
+        partial = asyncio.run(RealDataFetcher.get_portfolio_historical_values(holdings))
+        self.assertEqual(partial["values"][0], 2 * 104.0)
+
+        StubTicker.failing = set()
+        full = asyncio.run(RealDataFetcher.get_portfolio_historical_values(holdings))
+        self.assertEqual(full["values"][0], 2 * 104.0 + 104.0)
+
+        again = asyncio.run(RealDataFetcher.get_portfolio_historical_values(holdings))
+        self.assertEqual(again, full)
+        self.assertEqual(StubTicker.calls, ["AAPL", "MSFT", "MSFT"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+RiskAnalyzer tests.
+
+Run with: python -m unittest discover -s tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from utils.risk_analysis import RiskAnalyzer
+
+
+class CorrelationTests(unittest.TestCase):
+
+    A = [0.010, -0.020, 0.015, 0.003]
+    B = [0.011, -0.018, 0.016, 0.001]
+
+    def test_short_series_does_not_zero_other_pairs(self):
+        corr = RiskAnalyzer.calculate_correlation_matrix({"A": self.A, "B": self.B, "C": []})
+        self.assertGreater(corr["A"]["B"], 0.99)
+        self.assertEqual(corr["A"]["C"], 0.0)
+        self.assertEqual(corr["C"]["B"], 0.0)
+        self.assertEqual(corr["C"]["C"], 1.0)
+
+    def test_single_return_series_is_left_out(self):
+        with_short = RiskAnalyzer.calculate_correlation_matrix({"A": self.A, "C": [0.01], "B": self.B})
+        without = RiskAnalyzer.calculate_correlation_matrix({"A": self.A, "B": self.B})
+        self.assertAlmostEqual(with_short["A"]["B"], without["A"]["B"])
+
+    def test_longer_series_align_on_common_tail(self):
+        corr = RiskAnalyzer.calculate_correlation_matrix({"A": [0.5, 0.7] + self.A, "B": self.B})
+        self.assertGreater(corr["A"]["B"], 0.99)
+
+    def test_constant_series_correlates_zero(self):
+        corr = RiskAnalyzer.calculate_correlation_matrix({"A": self.A, "K": [0.1 / 3] * 4})
+        self.assertEqual(corr["A"]["K"], 0.0)
+        self.assertEqual(corr["K"]["K"], 1.0)
+
+    def test_empty(self):
+        self.assertEqual(RiskAnalyzer.calculate_correlation_matrix({}), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+PortfolioSafetyHooks tests.
+
+Run with: python -m unittest discover -s tests
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from hooks.safety_hooks import PortfolioSafetyHooks
+
+
+def _trade(symbol):
+    return {'symbol': symbol, 'action': 'SELL', 'shares': 1, 'price': 10, 'current_portfolio': {}}
+
+
+class PreTradeHookTests(unittest.TestCase):
+
+    def test_forbidden_symbols_follow_constraint_changes(self):
+        hooks = PortfolioSafetyHooks()
+        self.assertEqual(asyncio.run(hooks.pre_trade_hook(_trade('ARKK')))['permissionDecision'], 'allow')
+
+        hooks.constraints['forbidden_symbols'] = ['ARKK']
+        self.assertEqual(asyncio.run(hooks.pre_trade_hook(_trade('ARKK')))['permissionDecision'], 'deny')
+
+    def test_leveraged_symbols_warn(self):
+        hooks = PortfolioSafetyHooks()
+        for symbol in ('TQQQ', 'sqqq', 'UPRO.MI', 'SPXU', 'XYZ3X'):
+            result = asyncio.run(hooks.pre_trade_hook(_trade(symbol)))
+            self.assertEqual(result['permissionDecision'], 'warn', symbol)
+        self.assertEqual(asyncio.run(hooks.pre_trade_hook(_trade('SPY')))['permissionDecision'], 'allow')
+
+
+class PreOptimizationHookTests(unittest.TestCase):
+
+    def test_invalid_objective_lists_the_valid_ones(self):
+        hooks = PortfolioSafetyHooks()
+        result = asyncio.run(hooks.pre_optimization_hook({
+            'portfolio': {'total_value': 10000}, 'objective': 'max_alpha'
+        }))
+        self.assertEqual(result['permissionDecision'], 'deny')
+        self.assertIn("['max_sharpe', 'min_variance', 'max_return', 'risk_parity']", result['reason'])
+
+    def test_valid_objective(self):
+        hooks = PortfolioSafetyHooks()
+        result = asyncio.run(hooks.pre_optimization_hook({
+            'portfolio': {'total_value': 10000}, 'objective': 'risk_parity', 'constraints': {'x': 1}
+        }))
+        self.assertEqual(result['permissionDecision'], 'allow')
+
+
+if __name__ == "__main__":
+    unittest.main()